@@ -0,0 +1,295 @@
+from __future__ import division, print_function
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+from collections import deque
+from random import Random
+from timeit import default_timer
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.btree import BTree
+from pystructs.trees.lazy import LazyBinTree
+from pystructs.trees.redblack import RedBlackTree
+from pystructs.trees.scapegoat import ScapegoatTree
+from pystructs.trees.treap import Treap
+
+try:
+    import bintrees
+except ImportError:
+    bintrees = None
+
+# python -m pystructs.profiling.benchmark -h
+#
+# Runs every (tree, workload, key order, size) case in a fresh process and
+# records the wall time of the measured operations, the peak memory the
+# case added on top of the process it started in, and the final tree
+# height. Results are written as JSON; --compare fails the run if any case
+# got slower than a previous result file by more than --threshold.
+
+TREES = {
+    'BinTree': BinTree,
+    'AVL': AVL,
+    'RedBlack': RedBlackTree,
+    'BTree': BTree,
+    'Treap': Treap,
+    'Scapegoat': ScapegoatTree,
+    'Lazy': LazyBinTree,
+}
+ORDERS = ('sorted', 'random', 'zigzag')
+WORKLOADS = ('build', 'insert', 'delete', 'find', 'first_last', 'mixed')
+SIZES = (10**3, 10**4, 10**5)
+FIRST_LAST_CALLS = 10**5
+
+
+class BintreesTree(object):
+    """Adapts bintrees.BinaryTree to the BinTree interface."""
+
+    def __init__(self, iterable, sorted_=False):
+        self.t = bintrees.BinaryTree.from_keys(iterable)
+
+    def insert(self, val):
+        self.t.insert(val, None)
+
+    def delete(self, val):
+        self.t.remove(val)
+
+    def find(self, val):
+        return val in self.t
+
+    def get_first(self):
+        return self.t.min_key()
+
+    def get_last(self):
+        return self.t.max_key()
+
+
+def make_keys(order, size, seed=0):
+    """Returns size distinct int keys in the given order.
+
+    order := (str) 'sorted', 'random' or 'zigzag' (alternately the lowest and
+             highest remaining key, which makes an unbalanced tree a chain)
+    size := (int) number of keys
+    seed := (int) seed of the random order
+
+    """
+    keys = list(range(size))
+    if order == 'random':
+        Random(seed).shuffle(keys)
+    elif order == 'zigzag':
+        keys = [keys[i // 2] if i % 2 == 0 else keys[size - 1 - i // 2]
+                for i in range(size)]
+    elif order != 'sorted':
+        raise ValueError('Unknown key order ' + str(order))
+    return keys
+
+
+def tree_height(tree):
+    """Returns the height of a BinTree-like tree, None if not available."""
+    if isinstance(tree, BTree):
+        return tree.depth()
+    if isinstance(tree, Treap):
+        height = 0
+        level = deque([tree.root] if tree.root is not None else [])
+        while len(level) > 0:
+            height += 1
+            for _ in xrange(len(level)):
+                node = level.popleft()
+                for child in (node.left, node.right):
+                    if child is not None:
+                        level.append(child)
+        return height
+    t = getattr(tree, 'tree', None)
+    if not isinstance(t, dict) or t.get('root') is None:
+        return None if t is None else 0
+    height = 0
+    level = deque([t['root']])
+    while len(level) > 0:
+        height += 1
+        for _ in xrange(len(level)):
+            node = t[level.popleft()]
+            for child in node[1:3]:
+                if child is not None:
+                    level.append(child)
+    return height
+
+
+def run_workload(cls, workload, keys):
+    """Runs workload and returns (seconds, tree) for the measured part."""
+    timer = default_timer
+    if workload == 'build':
+        start = timer()
+        tree = cls(keys)
+        return timer() - start, tree
+    if workload == 'insert':
+        tree = cls([])
+        insert = tree.insert
+        start = timer()
+        for val in keys:
+            insert(val)
+        return timer() - start, tree
+    if workload == 'mixed':
+        half = len(keys) // 2
+        tree = cls(keys[:half])
+        insert = tree.insert
+        delete = tree.delete
+        find = tree.find
+        start = timer()
+        for i in xrange(half, len(keys)):
+            insert(keys[i])
+            find(keys[i - half])
+            delete(keys[i - half])
+            tree.get_first()
+        return timer() - start, tree
+    tree = cls(keys)
+    if workload == 'delete':
+        delete = tree.delete
+        start = timer()
+        for val in keys:
+            delete(val)
+        return timer() - start, tree
+    if workload == 'find':
+        find = tree.find
+        start = timer()
+        for val in keys:
+            find(val)
+        return timer() - start, tree
+    if workload == 'first_last':
+        get_first = tree.get_first
+        get_last = tree.get_last
+        start = timer()
+        for _ in xrange(FIRST_LAST_CALLS):
+            get_first()
+            get_last()
+        return timer() - start, tree
+    raise ValueError('Unknown workload ' + str(workload))
+
+
+def _case(tree_name, workload, order, size, repeat, queue):
+    cls = TREES[tree_name]
+    keys = make_keys(order, size)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = None
+    for _ in range(repeat):
+        seconds, tree = run_workload(cls, workload, keys)
+        if best is None or seconds < best:
+            best = seconds
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({'seconds': best, 'peak_kb': peak - base,
+               'height': tree_height(tree), 'status': 'ok'})
+
+
+def run_case(tree_name, workload, order, size, repeat=1, timeout=None):
+    """Runs one case in a child process and returns its result dict."""
+    result = {'tree': tree_name, 'workload': workload, 'order': order,
+              'size': size}
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(
+        target=_case, args=(tree_name, workload, order, size, repeat, queue))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+        result.update({'seconds': None, 'peak_kb': None, 'height': None,
+                       'status': 'timeout'})
+    elif proc.exitcode != 0:
+        result.update({'seconds': None, 'peak_kb': None, 'height': None,
+                       'status': 'error'})
+    else:
+        result.update(queue.get())
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Returns the cases slower than baseline by more than threshold.
+
+    results := (list of dict) current results
+    baseline := (list of dict) earlier results
+    threshold := (float) allowed relative slowdown, 0.1 is 10%
+
+    """
+    def key(r):
+        return r['tree'], r['workload'], r['order'], r['size']
+    before = dict((key(r), r) for r in baseline)
+    slower = []
+    for r in results:
+        old = before.get(key(r))
+        if old is None or old['seconds'] is None:
+            continue
+        if r['seconds'] is None or (
+                r['seconds'] > old['seconds'] * (1 + threshold)):
+            slower.append((r, old))
+    return slower
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the pystructs trees.')
+    parser.add_argument('--trees', nargs='+', default=sorted(TREES),
+                        choices=sorted(TREES) + ['bintrees'])
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS),
+                        choices=WORKLOADS)
+    parser.add_argument('--orders', nargs='+', default=list(ORDERS),
+                        choices=ORDERS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES),
+                        help='key counts, for example 1000 ... 10000000')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per case, the best time is kept')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='seconds before a case is recorded as timeout')
+    parser.add_argument('--output', help='JSON file to write results to')
+    parser.add_argument('--compare', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed relative slowdown against --compare')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    trees = args.trees
+    if 'bintrees' in trees:
+        if bintrees is None:
+            print('bintrees is not installed, skipping it.')
+            trees = [name for name in trees if name != 'bintrees']
+        else:
+            TREES['bintrees'] = BintreesTree
+    results = []
+    row = '{:<10} {:<11} {:<7} {:>9} {:>10} {:>10} {:>7}'
+    print(row.format('tree', 'workload', 'order', 'size', 'seconds',
+                     'peak_kb', 'height'))
+    for size in args.sizes:
+        for name in trees:
+            for workload in args.workloads:
+                for order in args.orders:
+                    r = run_case(name, workload, order, size, args.repeat,
+                                 args.timeout)
+                    results.append(r)
+                    if r['status'] == 'ok':
+                        seconds = '{:.4f}'.format(r['seconds'])
+                    else:
+                        seconds = r['status']
+                    print(row.format(name, workload, order, size, seconds,
+                                     r['peak_kb'], r['height']))
+    report = {'python': platform.python_version(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        slower = compare(results, baseline, args.threshold)
+        for r, old in slower:
+            print('REGRESSION {tree} {workload} {order} {size}: '.format(**r) +
+                  '{} -> {}'.format(old['seconds'], r['seconds']))
+        if len(slower) > 0:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
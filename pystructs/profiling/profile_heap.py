@@ -0,0 +1,126 @@
+from __future__ import division, print_function
+
+import heapq
+from random import Random
+from sys import argv
+from timeit import default_timer
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.lazy import LazyBinTree
+
+# python -m pystructs.profiling.profile_heap [size]
+#
+# Uses the trees as priority queues next to heapq on a list. 'drain'
+# builds from shuffled keys and pops every minimum, 'queue' keeps half the
+# keys queued and pushes one for every pop, and 'peek' reads the minimum
+# and maximum repeatedly. heapq has no maximum, so it runs 'drain' and
+# 'queue' only; 'ends' pops from both ends alternately, which only the
+# trees can do.
+
+SIZE = 100000
+PEEKS = 200000
+TREES = (('BinTree', BinTree), ('AVL', AVL), ('LazyBinTree', LazyBinTree))
+
+
+def keys(size, seed=0):
+    keys = list(range(size))
+    Random(seed).shuffle(keys)
+    return keys
+
+
+def tree_drain(cls, keys):
+    tree = cls(keys)
+    pop_first = tree.pop_first
+    start = default_timer()
+    for _ in range(len(keys)):
+        pop_first()
+    return default_timer() - start
+
+
+def heap_drain(keys):
+    heap = list(keys)
+    heapq.heapify(heap)
+    heappop = heapq.heappop
+    start = default_timer()
+    for _ in range(len(keys)):
+        heappop(heap)
+    return default_timer() - start
+
+
+def tree_queue(cls, keys):
+    half = len(keys) // 2
+    tree = cls(keys[:half])
+    insert = tree.insert
+    pop_first = tree.pop_first
+    start = default_timer()
+    for val in keys[half:]:
+        insert(val)
+        pop_first()
+    return default_timer() - start
+
+
+def heap_queue(keys):
+    half = len(keys) // 2
+    heap = keys[:half]
+    heapq.heapify(heap)
+    heappushpop = heapq.heappushpop
+    start = default_timer()
+    for val in keys[half:]:
+        heappushpop(heap, val)
+    return default_timer() - start
+
+
+def tree_peek(cls, keys):
+    tree = cls(keys)
+    get_first = tree.get_first
+    get_last = tree.get_last
+    start = default_timer()
+    for _ in range(PEEKS):
+        get_first()
+        get_last()
+    return default_timer() - start
+
+
+def heap_peek(keys):
+    heap = list(keys)
+    heapq.heapify(heap)
+    start = default_timer()
+    for _ in range(PEEKS):
+        heap[0]
+    return default_timer() - start
+
+
+def tree_ends(cls, keys):
+    tree = cls(keys)
+    pop_first = tree.pop_first
+    pop_last = tree.pop_last
+    start = default_timer()
+    for _ in range(len(keys) // 2):
+        pop_first()
+        pop_last()
+    return default_timer() - start
+
+
+def main(size):
+    shuffled = keys(size)
+    row = '{:>12} {:>8} {:>10}'
+    print(row.format('queue', 'case', 'seconds'))
+    cases = (('drain', tree_drain, heap_drain),
+             ('queue', tree_queue, heap_queue),
+             ('peek', tree_peek, heap_peek),
+             ('ends', tree_ends, None))
+    for case, tree_case, heap_case in cases:
+        if heap_case is not None:
+            print(row.format('heapq', case,
+                             '{:.3f}'.format(heap_case(shuffled))))
+        for name, cls in TREES:
+            print(row.format(name, case,
+                             '{:.3f}'.format(tree_case(cls, shuffled))))
+
+
+if __name__ == '__main__':
+    if len(argv) > 1:
+        main(int(argv[1]))
+    else:
+        main(SIZE)
@@ -0,0 +1,49 @@
+from __future__ import print_function
+
+import multiprocessing
+from sys import argv
+from timeit import default_timer
+
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.sharded import ShardedBinTree
+
+# python -m pystructs.profiling.profile_sharded [keys]
+#
+# Times building one BinTree over sorted keys against a ShardedBinTree
+# with 1, 2, 4 ... shards up to twice the number of cores, and a full
+# irange over the sharded tree. The build can only scale up to the number
+# of cores the machine actually has.
+
+KEYS = 2 * 10**6
+
+
+def main(size):
+    keys = list(range(size))
+    cores = multiprocessing.cpu_count()
+    start = default_timer()
+    BinTree(keys, True)
+    single = default_timer() - start
+    print('{} cores, {} keys, single BinTree build {:.2f}s'.format(
+        cores, size, single))
+    print('{:>7} {:>10} {:>9} {:>11}'.format('shards', 'build s',
+                                             'speedup', 'irange s'))
+    shards = 1
+    while shards <= 2 * cores:
+        start = default_timer()
+        tree = ShardedBinTree(keys, shards, True)
+        build = default_timer() - start
+        start = default_timer()
+        for _ in tree.irange():
+            pass
+        scan = default_timer() - start
+        tree.close()
+        print('{:>7} {:>10.2f} {:>9.2f} {:>11.2f}'.format(
+            shards, build, single / build, scan))
+        shards *= 2
+
+
+if __name__ == '__main__':
+    if len(argv) > 1:
+        main(int(argv[1]))
+    else:
+        main(KEYS)
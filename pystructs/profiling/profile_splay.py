@@ -0,0 +1,66 @@
+from __future__ import division, print_function
+
+from bisect import bisect
+from random import Random
+from sys import argv
+from timeit import default_timer
+
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.splay import SplayTree
+from pystructs.trees.stats import search_length
+
+# python -m pystructs.profiling.profile_splay [zipf exponent]
+#
+# Replays a Zipf-distributed trace of range-start lookups (floor of a
+# value just above a key) on a balanced BinTree and on a SplayTree built
+# from the same keys, and reports the time of the trace and the mean
+# number of nodes on the path to the looked-up keys afterwards.
+
+KEYS = 100000
+QUERIES = 200000
+EXPONENTS = (0.8, 1.1, 1.5)
+
+
+def zipf_trace(keys, queries, exponent, seed=0):
+    """Returns queries keys where the i-th most popular has weight i**-s."""
+    rand = Random(seed)
+    popular = list(keys)
+    rand.shuffle(popular)
+    cumulative = []
+    total = 0.0
+    for i in range(1, len(popular) + 1):
+        total += i ** -exponent
+        cumulative.append(total)
+    return [popular[min(bisect(cumulative, rand.random() * total),
+                        len(popular) - 1)] for _ in range(queries)]
+
+
+def run(tree, trace):
+    floor = tree.floor
+    start = default_timer()
+    for val in trace:
+        floor(val + 0.5)
+    seconds = default_timer() - start
+    sample = trace[-1000:]
+    depth = sum(search_length(tree, val) for val in sample) / len(sample)
+    return seconds, depth
+
+
+def main(exponents):
+    keys = list(range(KEYS))
+    print('{:>9} {:>10} {:>10} {:>12} {:>12}'.format(
+        'exponent', 'tree', 'seconds', 'mean depth', 'distinct'))
+    for exponent in exponents:
+        trace = zipf_trace(keys, QUERIES, exponent)
+        distinct = len(set(trace))
+        for name, cls in (('BinTree', BinTree), ('SplayTree', SplayTree)):
+            seconds, depth = run(cls(keys, True), trace)
+            print('{:>9} {:>10} {:>10.3f} {:>12.1f} {:>12}'.format(
+                exponent, name, seconds, depth, distinct))
+
+
+if __name__ == '__main__':
+    if len(argv) > 1:
+        main([float(argv[1])])
+    else:
+        main(EXPONENTS)
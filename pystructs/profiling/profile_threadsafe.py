@@ -0,0 +1,95 @@
+from __future__ import print_function
+
+import threading
+from random import sample
+from sys import argv
+from timeit import default_timer
+
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.threadsafe import ConcurrentBinTree
+
+# python -m pystructs.profiling.profile_threadsafe [seconds]
+#
+# Measures read throughput of ConcurrentBinTree as reader threads are added,
+# against the same tree behind a plain mutex, with one writer thread
+# applying a batch every WRITE_PAUSE seconds. In CPython the GIL still runs one
+# thread at a time, so the readers-writer lock can at best keep the total
+# throughput flat as threads are added; the mutex column shows the cost of
+# serializing readers on a single lock instead.
+
+KEYS = 100000
+KEYRANGE = 1000000
+THREADS = (1, 2, 4, 8)
+BATCH = 100
+WRITE_PAUSE = 0.01
+
+
+class MutexBinTree(object):
+    """Baseline wrapper that serializes every call on one lock."""
+
+    def __init__(self, tree):
+        self._tree = tree
+        self._lock = threading.Lock()
+
+    def find(self, val):
+        with self._lock:
+            return self._tree.find(val)
+
+    def batch(self, inserts=(), deletes=()):
+        with self._lock:
+            for val in inserts:
+                self._tree.insert(val)
+            for val in deletes:
+                self._tree.delete(val)
+
+
+def reader(tree, queries, stop, counts, i):
+    n = 0
+    find = tree.find
+    while not stop.is_set():
+        for val in queries:
+            find(val)
+        n += len(queries)
+    counts[i] = n
+
+
+def writer(tree, keys, stop):
+    fresh = [KEYRANGE + i for i in range(BATCH)]
+    while not stop.wait(WRITE_PAUSE):
+        tree.batch(inserts=fresh)
+        tree.batch(deletes=fresh)
+
+
+def run(tree, threads, seconds, keys):
+    stop = threading.Event()
+    counts = [0] * threads
+    queries = keys[:1000]
+    workers = [threading.Thread(target=reader,
+                                args=(tree, queries, stop, counts, i))
+               for i in range(threads)]
+    workers.append(threading.Thread(target=writer, args=(tree, keys, stop)))
+    start = default_timer()
+    for w in workers:
+        w.start()
+    stop.wait(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(counts) / (default_timer() - start)
+
+
+def main(seconds):
+    keys = sample(range(KEYRANGE), KEYS)
+    print('{:>8} {:>16} {:>16}'.format('threads', 'rwlock reads/s',
+                                       'mutex reads/s'))
+    for threads in THREADS:
+        rw = run(ConcurrentBinTree(BinTree(keys)), threads, seconds, keys)
+        mutex = run(MutexBinTree(BinTree(keys)), threads, seconds, keys)
+        print('{:>8} {:>16.0f} {:>16.0f}'.format(threads, rw, mutex))
+
+
+if __name__ == '__main__':
+    if len(argv) > 1:
+        main(float(argv[1]))
+    else:
+        main(2.0)
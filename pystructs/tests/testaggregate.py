@@ -0,0 +1,120 @@
+import unittest
+import warnings
+from operator import add
+from random import Random
+
+from pystructs.trees.aggregate import (AggregateBinTree, Monoid, COUNT, MAX,
+                                       MIN, SUM)
+from pystructs.trees.binarytree import BinTree, DuplicateException
+
+
+class AggregateBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pairs = [(k, k * 10) for k in [5, 2, 8, 1, 9, 3, 7]]
+        self.t = AggregateBinTree(self.pairs)
+
+    def brute(self, t, lo, hi, inclusive=(True, False)):
+        monoid = t.monoid
+        total = monoid.identity
+        for val in BinTree.__iter__(t):
+            if lo is not None and (val < lo or (val == lo and
+                                                not inclusive[0])):
+                continue
+            if hi is not None and (hi < val or (val == hi and
+                                                not inclusive[1])):
+                continue
+            total = monoid.combine(total, monoid.lift(val, t.payloads[val]))
+        return total
+
+    def assertAggregates(self, t):
+        bounds = [None] + range(0, 11)
+        for lo in bounds:
+            for hi in bounds:
+                for inclusive in ((True, False), (True, True),
+                                  (False, False)):
+                    self.assertEqual(t.aggregate(lo, hi, inclusive),
+                                     self.brute(t, lo, hi, inclusive))
+
+    def test_init(self):
+        self.assertEqual(self.t.aggregate(), 350)
+        self.assertEqual(self.t.aggregates[self.t.get_root()], 350)
+        self.assertAggregates(self.t)
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, AggregateBinTree,
+                          [(1, 1), (1, 2), (1, 3)])
+
+    def test_aggregate(self):
+        self.assertEqual(self.t.aggregate(2, 8), 20 + 30 + 50 + 70)
+        self.assertEqual(self.t.aggregate(2, 8, (False, True)),
+                         30 + 50 + 70 + 80)
+        self.assertEqual(self.t.aggregate(4, 4), 0)
+        self.assertEqual(self.t.aggregate(20, None), 0)
+
+    def test_presets(self):
+        for monoid in (SUM, MIN, MAX, COUNT):
+            t = AggregateBinTree(self.pairs, monoid)
+            self.assertAggregates(t)
+        t = AggregateBinTree(self.pairs, MIN)
+        self.assertEqual(t.aggregate(3, None), 30)
+        t = AggregateBinTree(self.pairs, COUNT)
+        self.assertEqual(t.aggregate(2, 9), 5)
+
+    def test_non_commutative(self):
+        concat = Monoid(add, '', lambda val, payload: payload)
+        t = AggregateBinTree([(k, str(k)) for k in range(10)], concat)
+        self.assertEqual(t.aggregate(2, 8), '234567')
+        t.insert(4.5, 'x')
+        t.delete(6)
+        self.assertEqual(t.aggregate(2, 8), '234x57')
+
+    def test_insert_delete(self):
+        r = Random(0)
+        t = AggregateBinTree([])
+        present = {}
+        for _ in range(500):
+            val = r.randrange(11)
+            if val in present:
+                t.delete(val, r.random)
+                del present[val]
+            else:
+                payload = r.randrange(100)
+                t.insert(val, payload)
+                present[val] = payload
+            self.assertEqual(t.aggregate(), sum(present.values()))
+        self.assertAggregates(t)
+        self.assertEqual(t.payloads, present)
+        self.assertEqual(len(t.aggregates), len(present))
+
+    def test_set(self):
+        self.t.set(3, 1000)
+        self.assertEqual(self.t.aggregate(), 350 - 30 + 1000)
+        self.assertAggregates(self.t)
+        self.assertRaises(KeyError, self.t.set, 4, 1)
+
+    def test_delete_missing(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.t.delete(4)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(self.t.aggregate(), 350)
+
+    def test_bulk(self):
+        self.t.insert_many([(4, 40), (6, 60)])
+        self.assertEqual(self.t.aggregate(), 450)
+        self.assertRaises(DuplicateException, self.t.insert_many,
+                          [(0, 1), (4, 1)])
+        self.assertNotIn(0, self.t.payloads)
+        self.t.delete_many([1, 9])
+        self.assertEqual(self.t.aggregate(), 350)
+        self.assertAggregates(self.t)
+
+    def test_storage_TypeError(self):
+        t = AggregateBinTree([(1, 10), (2, 20)])
+        self.assertRaises(TypeError, t.dump, 'unused')
+        self.assertRaises(TypeError, AggregateBinTree.load, 'unused')
+
+
+if __name__ == '__main__':
+    unittest.main()
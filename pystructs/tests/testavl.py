@@ -0,0 +1,131 @@
+import unittest
+from math import log
+from random import shuffle
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree, DuplicateException
+
+
+class AVLTest(unittest.TestCase):
+
+    def setUp(self):
+        self.iterable = range(13)
+
+    def check_avl(self, t):
+        """Verifies ordering, parent links, heights and balance."""
+        tree = t.tree
+
+        def walk(val, parent, lo, hi):
+            if val is None:
+                return 0
+            node = tree[val]
+            self.assertEqual(node[BinTree.PARENT], parent)
+            if lo is not None:
+                self.assertLess(lo, val)
+            if hi is not None:
+                self.assertLess(val, hi)
+            left = walk(node[BinTree.LEFT], val, lo, val)
+            right = walk(node[BinTree.RIGHT], val, val, hi)
+            self.assertLessEqual(abs(left - right), 1)
+            self.assertEqual(t.get_height(val), 1 + max(left, right))
+            self.assertEqual(t.sizes[val],
+                             1 + t.sizes.get(node[BinTree.LEFT], 0) +
+                             t.sizes.get(node[BinTree.RIGHT], 0))
+            return 1 + max(left, right)
+        walk(tree['root'], None, None, None)
+        self.assertEqual(len(t.heights), len(tree) - 1)
+        self.assertEqual(len(t.sizes), len(tree) - 1)
+
+    def test_init_heights(self):
+        t = AVL(self.iterable, True)
+        self.assertEqual(t.get_root(), 6)
+        self.assertEqual(t.get_height(6), 4)
+        self.check_avl(t)
+
+    def test_zero_init(self):
+        t = AVL([])
+        self.assertIsNone(t.get_root())
+        self.assertEqual(t.heights, {})
+
+    def test_insert_sorted(self):
+        t = AVL([])
+        for i in range(1000):
+            t.insert(i)
+        self.check_avl(t)
+        self.assertLessEqual(t.get_height(t.get_root()),
+                             1.45 * log(1002, 2))
+        self.assertEqual(t.get_first(), 0)
+        self.assertEqual(t.get_last(), 999)
+
+    def test_insert_rotation(self):
+        t = AVL([])
+        for i in [3, 2, 1]:
+            t.insert(i)
+        self.assertDictEqual(t.tree,
+                             {'root': 2,
+                              2: [None, 1, 3],
+                              1: [2, None, None],
+                              3: [2, None, None]})
+
+    def test_insert_double_rotation(self):
+        t = AVL([])
+        for i in [1, 3, 2]:
+            t.insert(i)
+        self.assertDictEqual(t.tree,
+                             {'root': 2,
+                              2: [None, 1, 3],
+                              1: [2, None, None],
+                              3: [2, None, None]})
+
+    def test_insert_DuplicateException(self):
+        t = AVL(self.iterable, True)
+        self.assertRaises(DuplicateException, t.insert, 3)
+
+    def test_delete_random(self):
+        values = range(500)
+        shuffle(values)
+        t = AVL(values)
+        shuffle(values)
+        for i, val in enumerate(values[:400]):
+            t.delete(val, lambda: i % 2)
+            self.assertIsNone(t.find(val))
+        self.check_avl(t)
+        self.assertEqual(len(t), 100)
+        self.assertEqual(t.select(0), min(values[400:]))
+        self.assertEqual(t.get_first(), min(values[400:]))
+        self.assertEqual(t.get_last(), max(values[400:]))
+
+    def test_delete_prefix(self):
+        t = AVL(range(100), True)
+        for val in range(90):
+            t.delete(val)
+        self.check_avl(t)
+        self.assertEqual(t.get_first(), 90)
+
+    def test_pop(self):
+        t = AVL(range(100), True)
+        for val in range(50):
+            self.assertEqual(t.pop_first(), val)
+            self.assertEqual(t.pop_last(), 99 - val)
+        self.assertIsNone(t.get_first())
+        self.assertRaises(IndexError, t.pop_first)
+        self.assertEqual(t.heights, {})
+
+    def test_insert_many(self):
+        t = AVL([])
+        for i in range(0, 100, 2):
+            t.insert(i)
+        t.insert_many(range(1, 100, 2), True)
+        self.check_avl(t)
+        self.assertEqual(t.get_height(t.get_root()), 7)
+
+    def test_delete_all(self):
+        t = AVL(self.iterable, True)
+        for val in self.iterable:
+            t.delete(val)
+        self.assertIsNone(t.get_root())
+        self.assertEqual(t.heights, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
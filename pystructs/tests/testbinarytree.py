@@ -75,6 +75,14 @@ class BinTreeTest(unittest.TestCase):
                               1: [None, 0, None],
                               0: [1, None, None]})
 
+    def test_value_init(self):
+        t = BinTree([10, 20, 30], True)
+        self.assertDictEqual(t.tree,
+                             {'root': 20,
+                              20: [None, 10, 30],
+                              10: [20, None, None],
+                              30: [20, None, None]})
+
     def test_large_init(self):
         t = BinTree(self.iterable, True)
         self.assertDictEqual(t.tree,
@@ -112,6 +120,24 @@ class BinTreeTest(unittest.TestCase):
                               12: [10, 11, None],
                               11: [12, None, None]})
 
+    def test_iterator_init(self):
+        t = BinTree(iter(self.iterable), True)
+        self.assertDictEqual(t.tree, BinTree(self.iterable, True).tree)
+
+    def test_generator_init_unsorted(self):
+        t = BinTree(x for x in reversed(self.iterable))
+        self.assertDictEqual(t.tree, BinTree(self.iterable, True).tree)
+
+    def test_assume_unique_init(self):
+        t = BinTree(self.iterable, True, assume_unique=True)
+        self.assertDictEqual(t.tree, BinTree(self.iterable, True).tree)
+
+    def test_duplicate_sorted_init(self):
+        self.assertRaises(DuplicateException, BinTree, [1, 2, 2, 3], True)
+
+    def test_unhashable_init(self):
+        self.assertRaises(TypeError, BinTree, [[1], [2]], True)
+
     def test_get_loop(self):
         t = BinTree(self.iterable, True)
         self.assertEqual(t.get_loop(BinTree.LEFT, 10), 7)
@@ -196,6 +222,16 @@ class BinTreeTest(unittest.TestCase):
                               12: [10, 11, None],
                               11: [12, None, None]})
 
+    def test_delete_root_one_child(self):
+        t = BinTree([0], True)
+        t.insert(1)
+        t.insert(2)
+        t.delete(0)
+        self.assertDictEqual(t.tree,
+                             {'root': 1,
+                              1: [None, None, 2],
+                              2: [1, None, None]})
+
     def test_delete_both_childs_rightrand(self):
         t = BinTree(self.iterable, True)
         # forces random check to always pass
@@ -311,3 +347,250 @@ class BinTreeTest(unittest.TestCase):
                               9: [8, None, None],
                               12: [10, 11, None],
                               11: [12, None, None]})
+
+
+class BulkTest(unittest.TestCase):
+
+    def test_insert_many(self):
+        t = BinTree(range(0, 13, 2), True)
+        t.insert_many([11, 1, 3, 9, 5, 7])
+        self.assertDictEqual(t.tree, BinTree(range(13), True).tree)
+
+    def test_insert_many_sorted(self):
+        t = BinTree([5, 6])
+        t.insert_many(xrange(5), True)
+        self.assertDictEqual(t.tree, BinTree(range(7), True).tree)
+
+    def test_insert_many_empty_tree(self):
+        t = BinTree([])
+        t.insert_many([2, 0, 1])
+        self.assertDictEqual(t.tree, BinTree(range(3), True).tree)
+
+    def test_insert_many_DuplicateException(self):
+        t = BinTree(range(5), True)
+        self.assertRaises(DuplicateException, t.insert_many, [7, 3])
+        self.assertRaises(DuplicateException, t.insert_many, [7, 7])
+        self.assertDictEqual(t.tree, BinTree(range(5), True).tree)
+
+    def test_delete_many(self):
+        t = BinTree(range(20), True)
+        t.delete_many(range(13, 20))
+        self.assertDictEqual(t.tree, BinTree(range(13), True).tree)
+
+    @patch.object(warnings, 'warn')
+    def test_delete_many_UserWarning(self, mock_warn):
+        t = BinTree(range(5), True)
+        t.delete_many([4, 50])
+        self.assertTrue(mock_warn.called)
+        self.assertDictEqual(t.tree, BinTree(range(4), True).tree)
+
+    def test_rebuild(self):
+        t = BinTree([])
+        for val in range(13):
+            t.insert(val)
+        t._rebuild(0)
+        self.assertDictEqual(t.tree, BinTree(range(13), True).tree)
+        self.assertDictEqual(t.sizes, BinTree(range(13), True).sizes)
+
+    def test_rebuild_subtree(self):
+        t = BinTree([-1])
+        for val in range(7):
+            t.insert(val)
+        t._rebuild(0)
+        self.assertEqual(t.find(3), [-1, 1, 5])
+        self.assertEqual(t.sizes[3], 7)
+        self.assertEqual(t.sizes[-1], 8)
+        self.assertEqual(list(t), range(-1, 7))
+
+
+class OrderStatisticTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = BinTree(range(0, 26, 2), True)
+
+    def assertSizes(self, t):
+        for val in t.tree:
+            if val != 'root':
+                node = t.tree[val]
+                self.assertEqual(t.sizes[val],
+                                 1 + t.sizes.get(node[BinTree.LEFT], 0) +
+                                 t.sizes.get(node[BinTree.RIGHT], 0))
+        self.assertEqual(len(t.sizes), len(t.tree) - 1)
+
+    def test_init_sizes(self):
+        self.assertSizes(self.t)
+        self.assertEqual(len(self.t), 13)
+        self.assertEqual(len(BinTree([])), 0)
+
+    def test_rank(self):
+        self.assertEqual(self.t.rank(0), 0)
+        self.assertEqual(self.t.rank(10), 5)
+        self.assertEqual(self.t.rank(11), 6)
+        self.assertEqual(self.t.rank(-1), 0)
+        self.assertEqual(self.t.rank(100), 13)
+
+    def test_select(self):
+        self.assertEqual([self.t.select(k) for k in range(13)],
+                         range(0, 26, 2))
+        self.assertEqual(self.t.select(-1), 24)
+
+    def test_select_IndexError(self):
+        self.assertRaises(IndexError, self.t.select, 13)
+        self.assertRaises(IndexError, self.t.select, -14)
+        self.assertRaises(IndexError, BinTree([]).select, 0)
+
+    def test_insert_delete_sizes(self):
+        self.t.insert(7)
+        self.t.insert(30)
+        self.t.delete(12, lambda: 0.7)
+        self.t.delete(4, lambda: 0.4)
+        self.t.delete(30)
+        self.assertSizes(self.t)
+        self.assertEqual(len(self.t), 12)
+        self.assertEqual(self.t.rank(8), 4)
+        self.assertEqual(self.t.select(4), 8)
+
+    def test_delete_root_child_successor(self):
+        t = BinTree(range(3), True)
+        t.delete(1, lambda: 0.7)
+        self.assertDictEqual(t.tree,
+                             {'root': 2,
+                              2: [None, 0, None],
+                              0: [2, None, None]})
+        self.assertDictEqual(t.sizes, {2: 2, 0: 1})
+
+
+class IterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = BinTree(range(0, 26, 2), True)
+
+    def test_iter(self):
+        self.assertEqual(list(self.t), range(0, 26, 2))
+        self.assertEqual(list(BinTree([])), [])
+
+    def test_reversed(self):
+        self.assertEqual(list(reversed(self.t)), range(24, -1, -2))
+        self.assertEqual(list(reversed(BinTree([]))), [])
+
+    def test_iter_after_updates(self):
+        self.t.insert(5)
+        self.t.delete(12)
+        self.assertEqual(list(self.t),
+                         [0, 2, 4, 5, 6, 8, 10, 14, 16, 18, 20, 22, 24])
+
+    def test_irange(self):
+        self.assertEqual(list(self.t.irange(4, 10)), [4, 6, 8])
+        self.assertEqual(list(self.t.irange(3, 11)), [4, 6, 8, 10])
+        self.assertEqual(list(self.t.irange(None, 5)), [0, 2, 4])
+        self.assertEqual(list(self.t.irange(21)), [22, 24])
+        self.assertEqual(list(self.t.irange(30)), [])
+
+    def test_irange_inclusive(self):
+        self.assertEqual(list(self.t.irange(4, 10, (False, True))),
+                         [6, 8, 10])
+        self.assertEqual(list(self.t.irange(4, 10, (False, False))), [6, 8])
+        self.assertEqual(list(self.t.irange(4, 4, (True, True))), [4])
+
+
+class NearestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = BinTree(range(0, 26, 2), True)
+
+    def test_floor(self):
+        self.assertEqual(self.t.floor(10), 10)
+        self.assertEqual(self.t.floor(11), 10)
+        self.assertEqual(self.t.floor(100), 24)
+        self.assertIsNone(self.t.floor(-1))
+
+    def test_ceiling(self):
+        self.assertEqual(self.t.ceiling(10), 10)
+        self.assertEqual(self.t.ceiling(11), 12)
+        self.assertEqual(self.t.ceiling(-1), 0)
+        self.assertIsNone(self.t.ceiling(25))
+
+    def test_prev(self):
+        self.assertEqual(self.t.prev(12), 10)
+        self.assertEqual(self.t.prev(14), 12)
+        self.assertEqual(self.t.prev(13), 12)
+        self.assertIsNone(self.t.prev(0))
+
+    def test_next(self):
+        self.assertEqual(self.t.next(10), 12)
+        self.assertEqual(self.t.next(12), 14)
+        self.assertEqual(self.t.next(-5), 0)
+        self.assertIsNone(self.t.next(24))
+
+    def test_empty(self):
+        t = BinTree([])
+        self.assertIsNone(t.floor(1))
+        self.assertIsNone(t.ceiling(1))
+        self.assertIsNone(t.prev(1))
+        self.assertIsNone(t.next(1))
+
+
+class FirstLastTest(unittest.TestCase):
+
+    def test_empty(self):
+        t = BinTree([])
+        self.assertIsNone(t.get_first())
+        self.assertIsNone(t.get_last())
+        self.assertRaises(IndexError, t.pop_first)
+        self.assertRaises(IndexError, t.pop_last)
+
+    def test_insert(self):
+        t = BinTree([])
+        t.insert(5)
+        self.assertEqual((t.get_first(), t.get_last()), (5, 5))
+        t.insert(3)
+        t.insert(8)
+        t.insert(4)
+        self.assertEqual((t.get_first(), t.get_last()), (3, 8))
+
+    def test_delete_replacement_is_first(self):
+        t = BinTree([1, 2, 3], True)
+        # the predecessor taking the place of 2 is the minimum itself
+        t.delete(2, lambda: 0)
+        self.assertEqual((t.get_first(), t.get_last()), (1, 3))
+        t.delete(1)
+        self.assertEqual((t.get_first(), t.get_last()), (3, 3))
+        t.delete(3)
+        self.assertIsNone(t.get_first())
+
+    def test_pop(self):
+        t = BinTree(range(0, 26, 2), True)
+        self.assertEqual(t.pop_first(), 0)
+        self.assertEqual(t.pop_last(), 24)
+        self.assertEqual(t.pop_first(), 2)
+        self.assertEqual(list(t), range(4, 24, 2))
+        self.assertEqual(len(t), 10)
+        self.assertEqual(t.select(0), 4)
+
+    def test_bulk(self):
+        t = BinTree(range(10, 20), True)
+        t.insert_many([5, 25])
+        self.assertEqual((t.get_first(), t.get_last()), (5, 25))
+        t.delete_many([5, 25, 19])
+        self.assertEqual((t.get_first(), t.get_last()), (10, 18))
+        t.rebalancer().run()
+        self.assertEqual((t.get_first(), t.get_last()), (10, 18))
+
+    def test_random_against_sorted(self):
+        values = range(300)
+        shuffle(values)
+        t = BinTree([])
+        for val in values:
+            t.insert(val)
+        present = sorted(values)
+        shuffle(values)
+        for val in values[:250]:
+            t.delete(val)
+            present.remove(val)
+            self.assertEqual(t.get_first(), present[0])
+            self.assertEqual(t.get_last(), present[-1])
+        while len(present) > 0:
+            self.assertEqual(t.pop_first(), present.pop(0))
+            if len(present) > 0:
+                self.assertEqual(t.pop_last(), present.pop())
+        self.assertIsNone(t.get_root())
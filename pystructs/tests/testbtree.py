@@ -0,0 +1,148 @@
+import unittest
+import warnings
+from random import Random
+
+from pystructs.trees.binarytree import DuplicateException
+from pystructs.trees.btree import BTree
+
+
+class BTreeTest(unittest.TestCase):
+
+    def check_btree(self, t):
+        """Verifies order, fill, separators and uniform leaf depth."""
+        depths = set()
+
+        def walk(node, lo, hi, depth, is_root):
+            if node.children is None:
+                depths.add(depth)
+                size = len(node.keys)
+                values = node.keys
+            else:
+                size = len(node.children)
+                self.assertEqual(len(node.keys), size - 1)
+                values = []
+                bounds = [lo] + node.keys + [hi]
+                for i, child in enumerate(node.children):
+                    values.extend(walk(child, bounds[i], bounds[i + 1],
+                                       depth + 1, False))
+            self.assertLessEqual(size, t.order)
+            if not is_root:
+                self.assertGreaterEqual(size, t.order // 2)
+            self.assertEqual(values, sorted(values))
+            for val in node.keys:
+                if lo is not None:
+                    self.assertLessEqual(lo, val)
+                if hi is not None:
+                    self.assertLess(val, hi)
+            return values
+        values = walk(t.root, None, None, 1, True)
+        self.assertEqual(len(depths), 1)
+        self.assertEqual(depths.pop(), t.depth())
+        self.assertEqual(len(values), len(t))
+        self.assertEqual(list(t), values)
+
+    def test_init(self):
+        for n in range(60):
+            t = BTree(range(n), True, order=4)
+            self.check_btree(t)
+            self.assertEqual(list(t), range(n))
+            self.assertEqual(list(reversed(t)), range(n)[::-1])
+
+    def test_init_depth(self):
+        t = BTree(xrange(10**5), True)
+        self.assertEqual(t.depth(), 3)
+        self.check_btree(t)
+
+    def test_zero_init(self):
+        t = BTree([])
+        self.assertEqual(len(t), 0)
+        self.assertIsNone(t.get_first())
+        self.assertIsNone(t.get_last())
+        self.assertIsNone(t.find(1))
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, BTree, [5, 1, 5])
+        self.assertRaises(ValueError, BTree, [], order=3)
+
+    def test_find(self):
+        t = BTree(range(0, 100, 2), order=4)
+        self.assertEqual(t.find(0), 0)
+        self.assertEqual(t.find(42), 42)
+        self.assertIsNone(t.find(43))
+        self.assertIn(98, t)
+        self.assertNotIn(100, t)
+        self.assertEqual(t.get_first(), 0)
+        self.assertEqual(t.get_last(), 98)
+
+    def test_insert(self):
+        rand = Random(1)
+        values = range(500)
+        rand.shuffle(values)
+        t = BTree([], order=5)
+        for val in values:
+            t.insert(val)
+        self.check_btree(t)
+        self.assertEqual(list(t), range(500))
+        self.assertRaises(DuplicateException, t.insert, 7)
+        self.assertEqual(len(t), 500)
+
+    def test_delete(self):
+        rand = Random(2)
+        values = range(500)
+        t = BTree(values, True, order=4)
+        rand.shuffle(values)
+        for i, val in enumerate(values[:450]):
+            t.delete(val)
+            self.assertIsNone(t.find(val))
+            if i % 50 == 0:
+                self.check_btree(t)
+        self.check_btree(t)
+        self.assertEqual(list(t), sorted(values[450:]))
+        for val in values[450:]:
+            t.delete(val)
+        self.assertEqual(len(t), 0)
+        self.assertEqual(t.depth(), 1)
+        self.assertIsNone(t.get_first())
+
+    def test_delete_missing(self):
+        t = BTree(range(10))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete(20)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(len(t), 10)
+
+    def test_mixed(self):
+        rand = Random(3)
+        for order in (4, 5, 16):
+            t = BTree([], order=order)
+            present = set()
+            for _ in range(3000):
+                val = rand.randrange(400)
+                if val in present:
+                    t.delete(val)
+                    present.remove(val)
+                else:
+                    t.insert(val)
+                    present.add(val)
+            self.check_btree(t)
+            self.assertEqual(list(t), sorted(present))
+
+    def test_bulk(self):
+        t = BTree(range(0, 100, 2), True, order=4)
+        t.insert_many(range(1, 100, 2), True)
+        self.check_btree(t)
+        self.assertEqual(list(t), range(100))
+        self.assertRaises(DuplicateException, t.insert_many, [3, 200])
+        self.assertEqual(len(t), 100)
+        t.delete_many(range(0, 100, 3))
+        self.check_btree(t)
+        self.assertEqual(list(t), [i for i in range(100) if i % 3])
+
+    def test_nbytes(self):
+        t = BTree(xrange(10**4), True)
+        self.assertLess(t.nbytes(), 20 * len(t))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import warnings
+from mock import patch
+from random import shuffle
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.compact import CompactBinTree
+
+
+class CompactBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.iterable = range(13)
+
+    def assertSameShape(self, compact, bintree):
+        self.assertEqual(len(compact), len(bintree.tree) - 1)
+        self.assertEqual(compact.get_root(), bintree.get_root())
+        for val in bintree.tree:
+            if val != 'root':
+                self.assertSequenceEqual(compact.find(val), bintree.find(val))
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, CompactBinTree, [5, 5])
+
+    def test_zero_init(self):
+        t = CompactBinTree([])
+        self.assertIsNone(t.get_root())
+        self.assertIsNone(t.get_first())
+        self.assertEqual(len(t), 0)
+
+    def test_large_init(self):
+        values = list(self.iterable)
+        shuffle(values)
+        self.assertSameShape(CompactBinTree(values),
+                             BinTree(self.iterable, True))
+
+    def test_get_loop(self):
+        t = CompactBinTree(self.iterable, True)
+        self.assertEqual(t.get_loop(CompactBinTree.LEFT, 10), 7)
+        self.assertEqual(t.get_first(), 0)
+        self.assertEqual(t.get_last(), 12)
+
+    def test_get_loop_ValueError(self):
+        t = CompactBinTree(self.iterable, True)
+        self.assertRaises(ValueError, t.get_loop, CompactBinTree.LEFT, 50)
+
+    def test_find(self):
+        t = CompactBinTree(self.iterable, True)
+        self.assertSequenceEqual(t.find(5), [3, 4, None])
+        self.assertIsNone(t.find(50))
+
+    def test_insert_delete(self):
+        t = CompactBinTree(self.iterable, True)
+        b = BinTree(self.iterable, True)
+        for val in [13, 20, -1]:
+            t.insert(val)
+            b.insert(val)
+        for val, side in [(2, 0.7), (10, 0.7), (6, 0.4), (13, 0.4)]:
+            t.delete(val, lambda: side)
+            b.delete(val, lambda: side)
+        self.assertSameShape(t, b)
+        t.insert(2)
+        b.insert(2)
+        self.assertSameShape(t, b)
+        self.assertEqual(len(t.keys), 16)
+
+    def test_insert_DuplicateException(self):
+        t = CompactBinTree(self.iterable, True)
+        self.assertRaises(DuplicateException, t.insert, 3)
+
+    @patch.object(warnings, 'warn')
+    def test_delete_UserWarning(self, mock_warn):
+        t = CompactBinTree(self.iterable, True)
+        t.delete(50)
+        self.assertTrue(mock_warn.called)
+
+    def test_nbytes(self):
+        t = CompactBinTree(range(1000), True)
+        self.assertLessEqual(t.nbytes(), 1000 * 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
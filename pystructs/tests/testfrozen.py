@@ -0,0 +1,68 @@
+import unittest
+from random import sample
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.frozen import numpy, FrozenBinTree
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class FrozenBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = BinTree(sample(range(0, 2000, 2), 300))
+        self.f = self.t.freeze()
+        self.queries = range(-3, 2003)
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, FrozenBinTree, [5, 1, 5])
+
+    def test_scalar(self):
+        self.assertEqual(len(self.f), len(self.t))
+        self.assertEqual(list(self.f), list(self.t))
+        self.assertEqual(self.f.get_first(), self.t.get_first())
+        self.assertEqual(self.f.get_last(), self.t.get_last())
+        self.assertEqual(self.f.select(7), self.t.select(7))
+        for x in self.queries:
+            self.assertEqual(self.f.rank(x), self.t.rank(x))
+            self.assertEqual(self.f.floor(x), self.t.floor(x))
+            self.assertEqual(x in self.f, self.t.find(x) is not None)
+
+    def test_contains_many(self):
+        self.assertEqual(self.f.contains_many(self.queries).tolist(),
+                         [self.t.find(x) is not None for x in self.queries])
+
+    def test_rank_many(self):
+        self.assertEqual(self.f.rank_many(self.queries).tolist(),
+                         [self.t.rank(x) for x in self.queries])
+
+    def test_floor_many(self):
+        self.assertEqual(self.f.floor_many(self.queries).tolist(),
+                         [self.t.floor(x) for x in self.queries])
+
+    def test_inexact_TypeError(self):
+        t = BinTree([2**53 + 1, 0.5, 2**53 + 3])
+        self.assertRaises(TypeError, t.freeze)
+        self.assertRaises(TypeError, FrozenBinTree, [0, 2**63])
+        self.assertRaises(TypeError, FrozenBinTree, ['a', 'b'])
+        f = BinTree([2**53 + 1, 2**53 + 3]).freeze()
+        self.assertEqual(f.contains_many([2**53, 2**53 + 1]).tolist(),
+                         [False, True])
+        self.assertEqual(f.floor_many([2**53 + 2]).tolist(), [2**53 + 1])
+        f = FrozenBinTree([0.5, 1.5])
+        self.assertEqual(f.floor_many([1.0]).tolist(), [0.5])
+
+    def test_empty(self):
+        f = BinTree([]).freeze()
+        self.assertIsNone(f.get_first())
+        self.assertEqual(f.contains_many([1, 2]).tolist(), [False, False])
+        self.assertEqual(f.rank_many([1, 2]).tolist(), [0, 0])
+        self.assertEqual(f.floor_many([1, 2]).tolist(), [None, None])
+
+    def test_immutable(self):
+        def assign():
+            self.f.keys[0] = 1
+        self.assertRaises(ValueError, assign)
+
+
+if __name__ == '__main__':
+    unittest.main()
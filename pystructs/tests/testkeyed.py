@@ -0,0 +1,120 @@
+import unittest
+import warnings
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.keyed import KeyedBinTree
+
+
+class Record(object):
+    """Record with no ordering or hashing of its own."""
+
+    def __init__(self, id_, name):
+        self.id = id_
+        self.name = name
+
+    def __lt__(self, other):
+        raise AssertionError('Records must not be compared.')
+
+    __gt__ = __le__ = __ge__ = __lt__
+
+
+def get_id(record):
+    return record.id
+
+
+class KeyedBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [Record(i, 'r' + str(i)) for i in [5, 2, 8, 1, 9, 3]]
+        self.t = KeyedBinTree(self.records, key=get_id)
+
+    def ids(self, records):
+        return [r.id for r in records]
+
+    def test_init(self):
+        self.assertEqual(self.ids(self.t), [1, 2, 3, 5, 8, 9])
+        self.assertEqual(self.ids(reversed(self.t)), [9, 8, 5, 3, 2, 1])
+        self.assertEqual(sorted(self.t.items), [1, 2, 3, 5, 8, 9])
+        self.assertEqual(len(self.t), 6)
+        self.assertEqual(len(self.t.tree), 7)
+
+    def test_init_sorted(self):
+        records = sorted(self.records, key=get_id)
+        t = KeyedBinTree(records, key=get_id, sorted_=True)
+        self.assertEqual(t.tree, self.t.tree)
+
+    def test_init_duplicate(self):
+        self.assertRaises(DuplicateException, KeyedBinTree,
+                          [Record(1, 'a'), Record(1, 'b')], get_id)
+
+    def test_key_computed_once(self):
+        calls = []
+
+        def key(record):
+            calls.append(record)
+            return record.id
+        t = KeyedBinTree(self.records, key=key)
+        self.assertEqual(len(calls), 6)
+        t.insert(Record(4, 'r4'))
+        self.assertEqual(len(calls), 7)
+
+    def test_find(self):
+        self.assertEqual(self.t.find(8).name, 'r8')
+        self.assertEqual(self.t.find(4), None)
+
+    def test_insert(self):
+        self.t.insert(Record(4, 'r4'))
+        self.assertEqual(self.ids(self.t), [1, 2, 3, 4, 5, 8, 9])
+        self.assertEqual(self.t.find(4).name, 'r4')
+        self.assertRaises(DuplicateException, self.t.insert,
+                          Record(4, 'other'))
+        self.assertEqual(self.t.find(4).name, 'r4')
+
+    def test_delete(self):
+        self.t.delete(Record(5, None))
+        self.assertEqual(self.ids(self.t), [1, 2, 3, 8, 9])
+        self.assertEqual(self.t.find(5), None)
+        self.assertNotIn(5, self.t.tree)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.t.delete(Record(5, None))
+            self.assertEqual(len(w), 1)
+
+    def test_bulk(self):
+        self.t.insert_many([Record(7, 'r7'), Record(0, 'r0')])
+        self.assertEqual(self.ids(self.t), [0, 1, 2, 3, 5, 7, 8, 9])
+        self.t.delete_many([Record(1, None), Record(9, None)])
+        self.assertEqual(self.ids(self.t), [0, 2, 3, 5, 7, 8])
+        self.assertEqual(sorted(self.t.items), [0, 2, 3, 5, 7, 8])
+
+    def test_queries(self):
+        t = self.t
+        self.assertEqual(t.get_first().id, 1)
+        self.assertEqual(t.get_last().id, 9)
+        self.assertEqual(t.items[t.tree['root']], t.get_root())
+        self.assertEqual(t.rank(5), 3)
+        self.assertEqual(t.select(3).id, 5)
+        self.assertEqual(t.floor(4).id, 3)
+        self.assertEqual(t.ceiling(4).id, 5)
+        self.assertEqual(t.prev(5).id, 3)
+        self.assertEqual(t.next(5).id, 8)
+        self.assertEqual(t.floor(0), None)
+        self.assertEqual(t.ceiling(10), None)
+        self.assertEqual(self.ids(t.irange(2, 8)), [2, 3, 5])
+        self.assertEqual(self.ids(t.irange(2, 8, (False, True))), [3, 5, 8])
+
+    def test_empty(self):
+        t = KeyedBinTree([], key=get_id)
+        self.assertEqual(list(t), [])
+        t.insert(Record(1, 'r1'))
+        self.assertEqual(t.get_root().name, 'r1')
+        self.assertIsInstance(t, BinTree)
+
+    def test_storage_TypeError(self):
+        self.assertRaises(TypeError, self.t.dump, 'unused')
+        self.assertRaises(TypeError, KeyedBinTree.load, 'unused')
+        self.assertRaises(TypeError, self.t.freeze)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import os
+import tempfile
+import unittest
+import warnings
+from random import Random
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.lazy import LazyBinTree
+
+
+class LazyBinTreeTest(unittest.TestCase):
+
+    def test_init(self):
+        t = LazyBinTree(range(13), True)
+        self.assertEqual(t.tree, BinTree(range(13), True).tree)
+        self.assertEqual(t.dead, set())
+        self.assertRaises(ValueError, LazyBinTree, [], threshold=0)
+        self.assertRaises(ValueError, LazyBinTree, [], threshold=1)
+        self.assertRaises(DuplicateException, LazyBinTree, [1, 1])
+
+    def test_delete_marks(self):
+        t = LazyBinTree(range(10), True)
+        tree = dict((k, list(v)) if k != 'root' else (k, v)
+                    for k, v in t.tree.items())
+        sizes = dict(t.sizes)
+        t.delete(5)
+        t.delete(1)
+        # nothing moved, not even the sizes
+        self.assertEqual(t.tree, tree)
+        self.assertEqual(t.sizes, sizes)
+        self.assertEqual(t.dead, set([1, 5]))
+        self.assertEqual(len(t), 8)
+        self.assertIsNone(t.find(5))
+        self.assertIsNotNone(t.find(4))
+        self.assertEqual(list(t), [0, 2, 3, 4, 6, 7, 8, 9])
+        self.assertEqual(list(reversed(t)), [9, 8, 7, 6, 4, 3, 2, 0])
+        self.assertEqual(list(t.irange(3, 7)), [3, 4, 6])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete(5)
+            t.delete(42)
+            self.assertEqual(len(w), 2)
+        self.assertEqual(len(t), 8)
+
+    def test_neighbours_skip_dead(self):
+        t = LazyBinTree(range(10), True)
+        for val in (1, 8, 0, 9, 5):
+            t.delete(val)
+        # the ends went for real and took the dead values next to them
+        self.assertEqual(t.dead, set([5]))
+        self.assertEqual(len(t.tree), 7)
+        self.assertEqual(t.get_first(), 2)
+        self.assertEqual(t.get_last(), 7)
+        self.assertEqual(t.floor(5), 4)
+        self.assertEqual(t.ceiling(5), 6)
+        self.assertEqual(t.prev(6), 4)
+        self.assertEqual(t.next(4), 6)
+        self.assertEqual(t.next(5), 6)
+        self.assertEqual(t.prev(5.5), 4)
+        self.assertIsNone(t.floor(1))
+        self.assertIsNone(t.next(7))
+
+    def test_insert_revives(self):
+        t = LazyBinTree(range(10), True)
+        t.delete(3)
+        t.insert(3)
+        self.assertEqual(t.dead, set())
+        self.assertEqual(list(t), range(10))
+        self.assertRaises(DuplicateException, t.insert, 3)
+        t.insert(10)
+        self.assertEqual(list(t), range(11))
+
+    def test_compact_threshold(self):
+        t = LazyBinTree(range(100), True, threshold=0.25)
+        for val in range(1, 26):
+            t.delete(val)
+        self.assertEqual(t.compactions, 0)
+        self.assertEqual(len(t.tree), 101)
+        t.delete(26)
+        self.assertEqual(t.compactions, 1)
+        self.assertEqual(t.dead, set())
+        self.assertEqual(t.tree,
+                         BinTree([0] + range(27, 100), True).tree)
+        self.assertEqual(len(t), 74)
+
+    def test_delete_all(self):
+        t = LazyBinTree(range(1000), True)
+        for val in range(1, 999):
+            t.delete(val)
+        t.delete(0)
+        self.assertEqual(list(t), [999])
+        t.delete(999)
+        self.assertEqual(len(t), 0)
+        self.assertEqual(list(t), [])
+        self.assertIsNone(t.get_first())
+        self.assertIsNone(t.get_last())
+        # each compaction halves the tree
+        self.assertLessEqual(t.compactions, 11)
+        self.assertEqual(t.dead, set())
+        t.insert(5)
+        self.assertEqual(list(t), [5])
+
+    def test_rank_select(self):
+        t = LazyBinTree(range(20), True)
+        for val in range(0, 20, 3):
+            t.delete(val)
+        live = [val for val in range(20) if val % 3 != 0]
+        self.assertEqual([t.select(k) for k in range(len(live))], live)
+        self.assertEqual([t.rank(val) for val in range(21)],
+                         [sum(1 for v in live if v < val)
+                          for val in range(21)])
+        self.assertRaises(IndexError, t.select, len(live))
+        # compacted once by the first query
+        self.assertEqual(t.dead, set())
+        self.assertEqual(t.compactions, 1)
+        t.delete(10)
+        t.insert(10)
+        self.assertEqual(t.rank(11), 7)
+        self.assertEqual(t.select(6), 10)
+        self.assertEqual(t.compactions, 1)
+        self.assertTrue(t.mutating_reads)
+
+    def test_rebalance(self):
+        t = LazyBinTree([])
+        for val in range(100):
+            t.insert(val)
+        for val in range(1, 40, 2):
+            t.delete(val)
+        t.rebalancer().run()
+        self.assertEqual(t.dead, set(range(1, 40, 2)))
+        live = [val for val in range(100) if val >= 40 or val % 2 == 0]
+        self.assertEqual(list(t), live)
+        self.assertEqual(len(t), len(live))
+        self.assertEqual([t.select(k) for k in range(len(live))], live)
+
+    def test_many(self):
+        t = LazyBinTree(range(10), True)
+        t.delete(2)
+        t.delete(4)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete_many([4, 5, 6])
+            self.assertEqual(len(w), 1)
+        self.assertEqual(list(t), [0, 1, 3, 7, 8, 9])
+        self.assertEqual(t.dead, set())
+        t.delete(7)
+        t.insert_many([2, 7, 10])
+        self.assertEqual(list(t), [0, 1, 2, 3, 7, 8, 9, 10])
+        self.assertRaises(DuplicateException, t.insert_many, [3])
+
+    def test_dump_live(self):
+        t = LazyBinTree(range(10), True)
+        t.delete(4)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            t.dump(path)
+            self.assertEqual(list(LazyBinTree.load(path)),
+                             [0, 1, 2, 3, 5, 6, 7, 8, 9])
+            self.assertEqual(t.dead, set([4]))
+        finally:
+            os.remove(path)
+
+    def test_pop(self):
+        t = LazyBinTree(range(20), True)
+        for val in range(2, 19, 2):
+            t.delete(val)
+        self.assertEqual(t.pop_first(), 0)
+        self.assertEqual(t.pop_first(), 1)
+        self.assertEqual(t.pop_last(), 19)
+        self.assertEqual(t.get_first(), 3)
+        self.assertEqual(t.get_last(), 17)
+        self.assertNotIn(2, t.tree)
+        self.assertNotIn(18, t.tree)
+        self.assertEqual(list(t), range(3, 18, 2))
+        while len(t) > 0:
+            t.pop_last()
+        self.assertRaises(IndexError, t.pop_first)
+        self.assertEqual(len(t.tree), 1)
+
+    def test_mixed(self):
+        r = Random(0)
+        t = LazyBinTree([])
+        present = set()
+        for _ in range(5000):
+            val = r.randrange(500)
+            if val in present:
+                t.delete(val)
+                present.remove(val)
+            else:
+                t.insert(val)
+                present.add(val)
+            self.assertLessEqual(len(t.dead),
+                                 t.threshold * (len(t.tree) - 1))
+            self.assertEqual(t.get_first(), min(present or [None]))
+            self.assertEqual(t.get_last(), max(present or [None]))
+        self.assertEqual(list(t), sorted(present))
+        self.assertEqual(len(t), len(present))
+        live = sorted(present)
+        self.assertEqual([t.select(k) for k in range(len(live))], live)
+
+
+if __name__ == '__main__':
+    unittest.main()
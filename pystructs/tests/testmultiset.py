@@ -0,0 +1,109 @@
+import unittest
+import warnings
+from mock import patch
+from random import Random
+
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.multiset import MultiBinTree
+
+
+class MultiBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = MultiBinTree([3, 1, 3, 2, 5, 3, 1])
+
+    def assertSizes(self, t):
+        for val in t.counts:
+            node = t.tree[val]
+            self.assertEqual(t.sizes[val],
+                             t.counts[val] +
+                             t.sizes.get(node[BinTree.LEFT], 0) +
+                             t.sizes.get(node[BinTree.RIGHT], 0))
+        self.assertEqual(len(t.counts), len(t.tree) - 1)
+
+    def test_init(self):
+        self.assertEqual(self.t.counts, {1: 2, 2: 1, 3: 3, 5: 1})
+        self.assertEqual(len(self.t), 7)
+        self.assertEqual(list(self.t), [1, 1, 2, 3, 3, 3, 5])
+        self.assertEqual(list(reversed(self.t)), [5, 3, 3, 3, 2, 1, 1])
+        self.assertSizes(self.t)
+
+    def test_order_statistics(self):
+        self.assertEqual(self.t.rank(3), 3)
+        self.assertEqual(self.t.rank(4), 6)
+        self.assertEqual([self.t.select(k) for k in range(7)],
+                         [1, 1, 2, 3, 3, 3, 5])
+        self.assertRaises(IndexError, self.t.select, 7)
+
+    def test_irange(self):
+        self.assertEqual(list(self.t.irange(1, 3)), [1, 1, 2])
+
+    def test_add_count(self):
+        self.t.add(3, 2)
+        self.t.add(4)
+        self.t.insert(4)
+        self.assertEqual(self.t.count(3), 5)
+        self.assertEqual(self.t.count(4), 2)
+        self.assertEqual(self.t.count(9), 0)
+        self.assertEqual(len(self.t), 11)
+        self.assertSizes(self.t)
+
+    def test_discard(self):
+        self.t.discard(3)
+        self.assertEqual(self.t.count(3), 2)
+        self.t.discard(3, 5)
+        self.assertEqual(self.t.count(3), 0)
+        self.t.discard(9)
+        self.assertEqual(list(self.t), [1, 1, 2, 5])
+        self.assertSizes(self.t)
+
+    def test_pop(self):
+        self.assertEqual(self.t.pop_first(), 1)
+        self.assertEqual(self.t.count(1), 1)
+        self.assertEqual(self.t.pop_last(), 5)
+        self.assertEqual(self.t.get_last(), 3)
+        popped = [self.t.pop_first() for _ in range(len(self.t))]
+        self.assertEqual(popped, [1, 2, 3, 3, 3])
+        self.assertRaises(IndexError, self.t.pop_last)
+        self.assertSizes(self.t)
+
+    @patch.object(warnings, 'warn')
+    def test_delete(self, mock_warn):
+        self.t.delete(1)
+        self.assertEqual(list(self.t), [2, 3, 3, 3, 5])
+        self.t.delete(9)
+        self.assertTrue(mock_warn.called)
+
+    def test_random_against_counter(self):
+        rand = Random(1)
+        t = MultiBinTree([])
+        counts = {}
+        for i in range(2000):
+            val = rand.randrange(50)
+            n = rand.randrange(1, 4)
+            if rand.random() < 0.6:
+                t.add(val, n)
+                counts[val] = counts.get(val, 0) + n
+            else:
+                t.discard(val, n, rand.random)
+                if counts.get(val, 0) <= n:
+                    counts.pop(val, None)
+                else:
+                    counts[val] -= n
+        self.assertEqual(t.counts, counts)
+        self.assertSizes(t)
+        self.assertEqual(len(t), sum(counts.values()))
+
+    def test_bulk(self):
+        self.t.insert_many([5, 0, 5, 3])
+        self.assertEqual(list(self.t), [0, 1, 1, 2, 3, 3, 3, 3, 5, 5, 5])
+        self.t.delete_many([3, 1])
+        self.assertEqual(list(self.t), [0, 2, 5, 5, 5])
+        self.assertSizes(self.t)
+
+    def test_freeze_TypeError(self):
+        self.assertRaises(TypeError, MultiBinTree([1, 1, 2]).freeze)
+
+
+if __name__ == '__main__':
+    unittest.main()
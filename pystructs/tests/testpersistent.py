@@ -0,0 +1,83 @@
+import unittest
+import warnings
+from mock import patch
+from random import shuffle
+
+from pystructs.trees.binarytree import DuplicateException
+from pystructs.trees.persistent import (PersistentBinTree, HEIGHT, LEFT,
+                                        RIGHT)
+
+
+class PersistentBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = PersistentBinTree(range(0, 26, 2), True)
+
+    def check_balance(self, node):
+        if node is None:
+            return 0
+        left = self.check_balance(node[LEFT])
+        right = self.check_balance(node[RIGHT])
+        self.assertLessEqual(abs(left - right), 1)
+        self.assertEqual(node[HEIGHT], 1 + max(left, right))
+        return node[HEIGHT]
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, PersistentBinTree, [5, 5])
+
+    def test_init(self):
+        self.assertEqual(self.t.get_root(), 12)
+        self.assertEqual(list(self.t), range(0, 26, 2))
+        self.assertEqual(len(self.t), 13)
+
+    def test_queries(self):
+        self.assertIn(10, self.t)
+        self.assertNotIn(11, self.t)
+        self.assertEqual(self.t.get_first(), 0)
+        self.assertEqual(self.t.get_last(), 24)
+        self.assertEqual(self.t.rank(11), 6)
+        self.assertEqual(self.t.select(-1), 24)
+        self.assertEqual(self.t.floor(11), 10)
+        self.assertEqual(self.t.ceiling(11), 12)
+        self.assertEqual(list(self.t.irange(3, 11, (True, True))),
+                         [4, 6, 8, 10])
+
+    def test_snapshot_isolation(self):
+        snap = self.t.snapshot()
+        self.t.insert(5)
+        self.t.delete(12)
+        self.assertEqual(list(snap), range(0, 26, 2))
+        self.assertEqual(list(self.t),
+                         [0, 2, 4, 5, 6, 8, 10, 14, 16, 18, 20, 22, 24])
+        self.assertFalse(hasattr(snap, 'insert'))
+
+    def test_path_copy(self):
+        snap = self.t.snapshot()
+        self.t.insert(25)
+        # the untouched left subtree is shared, not copied
+        self.assertIs(snap._root[LEFT], self.t._root[LEFT])
+
+    def test_balance(self):
+        values = range(1000)
+        t = PersistentBinTree()
+        for val in values:
+            t.insert(val)
+        self.check_balance(t._root)
+        shuffle(values)
+        for val in values[:700]:
+            t.delete(val)
+        self.check_balance(t._root)
+        self.assertEqual(list(t), sorted(values[700:]))
+
+    def test_insert_DuplicateException(self):
+        self.assertRaises(DuplicateException, self.t.insert, 4)
+
+    @patch.object(warnings, 'warn')
+    def test_delete_UserWarning(self, mock_warn):
+        self.t.delete(5)
+        self.assertTrue(mock_warn.called)
+        self.assertEqual(len(self.t), 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
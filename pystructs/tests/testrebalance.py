@@ -0,0 +1,137 @@
+import threading
+import unittest
+from timeit import default_timer
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.rebalance import Rebalancer, rebalance_async
+from pystructs.trees.splay import SplayTree
+from pystructs.trees.threadsafe import ConcurrentBinTree
+
+
+def chain(n):
+    t = BinTree([])
+    for val in range(n):
+        t.insert(val)
+    return t
+
+
+class RebalancerTest(unittest.TestCase):
+
+    def test_run(self):
+        t = chain(200)
+        t.rebalancer().run()
+        self.assertDictEqual(t.tree, BinTree(range(200), True).tree)
+        self.assertDictEqual(t.sizes, BinTree(range(200), True).sizes)
+
+    def test_empty(self):
+        t = BinTree([])
+        self.assertTrue(Rebalancer(t).step())
+        self.assertEqual(t.tree, {'root': None})
+
+    def test_reads_between_steps(self):
+        t = chain(3000)
+        old = t.tree
+        r = t.rebalancer(budget_ms=0)
+        self.assertFalse(r.step())
+        while not r.done:
+            self.assertIs(t.tree, old)
+            self.assertEqual(t.get_first(), 0)
+            self.assertEqual(t.find(1), [0, None, 2])
+            r.step()
+        self.assertGreater(r.steps, 10)
+        self.assertIsNot(t.tree, old)
+        self.assertEqual(t.get_root(), 1500)
+        self.assertEqual(list(t), range(3000))
+        self.assertTrue(r.step())
+
+    def test_budget(self):
+        t = chain(3000)
+        r = t.rebalancer(budget_ms=1)
+        while not r.done:
+            start = default_timer()
+            r.step()
+            self.assertLess(default_timer() - start, 0.05)
+
+    def test_changed_tree(self):
+        t = chain(100)
+        r = t.rebalancer(budget_ms=0)
+        r.step()
+        t.insert(500)
+        self.assertRaises(RuntimeError, r.step)
+        self.assertTrue(r.done)
+        self.assertEqual(list(t), range(100) + [500])
+
+    def test_same_size_change(self):
+        # collect phase, behind and ahead of the walk, then link phase
+        for steps in (1, 3, None):
+            t = chain(3000)
+            r = t.rebalancer(budget_ms=0)
+            r.step()
+            if steps is None:
+                while r._segments is None:
+                    r.step()
+                self.assertFalse(r.done)
+            else:
+                for _ in range(steps - 1):
+                    r.step()
+            t.delete(10)
+            t.insert(5000)
+            self.assertRaises(RuntimeError, r.step)
+            self.assertTrue(r.done)
+            self.assertIsNone(t.find(10))
+            self.assertEqual(t.get_last(), 5000)
+            self.assertEqual(list(t), range(10) + range(11, 3000) + [5000])
+
+    def test_rotation(self):
+        t = SplayTree(range(3000), True)
+        r = t.rebalancer(budget_ms=0)
+        r.step()
+        t.find(2999)
+        self.assertRaises(RuntimeError, r.step)
+        self.assertEqual(list(t), range(3000))
+
+    def test_coroutine(self):
+        t = chain(2000)
+        steps = sum(1 for _ in rebalance_async(t, budget_ms=0))
+        self.assertGreater(steps, 0)
+        self.assertDictEqual(t.tree, BinTree(range(2000), True).tree)
+        t = chain(50)
+        list(t.rebalance_async())
+        self.assertEqual(t.get_root(), 25)
+
+    def test_iter(self):
+        t = chain(500)
+        for _ in t.rebalancer(budget_ms=0):
+            pass
+        self.assertEqual(t.get_root(), 250)
+
+    def test_shared(self):
+        shared = ConcurrentBinTree(chain(2000))
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                if shared.select(shared.rank(1000)) != 1000:
+                    errors.append('inconsistent')
+        reader = threading.Thread(target=read)
+        reader.start()
+        with shared.writing() as tree:
+            rebalancer = tree.rebalancer(budget_ms=0)
+        done = False
+        while not done:
+            with shared.writing():
+                done = rebalancer.step()
+        stop.set()
+        reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(shared.get_root(), 1000)
+        self.assertEqual(list(shared), range(2000))
+
+    def test_self_balancing(self):
+        self.assertRaises(TypeError, Rebalancer, AVL(range(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import warnings
+from math import log
+from random import Random
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.redblack import RedBlackTree
+
+
+class RedBlackTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.iterable = range(13)
+
+    def check_rb(self, t):
+        """Verifies ordering, parent links, sizes and the color rules."""
+        tree = t.tree
+
+        def walk(val, parent, lo, hi):
+            if val is None:
+                return 1
+            node = tree[val]
+            self.assertEqual(node[BinTree.PARENT], parent)
+            if lo is not None:
+                self.assertLess(lo, val)
+            if hi is not None:
+                self.assertLess(val, hi)
+            if t.is_red(val):
+                self.assertFalse(t.is_red(node[BinTree.LEFT]))
+                self.assertFalse(t.is_red(node[BinTree.RIGHT]))
+            left = walk(node[BinTree.LEFT], val, lo, val)
+            right = walk(node[BinTree.RIGHT], val, val, hi)
+            self.assertEqual(left, right)
+            self.assertEqual(t.sizes[val],
+                             1 + t.sizes.get(node[BinTree.LEFT], 0) +
+                             t.sizes.get(node[BinTree.RIGHT], 0))
+            return left + (0 if t.is_red(val) else 1)
+        self.assertFalse(t.is_red(tree['root']))
+        walk(tree['root'], None, None, None)
+        self.assertEqual(len(t.colors), len(tree) - 1)
+        self.assertEqual(len(t.sizes), len(tree) - 1)
+
+    def height(self, t, val):
+        if val is None:
+            return 0
+        node = t.tree[val]
+        return 1 + max(self.height(t, node[BinTree.LEFT]),
+                       self.height(t, node[BinTree.RIGHT]))
+
+    def test_init_colors(self):
+        for n in range(70):
+            t = RedBlackTree(range(n), True)
+            self.check_rb(t)
+            self.assertEqual(list(t), range(n))
+
+    def test_init_same_shape(self):
+        t = RedBlackTree(self.iterable, True)
+        self.assertEqual(t.tree, BinTree(self.iterable, True).tree)
+        self.assertEqual(t.get_root(), 6)
+
+    def test_insert_sorted(self):
+        t = RedBlackTree([])
+        for i in range(1000):
+            t.insert(i)
+        self.check_rb(t)
+        self.assertLessEqual(self.height(t, t.get_root()),
+                             2 * log(1001, 2))
+        self.assertEqual(t.get_first(), 0)
+        self.assertEqual(t.get_last(), 999)
+
+    def test_insert_rotation(self):
+        t = RedBlackTree([])
+        for i in [1, 3, 2]:
+            t.insert(i)
+        self.assertDictEqual(t.tree,
+                             {'root': 2,
+                              2: [None, 1, 3],
+                              1: [2, None, None],
+                              3: [2, None, None]})
+        self.assertEqual(t.colors, {1: RedBlackTree.RED,
+                                    2: RedBlackTree.BLACK,
+                                    3: RedBlackTree.RED})
+
+    def test_insert_DuplicateException(self):
+        t = RedBlackTree(self.iterable, True)
+        self.assertRaises(DuplicateException, t.insert, 3)
+        self.check_rb(t)
+
+    def test_delete_random(self):
+        rand = Random(3)
+        values = range(500)
+        rand.shuffle(values)
+        t = RedBlackTree(values)
+        rand.shuffle(values)
+        for i, val in enumerate(values[:400]):
+            t.delete(val, lambda: i % 2)
+            self.assertIsNone(t.find(val))
+            if i % 50 == 0:
+                self.check_rb(t)
+        self.check_rb(t)
+        self.assertEqual(len(t), 100)
+        self.assertEqual(list(t), sorted(values[400:]))
+
+    def test_mixed(self):
+        rand = Random(7)
+        t = RedBlackTree([])
+        present = set()
+        for _ in range(3000):
+            val = rand.randrange(300)
+            if val in present:
+                t.delete(val)
+                present.remove(val)
+            else:
+                t.insert(val)
+                present.add(val)
+            if len(present) > 0:
+                self.assertEqual(t.get_first(), min(present))
+                self.assertEqual(t.get_last(), max(present))
+        self.check_rb(t)
+        self.assertEqual(list(t), sorted(present))
+        while len(present) > 0:
+            self.assertEqual(t.pop_last(), max(present))
+            present.remove(max(present))
+        self.check_rb(t)
+
+    def test_delete_missing(self):
+        t = RedBlackTree(self.iterable, True)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete(20)
+            self.assertEqual(len(w), 1)
+        self.check_rb(t)
+
+    def test_delete_all(self):
+        t = RedBlackTree(self.iterable, True)
+        for val in self.iterable:
+            t.delete(val)
+            self.check_rb(t)
+        self.assertIsNone(t.get_root())
+        self.assertEqual(t.colors, {})
+
+    def test_bulk(self):
+        t = RedBlackTree(range(0, 100, 2), True)
+        t.insert_many(range(1, 100, 2), True)
+        self.check_rb(t)
+        t.delete_many(range(0, 100, 3))
+        self.check_rb(t)
+        self.assertEqual(list(t), [i for i in range(100) if i % 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+import warnings
+from math import log
+from random import Random
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.scapegoat import ScapegoatTree
+
+
+class ScapegoatTreeTest(unittest.TestCase):
+
+    def check_tree(self, t):
+        """Verifies ordering, parent links and sizes; returns the height."""
+        tree = t.tree
+
+        def walk(val, parent, lo, hi):
+            if val is None:
+                return 0
+            node = tree[val]
+            self.assertEqual(node[BinTree.PARENT], parent)
+            if lo is not None:
+                self.assertLess(lo, val)
+            if hi is not None:
+                self.assertLess(val, hi)
+            left = walk(node[BinTree.LEFT], val, lo, val)
+            right = walk(node[BinTree.RIGHT], val, val, hi)
+            self.assertEqual(t.sizes[val],
+                             1 + t.sizes.get(node[BinTree.LEFT], 0) +
+                             t.sizes.get(node[BinTree.RIGHT], 0))
+            return 1 + max(left, right)
+        height = walk(tree['root'], None, None, None)
+        self.assertEqual(len(t.sizes), len(tree) - 1)
+        return height
+
+    def assertHeight(self, t):
+        height = self.check_tree(t)
+        if len(t) > 1:
+            self.assertLessEqual(height,
+                                 log(len(t)) / -log(t.alpha) + 2)
+
+    def test_init(self):
+        t = ScapegoatTree(range(13), True)
+        self.assertEqual(t.tree, BinTree(range(13), True).tree)
+        self.assertEqual(t.max_size, 13)
+        self.assertEqual(t.rebuilds, 0)
+        self.assertRaises(ValueError, ScapegoatTree, [], alpha=0.5)
+        self.assertRaises(ValueError, ScapegoatTree, [], alpha=1)
+
+    def test_insert_sorted(self):
+        for alpha in (0.55, 0.7, 0.9):
+            t = ScapegoatTree([], alpha=alpha)
+            for val in range(1000):
+                t.insert(val)
+                if val % 97 == 0:
+                    self.assertHeight(t)
+            self.assertHeight(t)
+            self.assertEqual(list(t), range(1000))
+            self.assertGreater(t.rebuilds, 0)
+        self.assertRaises(DuplicateException, t.insert, 5)
+
+    def test_rebuild_subtree(self):
+        t = ScapegoatTree(range(0, 100, 10), True)
+        for val in range(91, 97):
+            t.insert(val)
+        self.assertEqual(t.rebuilds, 1)
+        self.assertHeight(t)
+        # the rebuild stayed below the root
+        self.assertEqual(t.get_root(), 50)
+
+    def test_delete_rebuilds(self):
+        t = ScapegoatTree(range(100), True, alpha=0.75)
+        for val in range(25):
+            t.delete(val)
+        self.assertEqual(t.rebuilds, 0)
+        t.delete(25)
+        self.assertEqual(t.rebuilds, 1)
+        self.assertEqual(t.max_size, 74)
+        self.assertHeight(t)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete(0)
+            self.assertEqual(len(w), 1)
+
+    def test_mixed(self):
+        r = Random(0)
+        t = ScapegoatTree([])
+        present = set()
+        for _ in range(5000):
+            val = r.randrange(500)
+            if val in present:
+                t.delete(val, r.random)
+                present.remove(val)
+            else:
+                t.insert(val)
+                present.add(val)
+        self.assertHeight(t)
+        self.assertEqual(list(t), sorted(present))
+
+    def test_rebuild_keeps_order_statistics(self):
+        t = ScapegoatTree([])
+        for val in range(200):
+            t.insert(val)
+        self.assertEqual([t.select(k) for k in range(200)], range(200))
+        self.assertEqual(t.rank(150), 150)
+
+    def test_load_then_insert(self):
+        t = ScapegoatTree(range(100), True)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            t.dump(path)
+            loaded = ScapegoatTree.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.max_size, 100)
+        for val in range(100, 300):
+            loaded.insert(val)
+        self.assertHeight(loaded)
+        self.assertGreater(loaded.rebuilds, 0)
+        for val in range(250):
+            loaded.delete(val)
+        self.assertEqual(list(loaded), range(250, 300))
+
+
+if __name__ == '__main__':
+    unittest.main()
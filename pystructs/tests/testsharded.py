@@ -0,0 +1,95 @@
+import unittest
+import warnings
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.sharded import ShardedBinTree
+
+
+class ShardedBinTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = ShardedBinTree(range(0, 60, 2), shards=3)
+
+    def tearDown(self):
+        self.t.close()
+
+    def test_init(self):
+        self.assertEqual(self.t.bounds, [20, 40])
+        self.assertEqual(len(self.t), 30)
+        self.assertEqual(list(self.t), range(0, 60, 2))
+        self.assertEqual(self.t.get_first(), 0)
+        self.assertEqual(self.t.get_last(), 58)
+
+    def test_shard_shape(self):
+        # every shard is the balanced tree of its own slice
+        self.assertEqual(self.t.find(20), BinTree(range(20, 40, 2)).find(20))
+        self.assertIsNone(self.t.find(21))
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, ShardedBinTree,
+                          [1, 2, 2, 3], 2)
+        self.assertRaises(DuplicateException, ShardedBinTree,
+                          [1, 1, 2, 3], 2)
+
+    def test_small_init(self):
+        with ShardedBinTree([], shards=4) as t:
+            self.assertEqual(len(t), 0)
+            self.assertIsNone(t.get_first())
+            t.insert(5)
+            self.assertEqual(list(t), [5])
+        with ShardedBinTree([3, 1], shards=4, cls=AVL) as t:
+            self.assertEqual(t.bounds, [3])
+            self.assertEqual(list(t), [1, 3])
+
+    def test_insert_delete(self):
+        self.t.insert(21)
+        self.t.insert(-1)
+        self.t.insert(100)
+        self.assertEqual(len(self.t), 33)
+        self.assertRaises(DuplicateException, self.t.insert, 21)
+        self.assertEqual(len(self.t), 33)
+        self.t.delete(40)
+        self.assertEqual(len(self.t), 32)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.t.delete(41)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(len(self.t), 32)
+        expected = sorted(set(range(0, 60, 2)) - set([40]) |
+                          set([21, -1, 100]))
+        self.assertEqual(list(self.t), expected)
+        self.assertEqual(self.t.get_first(), -1)
+        self.assertEqual(self.t.get_last(), 100)
+
+    def test_order_statistics(self):
+        for k in range(30):
+            self.assertEqual(self.t.select(k), 2 * k)
+            self.assertEqual(self.t.rank(2 * k), k)
+        self.assertEqual(self.t.rank(100), 30)
+        self.assertRaises(IndexError, self.t.select, 30)
+
+    def test_irange(self):
+        self.assertEqual(list(self.t.irange(15, 45)),
+                         range(16, 45, 2))
+        self.assertEqual(list(self.t.irange(20, 40)), range(20, 40, 2))
+        self.assertEqual(list(self.t.irange(20, 40, (False, True))),
+                         range(22, 41, 2))
+        self.assertEqual(list(self.t.irange()), range(0, 60, 2))
+        self.assertEqual(list(self.t.irange(70)), [])
+
+    def test_bulk(self):
+        self.t.insert_many(range(1, 60, 2))
+        self.assertEqual(list(self.t), range(60))
+        self.assertEqual(len(self.t), 60)
+        self.t.delete_many(range(0, 60, 3))
+        self.assertEqual(list(self.t), [i for i in range(60) if i % 3])
+        self.assertEqual(len(self.t), 40)
+        # the shard of 61 takes it although the shard of 1 refuses
+        self.assertRaises(DuplicateException, self.t.insert_many, [1, 61])
+        self.assertEqual(len(self.t), 41)
+        self.assertEqual(self.t.get_last(), 61)
+
+
+if __name__ == '__main__':
+    unittest.main()
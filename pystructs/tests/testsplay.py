@@ -0,0 +1,115 @@
+import unittest
+import warnings
+from random import Random
+
+from pystructs.trees.binarytree import BinTree, DuplicateException
+from pystructs.trees.splay import SplayTree
+
+
+class SplayTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = SplayTree(range(15), True)
+
+    def check_tree(self, t):
+        """Verifies ordering, parent links and sizes."""
+        tree = t.tree
+
+        def walk(val, parent, lo, hi):
+            if val is None:
+                return
+            node = tree[val]
+            self.assertEqual(node[BinTree.PARENT], parent)
+            if lo is not None:
+                self.assertLess(lo, val)
+            if hi is not None:
+                self.assertLess(val, hi)
+            walk(node[BinTree.LEFT], val, lo, val)
+            walk(node[BinTree.RIGHT], val, val, hi)
+            self.assertEqual(t.sizes[val],
+                             1 + t.sizes.get(node[BinTree.LEFT], 0) +
+                             t.sizes.get(node[BinTree.RIGHT], 0))
+        walk(tree['root'], None, None, None)
+        self.assertEqual(len(t.sizes), len(tree) - 1)
+
+    def test_find_splays(self):
+        for val in [0, 14, 6, 3, 11]:
+            node = self.t.find(val)
+            self.assertEqual(self.t.get_root(), val)
+            self.assertIsNone(node[BinTree.PARENT])
+            self.check_tree(self.t)
+        self.assertIsNone(self.t.find(20))
+        self.assertEqual(self.t.get_root(), 11)
+        self.assertEqual(list(self.t), range(15))
+
+    def test_zig_zig(self):
+        t = SplayTree([])
+        for val in [3, 2, 1]:
+            BinTree.insert(t, val)
+        t.splay(1)
+        self.assertDictEqual(t.tree, {'root': 1,
+                                      1: [None, None, 2],
+                                      2: [1, None, 3],
+                                      3: [2, None, None]})
+
+    def test_zig_zag(self):
+        t = SplayTree([])
+        for val in [3, 1, 2]:
+            BinTree.insert(t, val)
+        t.splay(2)
+        self.assertDictEqual(t.tree, {'root': 2,
+                                      2: [None, 1, 3],
+                                      1: [2, None, None],
+                                      3: [2, None, None]})
+
+    def test_queries_splay(self):
+        self.assertEqual(self.t.floor(4.5), 4)
+        self.assertEqual(self.t.get_root(), 4)
+        self.assertEqual(self.t.ceiling(9.5), 10)
+        self.assertEqual(self.t.get_root(), 10)
+        self.assertEqual(self.t.get_first(), 0)
+        self.assertEqual(self.t.get_root(), 0)
+        self.assertEqual(self.t.get_last(), 14)
+        self.assertEqual(self.t.get_root(), 14)
+        self.assertEqual(list(self.t.irange(5, 9)), [5, 6, 7, 8])
+        self.assertEqual(self.t.get_root(), 5)
+        self.assertEqual(self.t.rank(7), 7)
+        self.assertEqual(self.t.select(7), 7)
+        self.check_tree(self.t)
+
+    def test_insert_delete(self):
+        r = Random(0)
+        t = SplayTree([])
+        present = set()
+        for _ in range(2000):
+            val = r.randrange(200)
+            if val in present:
+                t.delete(val, r.random)
+                present.remove(val)
+            else:
+                t.insert(val)
+                self.assertEqual(t.get_root(), val)
+                present.add(val)
+        self.check_tree(t)
+        self.assertEqual(list(t), sorted(present))
+        self.assertRaises(DuplicateException, t.insert, min(present))
+
+    def test_delete_missing(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.t.delete(20)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(len(self.t), 15)
+
+    def test_sorted_access_flattens_and_recovers(self):
+        t = SplayTree([])
+        for val in range(100):
+            t.insert(val)
+        self.assertEqual(t.get_root(), 99)
+        t.find(0)
+        self.assertEqual(t.get_root(), 0)
+        self.check_tree(t)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+
+from pystructs.trees.aggregate import AggregateBinTree
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.keyed import KeyedBinTree
+from pystructs.trees.lazy import LazyBinTree
+from pystructs.trees.multiset import MultiBinTree
+from pystructs.trees.redblack import RedBlackTree
+from pystructs.trees.scapegoat import ScapegoatTree
+from pystructs.trees.splay import SplayTree
+
+
+class StatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.t = BinTree(range(13), True)
+
+    def test_disabled(self):
+        self.assertNotIn('insert', self.t.__dict__)
+        stats = self.t.stats()
+        self.assertNotIn('calls', stats)
+        self.assertEqual(stats['height'], 4)
+        self.assertEqual(stats['depths'], {1: 1, 2: 2, 3: 4, 4: 6})
+
+    def test_counts(self):
+        self.t.instrument()
+        self.t.insert(13)
+        self.t.find(5)
+        self.t.delete(10, lambda: 0.7)
+        stats = self.t.stats(shape=False)
+        self.assertEqual(stats['calls'], {'find': 1, 'insert': 1,
+                                          'delete': 1})
+        self.assertEqual(stats['comparisons'], {'find': 0, 'insert': 3,
+                                                'delete': 0})
+        # 12 and 11 down to the successor, 12, 10 and 6 up to resize
+        self.assertEqual(stats['visits'], {'find': 0, 'insert': 3,
+                                           'delete': 5})
+        self.assertNotIn('max_depth', stats)
+        self.assertEqual(list(self.t), range(10) + [11, 12, 13])
+
+    def test_delete_side(self):
+        calls = []
+        t = BinTree(range(13), True)
+        self.t.instrument(lambda *args: calls.append(args))
+        t.instrument(lambda *args: calls.append(args))
+        # the successor 7 is three nodes down from 10 and its parent three
+        # nodes below the top, the predecessor 5 two nodes down from 3
+        self.t.delete(6, lambda: 0.7)
+        t.delete(6, lambda: 0.2)
+        self.t.delete(0, lambda: 0.7)
+        self.assertEqual(calls, [('delete', 6, 0, 6), ('delete', 6, 0, 4),
+                                 ('delete', 0, 0, 3)])
+
+    def test_chain(self):
+        t = BinTree([])
+        t.instrument()
+        for val in range(10):
+            t.insert(val)
+        for val in range(9, 2, -1):
+            t.delete(val)
+        self.assertEqual(t.stats(shape=False), {
+            'calls': {'find': 0, 'insert': 10, 'delete': 7},
+            'comparisons': {'find': 0, 'insert': 45, 'delete': 0},
+            'visits': {'find': 0, 'insert': 45, 'delete': 42}})
+
+    def test_keyed(self):
+        t = KeyedBinTree([(k, str(k)) for k in range(13)],
+                         key=lambda record: record[0])
+        calls = []
+        t.instrument(lambda *args: calls.append(args))
+        t.insert((13, '13'))
+        t.delete((10, '10'), rand=lambda: 0.7)
+        self.assertEqual(calls, [('insert', (13, '13'), 3, 3),
+                                 ('delete', (10, '10'), 0, 5)])
+        self.assertEqual(t.find(13), (13, '13'))
+
+    def test_aggregate(self):
+        t = AggregateBinTree([(k, k) for k in range(13)])
+        calls = []
+        t.instrument(lambda *args: calls.append(args))
+        t.insert(13, 13)
+        t.delete(10, lambda: 0.7)
+        self.assertEqual(calls, [('insert', 13, 3, 3),
+                                 ('delete', 10, 0, 7)])
+        self.assertEqual(t.aggregate(), sum(range(14)) - 10)
+
+    def test_multiset(self):
+        t = MultiBinTree(range(13), True)
+        calls = []
+        t.instrument(lambda *args: calls.append(args))
+        t.add(13, 2)
+        t.insert(13)
+        t.discard(5, n=1)
+        t.discard(13, 2)
+        # each is one operation, add within insert is not counted again
+        self.assertEqual([call[:2] for call in calls],
+                         [('insert', 13), ('insert', 13), ('delete', 5),
+                          ('delete', 13)])
+        self.assertEqual(calls[0][2], 3)
+        self.assertEqual(t.stats(shape=False)['calls'],
+                         {'find': 0, 'insert': 2, 'delete': 2})
+        self.assertEqual(t.count(13), 1)
+        self.assertEqual(t.count(5), 0)
+
+    def test_callback(self):
+        calls = []
+        self.t.instrument(lambda *args: calls.append(args))
+        self.t.insert(20)
+        self.t.find(3)
+        self.assertEqual(calls, [('insert', 20, 3, 3), ('find', 3, 0, 0)])
+
+    def test_uninstrument(self):
+        self.t.instrument()
+        self.t.uninstrument()
+        self.t.insert(13)
+        for name in ('insert', '_descend', 'get_loop', '_resize_path'):
+            self.assertNotIn(name, self.t.__dict__)
+        self.assertNotIn('calls', self.t.stats())
+
+    def test_subclass(self):
+        t = AVL([])
+        t.instrument()
+        for i in range(100):
+            t.insert(i)
+        stats = t.stats()
+        self.assertEqual(stats['calls']['insert'], 100)
+        self.assertEqual(stats['height'], t.get_height(t.get_root()))
+        self.assertEqual(sum(stats['depths'].values()), 100)
+
+    def test_subclasses(self):
+        for cls in (AVL, LazyBinTree, RedBlackTree, ScapegoatTree,
+                    SplayTree):
+            t = cls(range(50))
+            t.instrument()
+            for i in range(50, 60):
+                t.insert(i)
+            t.find(3)
+            for i in range(0, 60, 3):
+                t.delete(i, rand=lambda: 0.7)
+            stats = t.stats(shape=False)
+            self.assertEqual(stats['calls'],
+                             {'find': 1, 'insert': 10, 'delete': 20})
+            self.assertGreaterEqual(stats['comparisons']['insert'], 10)
+            self.assertEqual(list(t), [i for i in range(60) if i % 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.multiset import MultiBinTree
+from pystructs.trees.storage import MappedBinTree
+
+
+class StorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'tree.bin')
+        self.t = BinTree(range(0, 26, 2), True)
+        self.t.insert(5)
+        self.t.delete(12)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_roundtrip(self):
+        self.t.dump(self.path)
+        t = BinTree.load(self.path)
+        self.assertDictEqual(t.tree, self.t.tree)
+        self.assertDictEqual(t.sizes, self.t.sizes)
+        self.assertEqual(os.path.getsize(self.path), 32 + 16 * 13)
+
+    def test_roundtrip_float(self):
+        t = BinTree([0.5, -1.25, 3.0])
+        t.dump(self.path)
+        self.assertDictEqual(BinTree.load(self.path).tree, t.tree)
+
+    def test_roundtrip_empty(self):
+        BinTree([]).dump(self.path)
+        self.assertDictEqual(BinTree.load(self.path).tree, {'root': None})
+        m = BinTree.load(self.path, mmap=True)
+        self.assertEqual(len(m), 0)
+        self.assertIsNone(m.get_first())
+        self.assertIsNone(m.find(1))
+        m.close()
+
+    def test_roundtrip_avl(self):
+        t = AVL(range(50), True)
+        t.dump(self.path)
+        loaded = AVL.load(self.path)
+        self.assertIsInstance(loaded, AVL)
+        self.assertDictEqual(loaded.heights, t.heights)
+
+    def test_roundtrip_multiset(self):
+        t = MultiBinTree([1, 1, 1, 2, 3, 3, 5, 7, 7, 7, 7, 9])
+        t.dump(self.path)
+        loaded = MultiBinTree.load(self.path)
+        self.assertIsInstance(loaded, MultiBinTree)
+        self.assertDictEqual(loaded.tree, t.tree)
+        self.assertDictEqual(loaded.counts, t.counts)
+        self.assertDictEqual(loaded.sizes, t.sizes)
+        self.assertEqual(list(loaded), list(t))
+        self.assertEqual(loaded.select(5), 3)
+        self.assertRaises(ValueError, BinTree.load, self.path)
+        self.assertRaises(ValueError, BinTree.load, self.path, mmap=True)
+
+    def test_plain_into_multiset(self):
+        self.t.dump(self.path)
+        loaded = MultiBinTree.load(self.path)
+        self.assertEqual(list(loaded), list(self.t))
+        loaded.add(4)
+        self.assertEqual(loaded.count(4), 2)
+
+    def test_dump_TypeError(self):
+        self.assertRaises(TypeError, BinTree(['a', 'b']).dump, self.path)
+        self.assertRaises(TypeError, BinTree([1, 2.5, 2**60 + 1]).dump,
+                          self.path)
+        self.assertRaises(TypeError, BinTree([1.0, 2]).dump, self.path)
+        self.assertRaises(TypeError, BinTree([0, 2**63]).dump, self.path)
+        self.assertRaises(TypeError, BinTree([-2**63 - 1, 0]).dump,
+                          self.path)
+
+    def test_mmap(self):
+        self.t.dump(self.path)
+        m = BinTree.load(self.path, mmap=True)
+        self.assertIsInstance(m, MappedBinTree)
+        self.assertEqual(list(m), list(self.t))
+        self.assertEqual(len(m), len(self.t))
+        self.assertEqual(m.get_root(), self.t.get_root())
+        self.assertEqual(m.get_first(), 0)
+        self.assertEqual(m.get_last(), 24)
+        for x in range(-1, 27):
+            self.assertEqual(m.find(x), self.t.find(x))
+            self.assertEqual(x in m, self.t.find(x) is not None)
+            self.assertEqual(m.rank(x), self.t.rank(x))
+            self.assertEqual(m.floor(x), self.t.floor(x))
+            self.assertEqual(m.ceiling(x), self.t.ceiling(x))
+        self.assertEqual(m.select(3), self.t.select(3))
+        m.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
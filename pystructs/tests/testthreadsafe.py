@@ -0,0 +1,187 @@
+import threading
+import time
+import unittest
+
+from pystructs.trees.avl import AVL
+from pystructs.trees.binarytree import BinTree
+from pystructs.trees.splay import SplayTree
+from pystructs.trees.threadsafe import ConcurrentBinTree, RWLock
+
+
+class RWLockTest(unittest.TestCase):
+
+    def test_shared_readers(self):
+        lock = RWLock()
+        lock.acquire_read()
+        acquired = threading.Event()
+
+        def read():
+            with lock.reading():
+                acquired.set()
+        t = threading.Thread(target=read)
+        t.start()
+        self.assertTrue(acquired.wait(5))
+        t.join()
+        lock.release_read()
+
+    def test_writer_excludes_readers(self):
+        lock = RWLock()
+        lock.acquire_read()
+        written = threading.Event()
+
+        def write():
+            with lock.writing():
+                written.set()
+        t = threading.Thread(target=write)
+        t.start()
+        self.assertFalse(written.wait(0.05))
+        lock.release_read()
+        self.assertTrue(written.wait(5))
+        t.join()
+
+    def test_waiting_writer_blocks_readers(self):
+        lock = RWLock()
+        lock.acquire_read()
+        order = []
+
+        def write():
+            with lock.writing():
+                order.append('write')
+
+        def read():
+            with lock.reading():
+                order.append('read')
+        writer = threading.Thread(target=write)
+        writer.start()
+        while lock._writers == 0:
+            pass
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.05)
+        self.assertEqual(order, [])
+        lock.release_read()
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(order, ['write', 'read'])
+
+    def test_exclusion(self):
+        lock = RWLock()
+        # readers share the lock, so they mark themselves with the
+        # single-step list operations, not a counter
+        readers = []
+        state = {'writer': False}
+        errors = []
+
+        def read():
+            for _ in range(2000):
+                with lock.reading():
+                    readers.append(None)
+                    time.sleep(0)
+                    if state['writer']:
+                        errors.append('read during write')
+                    readers.pop()
+
+        def write():
+            for _ in range(200):
+                with lock.writing():
+                    if state['writer'] or len(readers) > 0:
+                        errors.append('write during access')
+                    state['writer'] = True
+                    time.sleep(0.0005)
+                    state['writer'] = False
+        threads = ([threading.Thread(target=read) for _ in range(4)] +
+                   [threading.Thread(target=write) for _ in range(2)])
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(lock._readers, [])
+        self.assertEqual(lock._writers, 0)
+
+
+class ConcurrentBinTreeTest(unittest.TestCase):
+
+    def test_wraps_tree(self):
+        t = ConcurrentBinTree(BinTree(range(13), True))
+        self.assertSequenceEqual(t.find(5), [3, 4, None])
+        self.assertEqual(t.get_first(), 0)
+        self.assertEqual(t.get_last(), 12)
+        self.assertEqual(t.rank(5), 5)
+        self.assertEqual(len(t), 13)
+        self.assertEqual(list(t), range(13))
+
+    def test_find_copies(self):
+        tree = BinTree(range(13), True)
+        t = ConcurrentBinTree(tree)
+        node = t.find(5)
+        node[0] = 'changed'
+        self.assertSequenceEqual(tree.find(5), [3, 4, None])
+        self.assertIsNone(t.find(50))
+
+    def test_keyword_arguments(self):
+        t = ConcurrentBinTree()
+        t.insert_many([3, 1, 2], sorted_=False)
+        t.insert_many([4, 5], sorted_=True)
+        t.delete(3, rand=lambda: 0)
+        self.assertEqual(list(t), [1, 2, 4, 5])
+        self.assertEqual(t.select(k=1), 2)
+
+    def test_irange(self):
+        t = ConcurrentBinTree(BinTree(range(100), True))
+        self.assertEqual(list(t.irange(10, 15)), range(10, 15))
+        self.assertEqual(list(t.irange(10, 15, inclusive=(False, True))),
+                         range(11, 16))
+        values = t.irange(95)
+        t.insert(200)
+        self.assertEqual(list(values), range(95, 100))
+
+    def test_batch(self):
+        t = ConcurrentBinTree()
+        t.batch(inserts=[3, 1, 2], deletes=[1])
+        self.assertEqual(list(t), [2, 3])
+
+    def test_concurrent_writers(self):
+        t = ConcurrentBinTree(AVL([]))
+
+        def work(offset):
+            for i in range(offset, 2000, 4):
+                t.insert(i)
+            for i in range(offset, 1000, 4):
+                t.delete(i)
+        threads = [threading.Thread(target=work, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(list(t), range(1000, 2000))
+        with t.reading() as tree:
+            self.assertLessEqual(tree.get_height(tree.get_root()), 14)
+
+    def test_concurrent_splay_readers(self):
+        t = ConcurrentBinTree(SplayTree(range(2000), True))
+
+        def work(offset):
+            for i in range(offset, 2000, 4):
+                t.find(i)
+                t.floor(i + 0.5)
+        threads = [threading.Thread(target=work, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(20)
+            self.assertFalse(thread.is_alive())
+        with t.reading() as tree:
+            for val, node in tree.tree.items():
+                if val == 'root':
+                    continue
+                for child in node[1:]:
+                    if child is not None:
+                        self.assertEqual(tree.tree[child][0], val)
+        self.assertEqual(list(t), range(2000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import warnings
+from math import log
+from random import Random
+
+from pystructs.trees.binarytree import DuplicateException
+from pystructs.trees.treap import Treap
+
+
+class TreapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rand = Random(0).random
+
+    def check_treap(self, t):
+        """Verifies order, heap priorities and sizes; returns the height."""
+        def walk(node, lo, hi):
+            if node is None:
+                return 0, 0
+            if lo is not None:
+                self.assertLess(lo, node.val)
+            if hi is not None:
+                self.assertLess(node.val, hi)
+            for child in (node.left, node.right):
+                if child is not None:
+                    self.assertLessEqual(child.priority, node.priority)
+            l_size, l_height = walk(node.left, lo, node.val)
+            r_size, r_height = walk(node.right, node.val, hi)
+            self.assertEqual(node.size, 1 + l_size + r_size)
+            return node.size, 1 + max(l_height, r_height)
+        return walk(t.root, None, None)[1]
+
+    def test_init(self):
+        for n in range(40):
+            t = Treap(range(n), True, self.rand)
+            self.check_treap(t)
+            self.assertEqual(list(t), range(n))
+            self.assertEqual(len(t), n)
+
+    def test_init_height(self):
+        t = Treap(xrange(10**4), True, self.rand)
+        self.assertLess(self.check_treap(t), 4 * log(10**4, 2))
+
+    def test_duplicate_init(self):
+        self.assertRaises(DuplicateException, Treap, [2, 1, 2])
+
+    def test_zero_init(self):
+        t = Treap([])
+        self.assertIsNone(t.get_root())
+        self.assertIsNone(t.get_first())
+        self.assertIsNone(t.get_last())
+        self.assertEqual(list(t), [])
+
+    def test_insert_delete(self):
+        r = Random(1)
+        t = Treap([], rand=self.rand)
+        present = set()
+        for _ in range(2000):
+            val = r.randrange(300)
+            if val in present:
+                t.delete(val)
+                present.remove(val)
+            else:
+                t.insert(val)
+                present.add(val)
+        self.check_treap(t)
+        self.assertEqual(list(t), sorted(present))
+        self.assertEqual(t.get_first(), min(present))
+        self.assertEqual(t.get_last(), max(present))
+        val = min(present)
+        self.assertEqual(t.find(val), val)
+        self.assertRaises(DuplicateException, t.insert, val)
+
+    def test_delete_missing(self):
+        t = Treap(range(5))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            t.delete(9)
+            self.assertEqual(len(w), 1)
+        self.assertEqual(len(t), 5)
+
+    def test_split_join(self):
+        t = Treap(range(100), True, self.rand)
+        lower, upper = t.split(40)
+        self.assertEqual(len(t), 0)
+        self.assertEqual(list(lower), range(40))
+        self.assertEqual(list(upper), range(40, 100))
+        self.check_treap(lower)
+        self.check_treap(upper)
+        lower2, upper2 = upper.split(40.5)
+        self.assertEqual(list(lower2), [40])
+        joined = Treap.join(lower, upper2)
+        self.assertEqual(list(joined), range(40) + range(41, 100))
+        self.check_treap(joined)
+        self.assertEqual(len(lower), 0)
+        self.assertRaises(ValueError, Treap.join, joined, lower2)
+
+    def test_delete_range(self):
+        t = Treap(range(100), True, self.rand)
+        self.assertEqual(t.delete_range(10, 90), 80)
+        self.assertEqual(list(t), range(10) + range(90, 100))
+        self.assertEqual(t.delete_range(10, 90), 0)
+        self.assertEqual(t.delete_range(-5, 5), 5)
+        self.check_treap(t)
+        self.assertEqual(len(t), 15)
+
+    def test_set_operations(self):
+        r = Random(2)
+        a = set(r.sample(range(500), 200))
+        b = set(r.sample(range(500), 150))
+        for op, expected in (('union', a | b), ('intersection', a & b),
+                             ('difference', a - b)):
+            t = Treap(a, rand=self.rand)
+            other = Treap(b, rand=self.rand)
+            getattr(t, op)(other)
+            self.check_treap(t)
+            self.assertEqual(list(t), sorted(expected))
+            self.assertEqual(len(other), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,305 @@
+from operator import add
+from random import random
+
+from binarytree import BinTree, DuplicateException
+
+
+class Monoid(object):
+    """An associative combine function with its identity.
+
+    combine need not be commutative; values are always combined in key
+    order.
+
+    Public Instance Properties:
+    combine := (func) combine(a, b) of two aggregates
+    identity := the aggregate of no values
+    lift := (func) lift(val, payload) returns the aggregate of one node
+
+    """
+
+    def __init__(self, combine, identity, lift=None):
+        self.combine = combine
+        self.identity = identity
+        if lift is None:
+            lift = _payload
+        self.lift = lift
+
+
+def _payload(val, payload):
+    return payload
+
+
+def _one(val, payload):
+    return 1
+
+
+SUM = Monoid(add, 0)
+MIN = Monoid(min, float('inf'))
+MAX = Monoid(max, float('-inf'))
+COUNT = Monoid(add, 0, _one)
+
+
+class AggregateBinTree(BinTree):
+    """Binary tree of keys with payloads that answers range aggregates.
+
+    Every node caches the monoid aggregate of the payloads in its subtree.
+    The caches on the path above a change are recomputed through _update,
+    so insert and delete stay O(height), and aggregate(lo, hi) combines
+    whole subtrees along the two boundary paths of the range instead of
+    visiting each value in it.
+
+    Public Functions:
+    __init__(pairs, monoid, sorted) := makes a balanced tree of (key,
+                                       payload) pairs
+    insert(val, payload) := inserts a key with its payload
+    delete(val) := deletes a key and its payload
+    set(val, payload) := replaces the payload of a key in tree
+    aggregate(lo, hi, inclusive) := returns the aggregate of the payloads
+                                    of the keys between lo and hi
+    insert_many(pairs, sorted) := inserts pairs and rebalances the tree
+    dump(path), load(path) := raise TypeError, payloads and the monoid
+                              are not stored
+
+    Public Instance Properties:
+    monoid := the Monoid, SUM, MIN, MAX and COUNT are provided
+    payloads := dict of key to payload
+    aggregates := dict of key to the aggregate of its subtree
+
+    """
+
+    def __init__(self, pairs, monoid=SUM, sorted_=False):
+        """Makes a balanced tree from (key, payload) pairs, keys unique.
+
+        pairs := (iterable of (hashable, number-like key, payload)) starting
+                 tree
+        monoid := (Monoid) how payloads are aggregated
+        sorted := (bool) whether pairs are already sorted by key
+
+        """
+        pairs = list(pairs)
+        if not sorted_:
+            pairs.sort(key=lambda pair: pair[0])
+        self.monoid = monoid
+        self.payloads = dict(pairs)
+        if len(self.payloads) < len(pairs):
+            raise DuplicateException(
+                'Bintree assumes you are handling duplicates separately.')
+        BinTree.__init__(self, [val for val, _ in pairs], True, True)
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        iterable := (sorted sequence of unique, hashable values) new tree,
+                    each already in payloads
+
+        """
+        BinTree._build(self, iterable)
+        self._set_tree(self.tree)
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with bintree and recomputes the aggregates.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        self.aggregates = {}
+        BinTree._set_tree(self, bintree)
+
+    def _update(self, val):
+        """Recomputes the size and aggregate of val from its children.
+
+        val := (any type) the node to update
+
+        """
+        BinTree._update(self, val)
+        node = self.tree[val]
+        monoid = self.monoid
+        combine = monoid.combine
+        aggregates = self.aggregates
+        identity = monoid.identity
+        aggregates[val] = combine(
+            combine(aggregates.get(node[BinTree.LEFT], identity),
+                    monoid.lift(val, self.payloads[val])),
+            aggregates.get(node[BinTree.RIGHT], identity))
+
+    def _update_path(self, val):
+        """Recomputes val and all its ancestors."""
+        t = self.tree
+        update = self._update
+        while val is not None:
+            update(val)
+            val = t[val][BinTree.PARENT]
+
+    def insert(self, val, payload):
+        """Inserts a key with its payload.
+
+        Raises DuplicateException if the key already exists.
+
+        val := (any hashable type) the key to insert
+        payload := (any type) the payload of the key
+
+        """
+        BinTree.insert(self, val)
+        self.payloads[val] = payload
+        self._update_path(val)
+
+    def set(self, val, payload):
+        """Replaces the payload of a key in tree.
+
+        Raises KeyError if the key is not in tree.
+
+        val := (any hashable type) the key
+        payload := (any type) the new payload
+
+        """
+        if val not in self.payloads:
+            raise KeyError(val)
+        self.payloads[val] = payload
+        self._update_path(val)
+
+    def delete(self, val, rand=random):
+        """Deletes a key and its payload.
+
+        Raises a warning if the key doesn't exist.
+
+        val := (any type) the key to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        t = self.tree
+        if val not in self.payloads:
+            BinTree.delete(self, val, rand)
+            return
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        node = t[val]
+        side = rand()
+        start = node[PARENT]
+        if node[LEFT] is not None and node[RIGHT] is not None:
+            # the lowest node that changes is the old parent of the value
+            # moved into the place of val
+            if side > 0.5:
+                moved = self.get_loop(LEFT, node[RIGHT])
+            else:
+                moved = self.get_loop(RIGHT, node[LEFT])
+            start = t[moved][PARENT]
+            if start == val:
+                start = moved
+        BinTree.delete(self, val, lambda: side)
+        del self.payloads[val]
+        del self.aggregates[val]
+        self._update_path(start)
+
+    def insert_many(self, pairs, sorted_=False):
+        """Inserts (key, payload) pairs and rebuilds a balanced tree.
+
+        Raises DuplicateException, leaving the tree unchanged, if any key
+        is repeated or already in the tree.
+
+        pairs := (iterable of (hashable, number-like key, payload)) pairs to
+                 insert
+        sorted := (bool) whether pairs are already sorted by key
+
+        """
+        pairs = list(pairs)
+        if not sorted_:
+            pairs.sort(key=lambda pair: pair[0])
+        payloads = self.payloads
+        new = dict(pairs)
+        if len(new) < len(pairs) or any(val in payloads for val in new):
+            raise DuplicateException(
+                'Invalid input to insert_many. Bintree assumes you ' +
+                'are handling duplicates separately.')
+        payloads.update(new)
+        BinTree.insert_many(self, [val for val, _ in pairs], True)
+
+    def delete_many(self, iterable):
+        """Deletes all keys and rebuilds a balanced tree in O(n + m).
+
+        Raises a warning if any of the keys doesn't exist.
+
+        iterable := (any iterable of hashable values) keys to delete
+
+        """
+        drop = set(iterable)
+        BinTree.delete_many(self, drop)
+        for val in drop:
+            self.payloads.pop(val, None)
+
+    def dump(self, path):
+        """Raises TypeError; the file layout has no room for payloads."""
+        raise TypeError('An AggregateBinTree can\'t be dumped, its ' +
+                        'payloads and monoid would be lost.')
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Raises TypeError; see dump."""
+        raise TypeError('An AggregateBinTree can\'t be loaded, files ' +
+                        'hold no payloads or monoid.')
+
+    def aggregate(self, lo=None, hi=None, inclusive=(True, False)):
+        """Returns the aggregate of the payloads of keys between lo and hi.
+
+        Only the nodes on the paths to the two bounds are visited, so this
+        is O(height) whatever the number of keys in the range.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        t = self.tree
+        monoid = self.monoid
+        combine = monoid.combine
+        lift = monoid.lift
+        payloads = self.payloads
+        aggregates = self.aggregates
+        identity = monoid.identity
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        lo_inc, hi_inc = inclusive
+
+        def above_lo(val):
+            return lo is None or lo < val or (lo_inc and not val < lo)
+
+        def below_hi(val):
+            return hi is None or val < hi or (hi_inc and not hi < val)
+
+        # descends to the highest node inside the range
+        split = t['root']
+        while split is not None:
+            if not above_lo(split):
+                split = t[split][RIGHT]
+            elif not below_hi(split):
+                split = t[split][LEFT]
+            else:
+                break
+        if split is None:
+            return identity
+        # the left boundary path adds nodes and right subtrees in front
+        left = identity
+        val = t[split][LEFT]
+        while val is not None:
+            node = t[val]
+            if above_lo(val):
+                left = combine(combine(lift(val, payloads[val]),
+                                       aggregates.get(node[RIGHT], identity)),
+                               left)
+                val = node[LEFT]
+            else:
+                val = node[RIGHT]
+        # the right boundary path adds left subtrees and nodes behind
+        right = identity
+        val = t[split][RIGHT]
+        while val is not None:
+            node = t[val]
+            if below_hi(val):
+                right = combine(right,
+                                combine(aggregates.get(node[LEFT], identity),
+                                        lift(val, payloads[val])))
+                val = node[RIGHT]
+            else:
+                val = node[LEFT]
+        return combine(combine(left, lift(split, payloads[split])), right)
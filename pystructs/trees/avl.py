@@ -1,6 +1,153 @@
+import warnings
+from random import random
+
 from binarytree import BinTree
 
 
 class AVL(BinTree):
-    def __init__(self, iterable, sorted_=False):
-        pass
+    """Height-balanced binary tree for hashable, number-like types.
+
+    Keeps the heights of the two subtrees of every node within one of each
+    other by rotating on insert and delete, so every operation is
+    O(log n) regardless of the insertion order.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a balanced AVL tree
+    get_height(val) := returns height of the subtree rooted at val
+    delete(val) := deletes a value in tree and rebalances
+    insert(val) := inserts a value in tree and rebalances
+
+    Public Instance Properties:
+    heights := dict of value to subtree height (a leaf has height 1)
+
+    """
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        iterable := (sorted sequence of unique, hashable values) new tree
+
+        """
+        BinTree._build(self, iterable)
+        self.heights = {}
+        self._set_tree(self.tree)
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with bintree and recomputes sizes and heights.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        self.heights = {}
+        BinTree._set_tree(self, bintree)
+
+    def get_height(self, val):
+        """Returns the height of the subtree rooted at val.
+
+        val := (any type) the subtree root, None for an empty subtree
+
+        """
+        return self.heights.get(val, 0)
+
+    def _update(self, val):
+        """Recomputes the size and height of val from its children.
+
+        val := (any type) the node to update
+
+        """
+        BinTree._update(self, val)
+        node = self.tree[val]
+        heights = self.heights
+        heights[val] = 1 + max(heights.get(node[BinTree.LEFT], 0),
+                               heights.get(node[BinTree.RIGHT], 0))
+
+    def _rebalance(self, val):
+        """Restores sizes, heights and balance from val up to the root.
+
+        val := (any type or None) the lowest node that may be out of date
+
+        """
+        t = self.tree
+        heights = self.heights
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        while val is not None:
+            node = t[val]
+            balance = (heights.get(node[LEFT], 0) -
+                       heights.get(node[RIGHT], 0))
+            if balance > 1:
+                child = t[node[LEFT]]
+                if heights.get(child[LEFT], 0) < heights.get(child[RIGHT], 0):
+                    self._rotate(node[LEFT], LEFT)
+                val = self._rotate(val, RIGHT)
+            elif balance < -1:
+                child = t[node[RIGHT]]
+                if heights.get(child[RIGHT], 0) < heights.get(child[LEFT], 0):
+                    self._rotate(node[RIGHT], RIGHT)
+                val = self._rotate(val, LEFT)
+            else:
+                self._update(val)
+            val = t[val][PARENT]
+
+    def insert(self, val):
+        """Inserts a value into the tree and rebalances.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        BinTree.insert(self, val)
+        self.heights[val] = 1
+        self._rebalance(self.tree[val][BinTree.PARENT])
+
+    def delete(self, val, rand=random):
+        """Deletes value from the tree and rebalances.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) picks the successor (> 0.5) or the predecessor as the
+                       replacement of a node with two children
+
+        """
+        t = self.tree
+        try:
+            node = t[val]
+        except KeyError:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        self._uncache(val)
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        if node[LEFT] is None or node[RIGHT] is None:
+            if node[LEFT] is None:
+                child = node[RIGHT]
+            else:
+                child = node[LEFT]
+            start = node[PARENT]
+            self._replace(val, child)
+        else:
+            if rand() > 0.5:
+                dir_, side = LEFT, RIGHT
+            else:
+                dir_, side = RIGHT, LEFT
+            new_val = self.get_loop(dir_, node[side])
+            new_node = t[new_val]
+            if new_node[PARENT] == val:
+                start = new_val
+            else:
+                start = new_node[PARENT]
+                # splices new_val out, it has no child in dir_
+                self._replace(new_val, new_node[side])
+                new_node[side] = node[side]
+                t[node[side]][PARENT] = new_val
+            new_node[dir_] = node[dir_]
+            t[node[dir_]][PARENT] = new_val
+            self._replace(val, new_val)
+        del t[val]
+        del self.sizes[val]
+        del self.heights[val]
+        self._rebalance(start)
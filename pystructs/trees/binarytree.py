@@ -1,6 +1,5 @@
 import warnings
 from collections import deque
-from math import log
 from random import random
 
 
@@ -10,22 +9,57 @@ class BinTree(object):
     Public Functions:
     __init__(iterable, sorted) := makes a balanced BinTree
     get_root() := returns root value
-    get_first(val) := returns left-most leaf value (minimum)
-    get_last(val) := returns right-most leaf value (maximum)
+    get_first() := returns left-most leaf value (minimum) in O(1)
+    get_last() := returns right-most leaf value (maximum) in O(1)
+    pop_first() := removes and returns the minimum
+    pop_last() := removes and returns the maximum
     find(val) := returns [parent, left-child, right-child] list
     delete(val) := deletes a value in tree
     insert(val) := inserts a value in tree
+    delete_many(iterable) := deletes values and rebalances the tree
+    insert_many(iterable, sorted) := inserts values and rebalances the tree
+    rank(val) := returns the number of values less than val
+    select(k) := returns the k-th smallest value
+    len(tree) := returns the number of values in tree
+    iter(tree) := yields values in ascending order
+    reversed(tree) := yields values in descending order
+    irange(lo, hi, inclusive) := yields values between lo and hi
+    floor(x) := returns the largest value <= x
+    ceiling(x) := returns the smallest value >= x
+    prev(val) := returns the largest value < val
+    next(val) := returns the smallest value > val
+    freeze() := returns an immutable FrozenBinTree for batch queries
+    dump(path) := writes the tree to a compact binary file
+    load(path, mmap) := (classmethod) reads a tree written by dump
+    rebalancer(budget_ms) := returns a Rebalancer for step-wise rebuilds
+    rebalance_async(budget_ms) := returns a coroutine that rebuilds in steps
+    instrument(callback) := starts counting find/insert/delete costs
+    uninstrument() := stops counting
+    stats() := returns operation counters, height and depth histogram
 
     Public Static Class Properties:
     PARENT := parent index in node list
     LEFT := left-child index in node list
     RIGHT := right-child index in node list
+    mutating_reads := whether queries may change the shape of the tree
+
+    Public Instance Properties:
+    tree := dict of value to node list, plus the 'root' key
+    sizes := dict of value to the number of values in its subtree
 
     """
 
     PARENT = 0
     LEFT = 1
     RIGHT = 2
+    mutating_reads = False
+
+    _stats = None
+    # methods that instrument counts, by the operation they count as
+    _counted = {'find': 'find', 'insert': 'insert', 'delete': 'delete'}
+    # bumped by every change to the shape or the values of the tree, so
+    # work spread over several calls can tell it has been overtaken
+    _mods = 0
 
     def getmiddleindex(self, bot, top):
         """Returns middle index between [bot, top).
@@ -48,81 +82,282 @@ class BinTree(object):
                     bot) + ' and ' + str(top))
         return (bot + top) / 2
 
-    def __init__(self, iterable, sorted_=False):
+    def __init__(self, iterable, sorted_=False, assume_unique=False):
         """Makes a balanced binary tree from an iterable with no duplicates.
 
+        A sorted iterable may be any iterator; it is read once.
+
         iterable := (any sortable with hashable, number-like values) starting
                     tree
         sorted := (bool) whether iterable is already sorted
+        assume_unique := (bool) skips the duplicate check, the tree is
+                         corrupt if there are duplicates after all
 
         """
-        len_ = len(iterable)
-        if len(set(iterable)) < len_:
+        if not sorted_:
+            iterable = sorted(iterable)
+        elif not hasattr(iterable, '__getitem__') or not hasattr(
+                iterable, '__len__'):
+            iterable = list(iterable)
+        self._build(iterable)
+        if not assume_unique and len(self.sizes) < len(iterable):
             raise DuplicateException(
                 'Bintree assumes you are handling duplicates separately.')
-        if len_ == 0:
-            bintree = {'root': None}
-        elif len_ == 1:
-            bintree = {iterable[0]: [None, None, None], 'root': iterable[0]}
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        iterable := (sorted sequence of unique, hashable values) new tree
+
+        """
+        bintree = {}
+        sizes = {}
+        bintree['root'] = self._link(iterable, None, bintree, sizes)
+        self._mods += 1
+        self.tree = bintree
+        self.sizes = sizes
+        if len(iterable) > 0:
+            self._first = iterable[0]
+            self._last = iterable[-1]
         else:
-            if not sorted_:
-                iterable = sorted(iterable)
-            try:
-                bintree = {key: [None, None, None] for key in iterable}
-            except TypeError as e:
-                raise TypeError('All values in a BinTree must be hashable.' +
-                                ' At least one value is not hashable. ' +
-                                str(e))
-            # Assuming the tree is balanced, then the maximum breadth is
-            # the level (or log of size) that is not partial and the size
-            # of that level is 2**level
-            stack = deque(maxlen=2**int(log(len_, 2)))
-            getmiddleindex = self.getmiddleindex
-            root = getmiddleindex(0, len_)
-            bintree['root'] = root
-            stack.append((0, root, len_))
-            PARENT = BinTree.PARENT
-            LEFT = BinTree.LEFT
-            RIGHT = BinTree.RIGHT
-            while len(stack) > 0:
-                bot, mid, top = stack.pop()
-                # Two checks to see if the child nodes are leaves
-                try:
-                    l_mid = getmiddleindex(bot, mid)
-                except NoMiddleException:
-                    l_mid = bot
-                except EqualityException:
-                    # This should never happen.
-                    warnings.warn('Unexpected equality in left segment for' +
-                                  'values: ' + str((bot, mid, top)))
-                    l_mid = None
-                else:
-                    stack.append((bot, l_mid, mid))
-                try:
-                    r_mid = getmiddleindex(mid + 1, top)
-                except NoMiddleException:
-                    r_mid = top - 1
-                except EqualityException:
-                    r_mid = None
-                else:
-                    stack.append((mid + 1, r_mid, top))
-                # sets leaves in tree
-                bintree[iterable[mid]][LEFT] = l_mid
-                bintree[iterable[mid]][RIGHT] = r_mid
-                # sets parents in tree
-                try:
-                    l_val = iterable[l_mid]
-                except TypeError:
-                    pass
+            self._first = self._last = None
+
+    @staticmethod
+    def _link(iterable, parent, bintree, sizes):
+        """Adds a balanced subtree over iterable and returns its root.
+
+        Every segment [bot, top) of the sorted values is rooted at its
+        middle index (bot + top) // 2, as getmiddleindex computes it, with
+        the two halves around it as subtrees. Each node is created once
+        when its segment is taken off the stack. The subtree root is not
+        linked from parent.
+
+        iterable := (sorted sequence of unique, hashable values) the values
+        parent := (any type or None) parent of the subtree root
+        bintree := (dict) the node lists are added here
+        sizes := (dict) the subtree sizes are added here
+
+        """
+        len_ = len(iterable)
+        if len_ == 0:
+            return None
+        # (bot, top, parent value) of segments still to be linked
+        stack = [(0, len_, parent)]
+        pop = stack.pop
+        push = stack.append
+        try:
+            while stack:
+                bot, top, parent = pop()
+                mid = (bot + top) // 2
+                m_val = iterable[mid]
+                if bot < mid:
+                    l_val = iterable[(bot + mid) // 2]
+                    push((bot, mid, m_val))
                 else:
-                    bintree[l_val][PARENT] = mid
-                try:
-                    r_val = iterable[r_mid]
-                except TypeError:
-                    pass
+                    l_val = None
+                if mid + 1 < top:
+                    r_val = iterable[(mid + 1 + top) // 2]
+                    push((mid + 1, top, m_val))
                 else:
-                    bintree[r_val][PARENT] = mid
+                    r_val = None
+                bintree[m_val] = [parent, l_val, r_val]
+                sizes[m_val] = top - bot
+        except TypeError as e:
+            raise TypeError('All values in a BinTree must be hashable.' +
+                            ' At least one value is not hashable. ' +
+                            str(e))
+        return iterable[len_ // 2]
+
+    def _rebuild(self, val):
+        """Rebuilds the subtree rooted at val as a balanced subtree.
+
+        The values keep their place in the tree; only the shape under the
+        parent of val changes, in O(size of the subtree). The subtree keeps
+        its size, so nothing above it is updated.
+
+        val := (any type) root of the subtree to rebuild
+
+        """
+        t = self.tree
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        parent = t[val][PARENT]
+        values = []
+        stack = []
+        node = val
+        while len(stack) > 0 or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = t[node][LEFT]
+            node = stack.pop()
+            values.append(node)
+            node = t[node][RIGHT]
+        root = self._link(values, parent, t, self.sizes)
+        self._mods += 1
+        if parent is None:
+            t['root'] = root
+        elif t[parent][LEFT] == val:
+            t[parent][LEFT] = root
+        else:
+            t[parent][RIGHT] = root
+        # _link has set the sizes, only richer augmentation needs a pass
+        if type(self)._update.__func__ is not BinTree._update.__func__:
+            self._update_subtree(root)
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with bintree and recomputes augmented data.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        self._mods += 1
         self.tree = bintree
+        self.sizes = {}
+        self._update_subtree(bintree['root'])
+        if bintree['root'] is None:
+            self._first = self._last = None
+        else:
+            self._first = self.get_loop(BinTree.LEFT, 'root')
+            self._last = self.get_loop(BinTree.RIGHT, 'root')
+
+    def _update_subtree(self, val):
+        """Recomputes the augmented data of every node under val, bottom up.
+
+        val := (any type or None) root of the subtree
+
+        """
+        t = self.tree
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        order = []
+        queue = deque()
+        if val is not None:
+            queue.append(val)
+        while len(queue) > 0:
+            val = queue.popleft()
+            order.append(val)
+            node = t[val]
+            if node[LEFT] is not None:
+                queue.append(node[LEFT])
+            if node[RIGHT] is not None:
+                queue.append(node[RIGHT])
+        update = self._update
+        for val in reversed(order):
+            update(val)
+
+    def __len__(self):
+        return self.sizes.get(self.tree['root'], 0)
+
+    def rank(self, val):
+        """Returns the number of values in the tree less than val.
+
+        val := (any number-like type) the value to rank, need not be in tree
+
+        """
+        t = self.tree
+        sizes = self.sizes
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        rank = 0
+        node = t['root']
+        while node is not None:
+            if val < node:
+                node = t[node][LEFT]
+            elif node < val:
+                # the node and its left subtree, whatever the node weighs
+                rank += sizes[node] - sizes.get(t[node][RIGHT], 0)
+                node = t[node][RIGHT]
+            else:
+                return rank + sizes.get(t[node][LEFT], 0)
+        return rank
+
+    def select(self, k):
+        """Returns the k-th smallest value, counting from 0.
+
+        Negative k counts from the end, as for a list. Raises IndexError if
+        k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        t = self.tree
+        sizes = self.sizes
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        node = t['root']
+        len_ = sizes.get(node, 0)
+        if k < 0:
+            k += len_
+        if not 0 <= k < len_:
+            raise IndexError('Tree index out of range.')
+        while True:
+            left = sizes.get(t[node][LEFT], 0)
+            if k < left:
+                node = t[node][LEFT]
+                continue
+            # left subtree plus the node itself
+            k -= sizes[node] - sizes.get(t[node][RIGHT], 0)
+            if k < 0:
+                return node
+            node = t[node][RIGHT]
+
+    def insert_many(self, iterable, sorted_=False):
+        """Inserts all values and rebuilds a balanced tree in O(n + m).
+
+        Raises DuplicateException, leaving the tree unchanged, if any value
+        is repeated or already in the tree.
+
+        iterable := (any sortable with hashable, number-like values) values
+                    to insert
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if sorted_:
+            new = list(iterable)
+        else:
+            new = sorted(iterable)
+        if len(new) == 0:
+            return
+        merged = []
+        append = merged.append
+        old = BinTree.__iter__(self)
+        last = sentinel = object()
+        cur = next(old, sentinel)
+        for val in new:
+            while cur is not sentinel and cur < val:
+                append(cur)
+                cur = next(old, sentinel)
+            if cur is not sentinel and not val < cur or (
+                    last is not sentinel and not last < val):
+                raise DuplicateException(
+                    'Invalid input to insert_many. Bintree assumes you ' +
+                    'are handling duplicates separately.')
+            append(val)
+            last = val
+        if cur is not sentinel:
+            append(cur)
+            merged.extend(old)
+        self._build(merged)
+
+    def delete_many(self, iterable):
+        """Deletes all values and rebuilds a balanced tree in O(n + m).
+
+        Raises a warning if any of the values doesn't exist.
+
+        iterable := (any iterable of hashable values) values to delete
+
+        """
+        drop = set(iterable)
+        if len(drop) == 0:
+            return
+        t = self.tree
+        missing = [val for val in drop if val not in t or val == 'root']
+        if len(missing) > 0:
+            warnings.warn('Values not deleted. ' + str(missing) +
+                          ' not in tree.')
+        self._build([val for val in BinTree.__iter__(self)
+                     if val not in drop])
 
     def get_loop(self, dir_, start):
         """Finds the leaf along continuous direction from start.
@@ -146,13 +381,287 @@ class BinTree(object):
             node = t[node][dir_]
         return node
 
+    def _step(self, val, dir_):
+        """Returns the in-order neighbour of val in direction dir_.
+
+        BinTree.RIGHT gives the successor and BinTree.LEFT the predecessor,
+        None if val is the last value that way.
+
+        val := (any type) a value in the tree
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+
+        """
+        t = self.tree
+        PARENT = BinTree.PARENT
+        node = t[val]
+        if node[dir_] is not None:
+            node = node[dir_]
+            other = BinTree.LEFT + BinTree.RIGHT - dir_
+            while t[node][other] is not None:
+                node = t[node][other]
+            return node
+        parent = node[PARENT]
+        while parent is not None and t[parent][dir_] == val:
+            val = parent
+            parent = t[parent][PARENT]
+        return parent
+
+    def __iter__(self):
+        RIGHT = BinTree.RIGHT
+        step = self._step
+        val = self.tree['root']
+        if val is not None:
+            val = self.get_loop(BinTree.LEFT, val)
+        while val is not None:
+            yield val
+            val = step(val, RIGHT)
+
+    def __reversed__(self):
+        LEFT = BinTree.LEFT
+        step = self._step
+        val = self.tree['root']
+        if val is not None:
+            val = self.get_loop(BinTree.RIGHT, val)
+        while val is not None:
+            yield val
+            val = step(val, LEFT)
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Yields the values between lo and hi in ascending order.
+
+        Costs O(height) to reach the first value and amortized O(1) for each
+        following one, with no extra memory.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        RIGHT = BinTree.RIGHT
+        lo_inc, hi_inc = inclusive
+        if lo is None:
+            val = self.tree['root']
+            if val is not None:
+                val = self.get_loop(BinTree.LEFT, val)
+        else:
+            val = self._bound(lo, RIGHT, lo_inc)
+        step = self._step
+        while val is not None:
+            if hi is not None and (hi < val or not hi_inc and not val < hi):
+                return
+            yield val
+            val = step(val, RIGHT)
+
+    def _bound(self, x, dir_, inclusive):
+        """Returns the value nearest to x on the dir_ side of it.
+
+        BinTree.RIGHT looks for the smallest value above x and BinTree.LEFT
+        for the largest value below it. None if there is no such value.
+
+        x := (any number-like type) the bound, need not be in tree
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+        inclusive := (bool) whether x itself may be returned
+
+        """
+        t = self.tree
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        found = None
+        node = t['root']
+        while node is not None:
+            if node < x:
+                below = True
+            elif x < node:
+                below = False
+            elif inclusive:
+                return node
+            else:
+                below = dir_ == RIGHT
+            if below:
+                if dir_ == LEFT:
+                    found = node
+                node = t[node][RIGHT]
+            else:
+                if dir_ == RIGHT:
+                    found = node
+                node = t[node][LEFT]
+        return found
+
+    def floor(self, x):
+        """Returns the largest value less than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        return self._bound(x, BinTree.LEFT, True)
+
+    def ceiling(self, x):
+        """Returns the smallest value greater than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        return self._bound(x, BinTree.RIGHT, True)
+
+    def prev(self, val):
+        """Returns the largest value less than val, or None.
+
+        Steps through the parent links in amortized O(1) if val is in the
+        tree, otherwise descends from the root.
+
+        val := (any number-like type) the bound, need not be in tree
+
+        """
+        if val in self.tree and val != 'root':
+            return self._step(val, BinTree.LEFT)
+        return self._bound(val, BinTree.LEFT, False)
+
+    def next(self, val):
+        """Returns the smallest value greater than val, or None.
+
+        Steps through the parent links in amortized O(1) if val is in the
+        tree, otherwise descends from the root.
+
+        val := (any number-like type) the bound, need not be in tree
+
+        """
+        if val in self.tree and val != 'root':
+            return self._step(val, BinTree.RIGHT)
+        return self._bound(val, BinTree.RIGHT, False)
+
+    def freeze(self):
+        """Returns an immutable FrozenBinTree with the values of the tree.
+
+        Requires numpy.
+
+        """
+        from frozen import FrozenBinTree
+        return FrozenBinTree(list(self), True)
+
+    def dump(self, path):
+        """Writes the tree to path in a compact binary layout.
+
+        The values must be all ints that fit in 64 bits or all floats, so
+        they load back unchanged; raises TypeError otherwise.
+
+        path := (str) the file to write
+
+        """
+        from storage import dump
+        dump(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Reads a tree written by dump without sorting or rebuilding it.
+
+        With mmap a read-only MappedBinTree over the memory-mapped file is
+        returned instead, which opens in O(1) and shares its pages between
+        processes.
+
+        path := (str) the file to read
+        mmap := (bool) whether to map the file read-only
+
+        """
+        from storage import load
+        return load(path, cls, mmap)
+
+    def rebalancer(self, budget_ms=5.0):
+        """Returns a Rebalancer that rebuilds the tree in bounded steps.
+
+        The current tree stays valid for reads until the last step swaps
+        the balanced tree in. The swap is not atomic, so a tree shared
+        between threads must run the steps under its write lock; see
+        rebalance.Rebalancer.
+
+        budget_ms := (float) milliseconds of work per step
+
+        """
+        from rebalance import Rebalancer
+        return Rebalancer(self, budget_ms)
+
+    def rebalance_async(self, budget_ms=5.0):
+        """Returns a generator-based coroutine that rebuilds the tree.
+
+        It yields between steps of at most budget_ms; see
+        rebalance.rebalance_async.
+
+        budget_ms := (float) milliseconds of work per step
+
+        """
+        from rebalance import rebalance_async
+        return rebalance_async(self, budget_ms)
+
+    def instrument(self, callback=None):
+        """Starts counting comparisons and node visits of every operation.
+
+        Only this instance pays for the counting; see stats.instrument.
+
+        callback := (func) called as callback(op, val, comparisons, visits)
+                           after each find, insert and delete
+
+        """
+        from stats import instrument
+        instrument(self, callback)
+
+    def uninstrument(self):
+        """Stops counting and restores the plain operations."""
+        from stats import uninstrument
+        uninstrument(self)
+
+    def stats(self, shape=True):
+        """Returns a dict snapshot of the counters and the tree shape.
+
+        Holds 'calls', 'comparisons' and 'visits' per operation if the tree
+        is instrumented, and 'height' and 'depths' ({depth: node count}) if
+        shape is set. The shape is computed on demand in O(n).
+
+        shape := (bool) whether to include height and depth histogram
+
+        """
+        from stats import depth_histogram
+        if self._stats is None:
+            snapshot = {}
+        else:
+            snapshot = self._stats.snapshot()
+        if shape:
+            depths = depth_histogram(self)
+            snapshot['depths'] = depths
+            snapshot['height'] = max(depths) if len(depths) > 0 else 0
+        return snapshot
+
     def get_first(self):
-        """Returns the left-most leaf value (minimum)."""
-        return self.get_loop(self.LEFT, 'root')
+        """Returns the left-most leaf value (minimum), None if empty."""
+        return self._first
 
     def get_last(self):
-        """Returns the right-most leaf value (maximum)."""
-        return self.get_loop(self.RIGHT, 'root')
+        """Returns the right-most leaf value (maximum), None if empty."""
+        return self._last
+
+    def pop_first(self):
+        """Removes and returns the minimum.
+
+        Finding it is O(1); removing it costs O(height) for the subtree
+        sizes on its path. Raises IndexError if the tree is empty.
+
+        """
+        val = self.get_first()
+        if val is None:
+            raise IndexError('pop from an empty tree.')
+        self.delete(val)
+        return val
+
+    def pop_last(self):
+        """Removes and returns the maximum.
+
+        Finding it is O(1); removing it costs O(height) for the subtree
+        sizes on its path. Raises IndexError if the tree is empty.
+
+        """
+        val = self.get_last()
+        if val is None:
+            raise IndexError('pop from an empty tree.')
+        self.delete(val)
+        return val
 
     def get_root(self):
         """Returns the root of binary tree."""
@@ -192,24 +701,46 @@ class BinTree(object):
             raise DuplicateException(
                 'Invalid input to insert. Bintree assumes you' +
                 'are handling duplicates separately.')
-        PARENT = BinTree.PARENT
+        self._mods += 1
+        self.sizes[val] = 1
+        parent, dir_ = self._descend(val)
+        if dir_ is None:
+            t[parent] = val
+            self._first = self._last = val
+        else:
+            t[parent][dir_] = val
+            t[val][BinTree.PARENT] = parent
+            if val < self._first:
+                self._first = val
+            elif self._last < val:
+                self._last = val
+
+    def _descend(self, val):
+        """Walks from the root down to the place of a new value.
+
+        Adds one to the size of every node passed and returns the parent
+        and the side the value goes on, ('root', None) in an empty tree.
+        stats.instrument replaces this to count the walk.
+
+        val := (any number-like type) the value being inserted
+
+        """
+        t = self.tree
+        sizes = self.sizes
         LEFT = BinTree.LEFT
         RIGHT = BinTree.RIGHT
         dir_ = None
         parent = 'root'
         node = t['root']
         while node is not None:
+            sizes[node] += 1
             if val < node:
                 dir_ = LEFT
             else:
                 dir_ = RIGHT
             parent = node
             node = t[node][dir_]
-        if dir_ is None:
-            t[parent] = val
-        else:
-            t[parent][dir_] = val
-            t[val][PARENT] = parent
+        return parent, dir_
 
     def delete(self, val, rand=random):
         """Deletes value from the binary tree.
@@ -224,58 +755,170 @@ class BinTree(object):
 
         t = self.tree
         try:
-            node = t[val]
+            t[val]
         except KeyError:
             warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
         else:
-            PARENT = BinTree.PARENT
-            LEFT = BinTree.LEFT
-            RIGHT = BinTree.RIGHT
-            parent = node[PARENT]
-            try:
-                parentnode = t[parent]
-            except KeyError:
-                pass
+            self._uncache(val)
+            self._unlink(val, rand)
+
+    def _uncache(self, val):
+        """Moves the cached minimum or maximum off val before it goes.
+
+        The new extreme is the in-order neighbour of the old one, found in
+        amortized O(1). Every delete calls this once, so it also counts the
+        modification.
+
+        val := (any type) a value in the tree about to be removed
+
+        """
+        self._mods += 1
+        if val == self._first:
+            self._first = self._step(val, BinTree.RIGHT)
+        if val == self._last:
+            self._last = self._step(val, BinTree.LEFT)
+
+    def _unlink(self, val, rand):
+        """Removes the node of val, which must be in the tree.
+
+        val := (any type) the value to remove
+        rand := (func) picks the side of the replacement of a node with two
+                       children
+
+        """
+        t = self.tree
+        node = t[val]
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        sizes = self.sizes
+        parent = node[PARENT]
+        try:
+            parentnode = t[parent]
+        except KeyError:
+            pass
+        else:
+            if parentnode[LEFT] == val:
+                loc = LEFT
             else:
-                if parentnode[LEFT] == val:
-                    loc = LEFT
-                else:
-                    loc = RIGHT
-            if node[LEFT] is None:
-                if node[RIGHT] is None:
-                    new_node = None
-                else:
-                    new_node = node[RIGHT]
+                loc = RIGHT
+        if node[LEFT] is None or node[RIGHT] is None:
+            self._resize_path(parent, -1)
+        if node[LEFT] is None:
+            if node[RIGHT] is None:
+                new_node = None
             else:
-                if node[RIGHT] is None:
-                    new_node = node[LEFT]
-                else:
-                    # prevents degeneration caused by regularly picking
-                    # the same side
-                    if rand() > 0.5:
-                        # (direction, start_node)
-                        dir_ = (LEFT, node[RIGHT])
-                    else:
-                        dir_ = (RIGHT, node[LEFT])
-                    new_node = self.get_loop(*dir_)
-                    self.delete(new_node)
-                    t[new_node] = node
-                    # only happens if both nodes exist
-                    # don't need to check
-                    t[node[LEFT]][PARENT] = new_node
-                    t[node[RIGHT]][PARENT] = new_node
-            try:
-                parentnode[loc] = new_node
-            except NameError:
-                t['root'] = new_node
+                new_node = node[RIGHT]
+        else:
+            if node[RIGHT] is None:
+                new_node = node[LEFT]
             else:
-                try:
-                    temp = t[new_node]
-                except KeyError:
-                    pass
+                # prevents degeneration caused by regularly picking
+                # the same side
+                if rand() > 0.5:
+                    # (direction, start_node)
+                    dir_ = (LEFT, node[RIGHT])
                 else:
-                    temp[PARENT] = parent
-            del t[val]
+                    dir_ = (RIGHT, node[LEFT])
+                new_node = self.get_loop(*dir_)
+                # also shrinks the subtree sizes above new_node
+                BinTree._unlink(self, new_node, rand)
+                sizes[new_node] = sizes[val]
+                t[new_node] = node
+                # a child is gone if it was new_node itself
+                for child in (node[LEFT], node[RIGHT]):
+                    if child is not None:
+                        t[child][PARENT] = new_node
+        try:
+            parentnode[loc] = new_node
+        except NameError:
+            t['root'] = new_node
+        try:
+            temp = t[new_node]
+        except KeyError:
+            pass
+        else:
+            temp[PARENT] = parent
+        del t[val]
+        del sizes[val]
+
+    def _resize_path(self, val, delta):
+        """Adds delta to the subtree size of val and all its ancestors.
+
+        val := (any type or None) the lowest node to resize
+        delta := (int) the change in size
+
+        """
+        t = self.tree
+        sizes = self.sizes
+        PARENT = BinTree.PARENT
+        while val is not None:
+            sizes[val] += delta
+            val = t[val][PARENT]
+
+    def _update(self, val):
+        """Recomputes the augmented data of val from its children.
+
+        Subclasses that cache more per-node data extend this; it is called
+        on every node whose children change during a rotation.
+
+        val := (any type) the node to update
+
+        """
+        node = self.tree[val]
+        sizes = self.sizes
+        sizes[val] = (1 + sizes.get(node[BinTree.LEFT], 0) +
+                      sizes.get(node[BinTree.RIGHT], 0))
+
+    def _replace(self, val, new_val):
+        """Points the parent of val (or the root) at new_val.
+
+        Only the link from above is rewritten; the children of new_val are
+        left untouched.
+
+        val := (any type) the value currently in the position
+        new_val := (any type or None) the value taking over the position
+
+        """
+        t = self.tree
+        parent = t[val][BinTree.PARENT]
+        if parent is None:
+            t['root'] = new_val
+        else:
+            parentnode = t[parent]
+            if parentnode[BinTree.LEFT] == val:
+                parentnode[BinTree.LEFT] = new_val
+            else:
+                parentnode[BinTree.RIGHT] = new_val
+        if new_val is not None:
+            t[new_val][BinTree.PARENT] = parent
+
+    def _rotate(self, val, dir_):
+        """Rotates the subtree rooted at val towards dir_.
+
+        The child opposite dir_ becomes the new subtree root and is returned.
+
+        val := (any type) root of the subtree to rotate
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+
+        """
+        t = self.tree
+        PARENT = BinTree.PARENT
+        other = BinTree.LEFT + BinTree.RIGHT - dir_
+        node = t[val]
+        pivot = node[other]
+        pivotnode = t[pivot]
+        self._mods += 1
+        inner = pivotnode[dir_]
+        node[other] = inner
+        if inner is not None:
+            t[inner][PARENT] = val
+        self._replace(val, pivot)
+        pivotnode[dir_] = val
+        node[PARENT] = pivot
+        self._update(val)
+        self._update(pivot)
+        return pivot
 
 
 class DuplicateException(Exception):
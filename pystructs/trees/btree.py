@@ -0,0 +1,358 @@
+import sys
+import warnings
+from bisect import bisect_left, bisect_right
+
+from binarytree import DuplicateException
+
+
+class _Node(object):
+    """B-tree node; children is None for a leaf.
+
+    A leaf holds up to order values. An internal node holds up to order
+    children and one separator less, where keys[i] is the smallest value
+    in children[i + 1].
+
+    """
+
+    __slots__ = ('keys', 'children')
+
+    def __init__(self, keys, children=None):
+        self.keys = keys
+        self.children = children
+
+
+class BTree(object):
+    """B+ tree with a configurable fan-out for number-like types.
+
+    All values live in the leaves, each a sorted list of up to order values
+    searched with bisect; the internal nodes hold separators only. With
+    the default order of 128 a tree of 10**7 values is 4 levels deep, so a
+    lookup costs 4 bisects on short lists instead of about 24 dict
+    lookups, and a value costs little more than its list slot.
+
+    Public Functions:
+    __init__(iterable, sorted, order) := makes a packed BTree
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    find(val) := returns val if it is in the tree, else None
+    delete(val) := deletes a value in tree
+    insert(val) := inserts a value in tree
+    delete_many(iterable) := deletes values and rebuilds the tree
+    insert_many(iterable, sorted) := inserts values and rebuilds the tree
+    depth() := returns the number of levels
+    nbytes() := returns bytes used by the nodes and their lists
+    len(tree), iter(tree), reversed(tree), val in tree
+
+    Public Instance Properties:
+    order := maximum number of values in a leaf and children of a node
+
+    """
+
+    def __init__(self, iterable, sorted_=False, order=128):
+        """Makes a tree from an iterable with no duplicates.
+
+        Sorted values are bulk loaded into full leaves in O(n).
+
+        iterable := (any sortable with number-like values) starting tree
+        sorted := (bool) whether iterable is already sorted
+        order := (int) fan-out, at least 4
+
+        """
+        if order < 4:
+            raise ValueError('order must be at least 4.')
+        self.order = order
+        self._min = order // 2
+        if sorted_:
+            keys = list(iterable)
+        else:
+            keys = sorted(iterable)
+        for i in xrange(1, len(keys)):
+            if not keys[i - 1] < keys[i]:
+                raise DuplicateException(
+                    'BTree assumes you are handling duplicates separately.')
+        self._build(keys)
+
+    def _chunks(self, len_):
+        """Returns the bounds of the fewest even chunks of at most order."""
+        count = -(-len_ // self.order)
+        return [(i * len_ // count, (i + 1) * len_ // count)
+                for i in xrange(count)]
+
+    def _build(self, keys):
+        """Replaces the tree with packed leaves over keys, bottom up.
+
+        keys := (sorted list of unique values) new tree
+
+        """
+        self._len = len(keys)
+        if len(keys) == 0:
+            self.root = _Node([])
+            return
+        level = [_Node(keys[lo:hi]) for lo, hi in self._chunks(len(keys))]
+        lows = [node.keys[0] for node in level]
+        while len(level) > 1:
+            chunks = self._chunks(len(level))
+            level = [_Node(lows[lo + 1:hi], level[lo:hi])
+                     for lo, hi in chunks]
+            lows = [lows[lo] for lo, _ in chunks]
+        self.root = level[0]
+
+    def __len__(self):
+        return self._len
+
+    def depth(self):
+        """Returns the number of levels, 1 for a single leaf."""
+        depth = 1
+        node = self.root
+        while node.children is not None:
+            node = node.children[0]
+            depth += 1
+        return depth
+
+    def nbytes(self):
+        """Returns the bytes allocated for the nodes and their lists."""
+        total = 0
+        stack = [self.root]
+        while len(stack) > 0:
+            node = stack.pop()
+            total += sys.getsizeof(node) + sys.getsizeof(node.keys)
+            if node.children is not None:
+                total += sys.getsizeof(node.children)
+                stack.extend(node.children)
+        return total
+
+    def _leaf(self, val):
+        """Returns the leaf whose range contains val."""
+        node = self.root
+        while node.children is not None:
+            node = node.children[bisect_right(node.keys, val)]
+        return node
+
+    def find(self, val):
+        """Returns val if it is in the tree, else None.
+
+        val := (any type) the value to find
+
+        """
+        keys = self._leaf(val).keys
+        i = bisect_left(keys, val)
+        if i < len(keys) and keys[i] == val:
+            return keys[i]
+        return None
+
+    def __contains__(self, val):
+        return self.find(val) is not None
+
+    def get_first(self):
+        """Returns the minimum value."""
+        node = self.root
+        while node.children is not None:
+            node = node.children[0]
+        if len(node.keys) == 0:
+            return None
+        return node.keys[0]
+
+    def get_last(self):
+        """Returns the maximum value."""
+        node = self.root
+        while node.children is not None:
+            node = node.children[-1]
+        if len(node.keys) == 0:
+            return None
+        return node.keys[-1]
+
+    def __iter__(self):
+        stack = [self.root]
+        while len(stack) > 0:
+            node = stack.pop()
+            if node.children is None:
+                for val in node.keys:
+                    yield val
+            else:
+                stack.extend(reversed(node.children))
+
+    def __reversed__(self):
+        stack = [self.root]
+        while len(stack) > 0:
+            node = stack.pop()
+            if node.children is None:
+                for val in reversed(node.keys):
+                    yield val
+            else:
+                stack.extend(node.children)
+
+    def insert(self, val):
+        """Inserts a value into the tree.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any number-like type) the value to insert
+
+        """
+        path = []
+        node = self.root
+        while node.children is not None:
+            i = bisect_right(node.keys, val)
+            path.append((node, i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys, val)
+        if i < len(keys) and keys[i] == val:
+            raise DuplicateException(
+                'Invalid input to insert. BTree assumes you are handling ' +
+                'duplicates separately.')
+        keys.insert(i, val)
+        self._len += 1
+        order = self.order
+        if len(keys) <= order:
+            return
+        half = len(keys) // 2
+        new = _Node(keys[half:])
+        del keys[half:]
+        low = new.keys[0]
+        while len(path) > 0:
+            parent, i = path.pop()
+            parent.keys.insert(i, low)
+            parent.children.insert(i + 1, new)
+            if len(parent.children) <= order:
+                return
+            # splits parent, moving its middle separator up
+            half = len(parent.children) // 2
+            low = parent.keys[half - 1]
+            new = _Node(parent.keys[half:], parent.children[half:])
+            del parent.keys[half - 1:]
+            del parent.children[half:]
+        self.root = _Node([low], [self.root, new])
+
+    def delete(self, val):
+        """Deletes value from the tree.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+
+        """
+        path = []
+        node = self.root
+        while node.children is not None:
+            i = bisect_right(node.keys, val)
+            path.append((node, i))
+            node = node.children[i]
+        keys = node.keys
+        i = bisect_left(keys, val)
+        if i == len(keys) or keys[i] != val:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        del keys[i]
+        self._len -= 1
+        # separators stay valid bounds when a leaf loses a value, so only
+        # underfull nodes need fixing on the way up
+        min_ = self._min
+        while len(path) > 0:
+            if node.children is None:
+                size = len(node.keys)
+            else:
+                size = len(node.children)
+            if size >= min_:
+                return
+            parent, i = path.pop()
+            self._fix(parent, i)
+            node = parent
+        root = self.root
+        if root.children is not None and len(root.children) == 1:
+            self.root = root.children[0]
+
+    def _fix(self, parent, i):
+        """Refills the underfull child i of parent from a sibling.
+
+        A sibling above the minimum lends its nearest entry, otherwise the
+        two are merged and parent loses a child.
+
+        """
+        children = parent.children
+        node = children[i]
+        if i > 0:
+            left, right, sep = children[i - 1], node, i - 1
+        else:
+            left, right, sep = node, children[i + 1], i
+        leaf = node.children is None
+        if leaf:
+            left_size, right_size = len(left.keys), len(right.keys)
+        else:
+            left_size, right_size = len(left.children), len(right.children)
+        min_ = self._min
+        if node is right and left_size > min_:
+            if leaf:
+                right.keys.insert(0, left.keys.pop())
+                parent.keys[sep] = right.keys[0]
+            else:
+                right.keys.insert(0, parent.keys[sep])
+                right.children.insert(0, left.children.pop())
+                parent.keys[sep] = left.keys.pop()
+        elif node is left and right_size > min_:
+            if leaf:
+                left.keys.append(right.keys.pop(0))
+                parent.keys[sep] = right.keys[0]
+            else:
+                left.keys.append(parent.keys[sep])
+                left.children.append(right.children.pop(0))
+                parent.keys[sep] = right.keys.pop(0)
+        else:
+            if leaf:
+                left.keys.extend(right.keys)
+            else:
+                left.keys.append(parent.keys[sep])
+                left.keys.extend(right.keys)
+                left.children.extend(right.children)
+            del parent.keys[sep]
+            del children[sep + 1]
+
+    def insert_many(self, iterable, sorted_=False):
+        """Inserts all values and rebuilds packed leaves in O(n + m).
+
+        Raises DuplicateException, leaving the tree unchanged, if any value
+        is repeated or already in the tree.
+
+        iterable := (any sortable with number-like values) values to insert
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if sorted_:
+            new = list(iterable)
+        else:
+            new = sorted(iterable)
+        if len(new) == 0:
+            return
+        old = list(self)
+        merged = []
+        append = merged.append
+        j = 0
+        for val in new:
+            while j < len(old) and old[j] < val:
+                append(old[j])
+                j += 1
+            if (j < len(old) and not val < old[j]) or (
+                    len(merged) > 0 and not merged[-1] < val):
+                raise DuplicateException(
+                    'Invalid input to insert_many. BTree assumes you are ' +
+                    'handling duplicates separately.')
+            append(val)
+        merged.extend(old[j:])
+        self._build(merged)
+
+    def delete_many(self, iterable):
+        """Deletes all values and rebuilds packed leaves in O(n + m).
+
+        Raises a warning if any of the values doesn't exist.
+
+        iterable := (any iterable of hashable values) values to delete
+
+        """
+        drop = set(iterable)
+        if len(drop) == 0:
+            return
+        missing = [val for val in drop if val not in self]
+        if len(missing) > 0:
+            warnings.warn('Values not deleted. ' + str(missing) +
+                          ' not in tree.')
+        self._build([val for val in self if val not in drop])
@@ -0,0 +1,250 @@
+import warnings
+from array import array
+from random import random
+from struct import calcsize
+
+from binarytree import BinTree, DuplicateException
+
+NIL = -1
+
+
+class CompactBinTree(object):
+    """Binary tree with array-backed node storage for number-like types.
+
+    Nodes live in integer slots. The key of slot i is keys[i] and its links
+    are the slot indices parents[i], lefts[i] and rights[i] (NIL if
+    absent), kept in array('i') columns. There is no per-node object and
+    no hash table, so a node costs 20 bytes on a 64-bit build (one 8 byte
+    pointer in keys and three 4 byte ints), about 22 bytes with list and
+    array overallocation, against roughly 160 bytes for a BinTree node.
+    The keys themselves are shared with the caller and are not counted.
+
+    Lookups descend from the root by comparison instead of hashing, so
+    find is O(height) rather than O(1). Slots freed by delete are reused
+    by insert.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a balanced CompactBinTree
+    get_root() := returns root value
+    get_first(val) := returns left-most leaf value (minimum)
+    get_last(val) := returns right-most leaf value (maximum)
+    find(val) := returns [parent, left-child, right-child] list
+    delete(val) := deletes a value in tree
+    insert(val) := inserts a value in tree
+    nbytes() := returns bytes used by the node storage
+
+    """
+
+    LEFT = BinTree.LEFT
+    RIGHT = BinTree.RIGHT
+
+    def __init__(self, iterable, sorted_=False):
+        """Makes a balanced tree from an iterable with no duplicates.
+
+        iterable := (any sortable with number-like values) starting tree
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if sorted_:
+            keys = list(iterable)
+        else:
+            keys = sorted(iterable)
+        len_ = len(keys)
+        for i in xrange(1, len_):
+            if not keys[i - 1] < keys[i]:
+                raise DuplicateException(
+                    'CompactBinTree assumes you are handling duplicates ' +
+                    'separately.')
+        parents = array('i', [NIL]) * len_
+        lefts = array('i', [NIL]) * len_
+        rights = array('i', [NIL]) * len_
+        if len_ == 0:
+            root = NIL
+        else:
+            root = len_ // 2
+            stack = [(0, root, len_)]
+            while len(stack) > 0:
+                bot, mid, top = stack.pop()
+                if mid > bot:
+                    l_mid = (bot + mid) // 2
+                    lefts[mid] = l_mid
+                    parents[l_mid] = mid
+                    stack.append((bot, l_mid, mid))
+                if top > mid + 1:
+                    r_mid = (mid + 1 + top) // 2
+                    rights[mid] = r_mid
+                    parents[r_mid] = mid
+                    stack.append((mid + 1, r_mid, top))
+        self.keys = keys
+        self.parents = parents
+        self.lefts = lefts
+        self.rights = rights
+        self.root = root
+        self._free = []
+
+    def __len__(self):
+        return len(self.keys) - len(self._free)
+
+    def nbytes(self):
+        """Returns the bytes allocated for the node storage."""
+        return len(self.keys) * (calcsize('P') + self.parents.itemsize * 3)
+
+    def _slot(self, val):
+        """Returns the slot holding val or NIL."""
+        keys = self.keys
+        lefts = self.lefts
+        rights = self.rights
+        slot = self.root
+        while slot != NIL:
+            key = keys[slot]
+            if val < key:
+                slot = lefts[slot]
+            elif key < val:
+                slot = rights[slot]
+            else:
+                return slot
+        return NIL
+
+    def _key(self, slot):
+        if slot == NIL:
+            return None
+        return self.keys[slot]
+
+    def _links(self, dir_):
+        if dir_ == self.LEFT:
+            return self.lefts
+        return self.rights
+
+    def _loop(self, links, slot):
+        while links[slot] != NIL:
+            slot = links[slot]
+        return slot
+
+    def get_loop(self, dir_, start):
+        """Finds the leaf along continuous direction from start.
+
+        Raises a ValueError if start is not in the tree.
+
+        dir_ := (int) should use CompactBinTree.LEFT or CompactBinTree.RIGHT
+        start := (any type) start node for the path to begin
+
+        """
+        if start == 'root':
+            slot = self.root
+            if slot == NIL:
+                return None
+        else:
+            slot = self._slot(start)
+            if slot == NIL:
+                raise ValueError(str(start) + ' is not in the tree.')
+        return self.keys[self._loop(self._links(dir_), slot)]
+
+    def get_first(self):
+        """Returns the left-most leaf value (minimum)."""
+        return self.get_loop(self.LEFT, 'root')
+
+    def get_last(self):
+        """Returns the right-most leaf value (maximum)."""
+        return self.get_loop(self.RIGHT, 'root')
+
+    def get_root(self):
+        """Returns the root of binary tree."""
+        return self._key(self.root)
+
+    def find(self, val):
+        """Finds and returns the parent and children of value.
+
+        val := (any type) the value to find
+
+        """
+        slot = self._slot(val)
+        if slot == NIL:
+            return None
+        return [self._key(self.parents[slot]), self._key(self.lefts[slot]),
+                self._key(self.rights[slot])]
+
+    def insert(self, val):
+        """Inserts a value into the binary tree.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any number-like type) the value to insert
+
+        """
+        keys = self.keys
+        lefts = self.lefts
+        rights = self.rights
+        parent = NIL
+        links = None
+        slot = self.root
+        while slot != NIL:
+            key = keys[slot]
+            if val < key:
+                links = lefts
+            elif key < val:
+                links = rights
+            else:
+                raise DuplicateException(
+                    'Invalid input to insert. CompactBinTree assumes you ' +
+                    'are handling duplicates separately.')
+            parent = slot
+            slot = links[slot]
+        if len(self._free) > 0:
+            slot = self._free.pop()
+            keys[slot] = val
+            self.parents[slot] = parent
+        else:
+            slot = len(keys)
+            keys.append(val)
+            self.parents.append(parent)
+            lefts.append(NIL)
+            rights.append(NIL)
+        if links is None:
+            self.root = slot
+        else:
+            links[parent] = slot
+
+    def _replace(self, slot, new_slot):
+        """Points the parent of slot (or the root) at new_slot."""
+        parent = self.parents[slot]
+        if parent == NIL:
+            self.root = new_slot
+        elif self.lefts[parent] == slot:
+            self.lefts[parent] = new_slot
+        else:
+            self.rights[parent] = new_slot
+        if new_slot != NIL:
+            self.parents[new_slot] = parent
+
+    def delete(self, val, rand=random):
+        """Deletes value from the binary tree.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        slot = self._slot(val)
+        if slot == NIL:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        lefts = self.lefts
+        rights = self.rights
+        if lefts[slot] != NIL and rights[slot] != NIL:
+            # prevents degeneration caused by regularly picking
+            # the same side
+            if rand() > 0.5:
+                victim = self._loop(lefts, rights[slot])
+            else:
+                victim = self._loop(rights, lefts[slot])
+            self.keys[slot] = self.keys[victim]
+            slot = victim
+        if lefts[slot] == NIL:
+            self._replace(slot, rights[slot])
+        else:
+            self._replace(slot, lefts[slot])
+        self.keys[slot] = None
+        self.parents[slot] = lefts[slot] = rights[slot] = NIL
+        self._free.append(slot)
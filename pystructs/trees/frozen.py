@@ -0,0 +1,163 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from binarytree import DuplicateException
+from storage import _typecode
+
+# numpy types of the array typecodes of storage._typecode
+DTYPES = {'q': 'int64', 'd': 'float64'}
+
+
+class FrozenBinTree(object):
+    """Immutable NumPy-backed tree for batch queries on number-like types.
+
+    The values are kept in one contiguous sorted array. That array is the
+    implicit form of the balanced tree BinTree builds: the middle index of
+    [bot, top) is the root of that segment and the halves on either side
+    are its subtrees, so a binary search walks exactly the same nodes as a
+    descent of the balanced tree, without any pointers. The *_many methods
+    run that search for a whole query array at once inside NumPy
+    (numpy.searchsorted), with no per-key Python overhead.
+
+    The values must be all ints that fit in 64 bits or all floats, the
+    same as for dump, so that the array holds each of them exactly and
+    the batch queries agree with the scalar ones. A NumPy array is taken
+    with its own dtype.
+
+    Requires NumPy.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a FrozenBinTree
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    rank(x) := returns the number of values less than x
+    select(k) := returns the k-th smallest value
+    floor(x) := returns the largest value <= x
+    contains_many(arr) := returns bool array of x in tree for x in arr
+    rank_many(arr) := returns int array of rank(x) for x in arr
+    floor_many(arr) := returns masked array of floor(x) for x in arr
+
+    Public Instance Properties:
+    keys := read-only sorted numpy array of the values
+
+    """
+
+    def __init__(self, iterable, sorted_=False):
+        """Makes a frozen tree from an iterable with no duplicates.
+
+        Raises TypeError for values that no int64 or float64 array holds
+        exactly.
+
+        iterable := (any sortable with number-like values) the values
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if numpy is None:
+            raise ImportError('FrozenBinTree requires numpy.')
+        if isinstance(iterable, numpy.ndarray):
+            keys = numpy.array(iterable)
+        else:
+            values = list(iterable)
+            keys = numpy.array(values, DTYPES[_typecode(values)])
+        if not sorted_:
+            keys.sort()
+        if len(keys) > 1 and (keys[1:] == keys[:-1]).any():
+            raise DuplicateException(
+                'FrozenBinTree assumes you are handling duplicates ' +
+                'separately.')
+        keys.flags.writeable = False
+        self.keys = keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys.tolist())
+
+    def __contains__(self, x):
+        keys = self.keys
+        i = keys.searchsorted(x)
+        return i < len(keys) and keys.item(i) == x
+
+    def get_first(self):
+        """Returns the minimum value."""
+        if len(self.keys) == 0:
+            return None
+        return self.keys.item(0)
+
+    def get_last(self):
+        """Returns the maximum value."""
+        if len(self.keys) == 0:
+            return None
+        return self.keys.item(-1)
+
+    def rank(self, x):
+        """Returns the number of values in the tree less than x.
+
+        x := (any number-like type) the value to rank, need not be in tree
+
+        """
+        return int(self.keys.searchsorted(x))
+
+    def select(self, k):
+        """Returns the k-th smallest value, counting from 0.
+
+        Raises IndexError if k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        if not -len(self.keys) <= k < len(self.keys):
+            raise IndexError('Tree index out of range.')
+        return self.keys.item(k)
+
+    def floor(self, x):
+        """Returns the largest value less than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        i = self.keys.searchsorted(x, 'right')
+        if i == 0:
+            return None
+        return self.keys.item(i - 1)
+
+    def contains_many(self, arr):
+        """Returns a bool array telling which values of arr are in the tree.
+
+        arr := (array-like of number-like values) the queries
+
+        """
+        keys = self.keys
+        arr = numpy.asarray(arr)
+        if len(keys) == 0:
+            return numpy.zeros(arr.shape, dtype=bool)
+        idx = keys.searchsorted(arr)
+        found = keys[numpy.minimum(idx, len(keys) - 1)] == arr
+        found &= idx < len(keys)
+        return found
+
+    def rank_many(self, arr):
+        """Returns an int array with the rank of each value of arr.
+
+        arr := (array-like of number-like values) the queries
+
+        """
+        return self.keys.searchsorted(numpy.asarray(arr))
+
+    def floor_many(self, arr):
+        """Returns the floor of each value of arr as a masked array.
+
+        Entries without a floor (where floor returns None) are masked.
+
+        arr := (array-like of number-like values) the queries
+
+        """
+        keys = self.keys
+        idx = keys.searchsorted(numpy.asarray(arr), 'right') - 1
+        missing = idx < 0
+        if len(keys) == 0:
+            return numpy.ma.masked_all(idx.shape, dtype=keys.dtype)
+        return numpy.ma.array(keys[numpy.maximum(idx, 0)], mask=missing)
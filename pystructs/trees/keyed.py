@@ -0,0 +1,199 @@
+from operator import itemgetter
+from random import random
+
+from binarytree import BinTree
+
+
+class KeyedBinTree(BinTree):
+    """Binary tree of arbitrary records ordered by a key function.
+
+    key(record) is computed once per record and the node is stored under
+    that key, so every descent compares the cached keys directly and the
+    records need neither __lt__ nor __hash__. Keys must be hashable,
+    number-like and unique.
+
+    Records go into insert/delete/insert_many/delete_many; queries such as
+    find, rank, floor and irange take key values, as bisect does with
+    key=, and all functions that return values return records.
+
+    Public Functions:
+    __init__(iterable, key, sorted) := makes a balanced KeyedBinTree
+    find(k) := returns the record with key k, or None
+    dump(path), load(path) := raise TypeError, records are not stored
+    freeze() := raises TypeError, a FrozenBinTree holds no records
+    plus the functions of BinTree
+
+    Public Instance Properties:
+    key := the key function
+    items := dict of key to record
+
+    """
+
+    def __init__(self, iterable, key, sorted_=False):
+        """Makes a balanced tree of records with no duplicate keys.
+
+        iterable := (any iterable) starting records
+        key := (func) returns the sort key of a record
+        sorted := (bool) whether iterable is already sorted by key
+
+        """
+        keyed = [(key(record), record) for record in iterable]
+        if not sorted_:
+            keyed.sort(key=itemgetter(0))
+        BinTree.__init__(self, [k for k, _ in keyed], True)
+        self.key = key
+        self.items = dict(keyed)
+
+    def dump(self, path):
+        """Raises TypeError; the file layout has no room for records."""
+        raise TypeError('A KeyedBinTree can\'t be dumped, its records ' +
+                        'would be lost.')
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Raises TypeError; see dump."""
+        raise TypeError('A KeyedBinTree can\'t be loaded, files hold no ' +
+                        'records.')
+
+    def freeze(self):
+        """Raises TypeError; a FrozenBinTree holds numbers, not records."""
+        raise TypeError('A KeyedBinTree can\'t be frozen, its records ' +
+                        'would be lost.')
+
+    def _record(self, k):
+        if k is None:
+            return None
+        return self.items[k]
+
+    def _records(self, keys):
+        items = self.items
+        for k in keys:
+            yield items[k]
+
+    def find(self, k):
+        """Returns the record with key k, or None.
+
+        k := (any hashable type) the key to find
+
+        """
+        return self.items.get(k)
+
+    def insert(self, record):
+        """Inserts a record into the tree.
+
+        Raises DuplicateException if a record with the same key exists.
+
+        record := (any type) the record to insert
+
+        """
+        k = self.key(record)
+        BinTree.insert(self, k)
+        self.items[k] = record
+
+    def delete(self, record, rand=random):
+        """Deletes the record with the key of record from the tree.
+
+        Raises a warning if there is no such record.
+
+        record := (any type) the record to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        k = self.key(record)
+        BinTree.delete(self, k, rand)
+        self.items.pop(k, None)
+
+    def insert_many(self, iterable, sorted_=False):
+        """Inserts all records and rebuilds a balanced tree in O(n + m).
+
+        iterable := (any iterable) records to insert
+        sorted := (bool) whether iterable is already sorted by key
+
+        """
+        key = self.key
+        keyed = [(key(record), record) for record in iterable]
+        if not sorted_:
+            keyed.sort(key=itemgetter(0))
+        BinTree.insert_many(self, [k for k, _ in keyed], True)
+        self.items.update(keyed)
+
+    def delete_many(self, iterable):
+        """Deletes all records and rebuilds a balanced tree in O(n + m).
+
+        iterable := (any iterable) records to delete
+
+        """
+        key = self.key
+        keys = set(key(record) for record in iterable)
+        BinTree.delete_many(self, keys)
+        for k in keys:
+            self.items.pop(k, None)
+
+    def __iter__(self):
+        return self._records(BinTree.__iter__(self))
+
+    def __reversed__(self):
+        return self._records(BinTree.__reversed__(self))
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Yields the records with keys between lo and hi in key order.
+
+        lo := (any number-like type) lower key bound, None for no bound
+        hi := (any number-like type) upper key bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        return self._records(BinTree.irange(self, lo, hi, inclusive))
+
+    def get_first(self):
+        """Returns the record with the smallest key."""
+        return self._record(BinTree.get_first(self))
+
+    def get_last(self):
+        """Returns the record with the largest key."""
+        return self._record(BinTree.get_last(self))
+
+    def get_root(self):
+        """Returns the record at the root."""
+        return self._record(BinTree.get_root(self))
+
+    def select(self, k):
+        """Returns the record with the k-th smallest key, counting from 0.
+
+        k := (int) the position in key order
+
+        """
+        return self._record(BinTree.select(self, k))
+
+    def floor(self, x):
+        """Returns the record with the largest key <= x, or None.
+
+        x := (any number-like type) the key bound
+
+        """
+        return self._record(BinTree.floor(self, x))
+
+    def ceiling(self, x):
+        """Returns the record with the smallest key >= x, or None.
+
+        x := (any number-like type) the key bound
+
+        """
+        return self._record(BinTree.ceiling(self, x))
+
+    def prev(self, x):
+        """Returns the record with the largest key < x, or None.
+
+        x := (any number-like type) the key bound
+
+        """
+        return self._record(BinTree.prev(self, x))
+
+    def next(self, x):
+        """Returns the record with the smallest key > x, or None.
+
+        x := (any number-like type) the key bound
+
+        """
+        return self._record(BinTree.next(self, x))
@@ -0,0 +1,289 @@
+import warnings
+from random import random
+
+from binarytree import BinTree
+
+
+class LazyBinTree(BinTree):
+    """Binary tree that deletes by marking values dead.
+
+    delete only adds the value to the dead set after the dict lookup, so a
+    burst of deletes costs about as much as the same number of lookups.
+    Dead values keep their nodes and still steer searches, but find,
+    iteration, the neighbour queries and len skip or leave them out.
+    Inserting a dead value brings it back in O(1). Once more than threshold
+    of the nodes are dead the tree is compacted: the live values are
+    rebuilt into a balanced tree in one linear pass, which keeps deletes
+    amortized O(1) and the tree no larger than 1 / (1 - threshold) times
+    its values.
+
+    The minimum and maximum are removed for real, with any dead values
+    next to them, so get_first and get_last stay O(1) and popping the ends
+    never passes over the same dead value twice.
+
+    The subtree sizes count the dead nodes too, so rank and select compact
+    the tree first if it holds dead values. Reads may thus change the
+    shape, and mutating_reads is set.
+
+    Public Functions:
+    __init__(iterable, sorted, assume_unique, threshold) := makes a
+                                                            balanced
+                                                            LazyBinTree
+    compact() := rebuilds the tree without the dead values
+    rank(val), select(k) := the BinTree queries, after a compaction
+    delete(val) := marks a value dead, compacting past the threshold
+    insert(val) := inserts a value or brings a dead one back
+
+    Public Instance Properties:
+    dead := set of the values deleted but still in the tree
+    threshold := share of dead nodes that triggers a compaction
+    compactions := number of compactions so far
+    mutating_reads := True, rank and select may compact the tree
+
+    """
+
+    mutating_reads = True
+    # defaults for trees made without __init__, as by load
+    threshold = 0.5
+    compactions = 0
+
+    def __init__(self, iterable, sorted_=False, assume_unique=False,
+                 threshold=0.5):
+        """Makes a balanced tree from an iterable with no duplicates.
+
+        iterable := (any sortable with hashable, number-like values) starting
+                    tree
+        sorted := (bool) whether iterable is already sorted
+        assume_unique := (bool) skips the duplicate check
+        threshold := (float) share of dead nodes, 0 < threshold < 1
+
+        """
+        if not 0 < threshold < 1:
+            raise ValueError('threshold must be between 0 and 1.')
+        self.threshold = threshold
+        self.compactions = 0
+        self.dead = set()
+        BinTree.__init__(self, iterable, sorted_, assume_unique)
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with bintree, all of its values live.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        self.dead = set()
+        BinTree._set_tree(self, bintree)
+
+    def compact(self):
+        """Rebuilds a balanced tree of the live values in O(n)."""
+        dead = self.dead
+        if len(dead) == 0:
+            return
+        self._build([val for val in BinTree.__iter__(self)
+                     if val not in dead])
+        self.dead = set()
+        self.compactions += 1
+
+    def _trim(self):
+        """Removes the dead values at both ends of the tree for real.
+
+        The cached minimum and maximum of BinTree then stay live, and each
+        dead value is passed over at most once however often the ends are
+        popped.
+
+        """
+        dead = self.dead
+        while self._first in dead:
+            self._remove(self._first)
+        while self._last in dead:
+            self._remove(self._last)
+
+    def _remove(self, val):
+        """Removes the node of a dead value with at most one child."""
+        self.dead.remove(val)
+        BinTree.delete(self, val)
+
+    def __len__(self):
+        return self.sizes.get(self.tree['root'], 0) - len(self.dead)
+
+    def __iter__(self):
+        dead = self.dead
+        for val in BinTree.__iter__(self):
+            if val not in dead:
+                yield val
+
+    def __reversed__(self):
+        dead = self.dead
+        for val in BinTree.__reversed__(self):
+            if val not in dead:
+                yield val
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Yields the live values between lo and hi in ascending order.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        dead = self.dead
+        for val in BinTree.irange(self, lo, hi, inclusive):
+            if val not in dead:
+                yield val
+
+    def _skip(self, val, dir_):
+        """Returns val, or the first live value after it in direction dir_.
+
+        val := (any type or None) a value in the tree
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+
+        """
+        dead = self.dead
+        step = self._step
+        while val is not None and val in dead:
+            val = step(val, dir_)
+        return val
+
+    def _bound(self, x, dir_, inclusive):
+        """Returns the live value nearest to x on the dir_ side of it.
+
+        x := (any number-like type) the bound, need not be in tree
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+        inclusive := (bool) whether x itself may be returned
+
+        """
+        return self._skip(BinTree._bound(self, x, dir_, inclusive), dir_)
+
+    def prev(self, val):
+        """Returns the largest live value less than val, or None.
+
+        val := (any number-like type) the bound, need not be in tree
+
+        """
+        return self._skip(BinTree.prev(self, val), BinTree.LEFT)
+
+    def next(self, val):
+        """Returns the smallest live value greater than val, or None.
+
+        val := (any number-like type) the bound, need not be in tree
+
+        """
+        return self._skip(BinTree.next(self, val), BinTree.RIGHT)
+
+    def rank(self, val):
+        """Returns the number of live values less than val.
+
+        Compacts the tree first if it holds dead values.
+
+        val := (any number-like type) the value to rank, need not be in tree
+
+        """
+        self.compact()
+        return BinTree.rank(self, val)
+
+    def select(self, k):
+        """Returns the k-th smallest live value, counting from 0.
+
+        Compacts the tree first if it holds dead values. Raises IndexError
+        if k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        self.compact()
+        return BinTree.select(self, k)
+
+    def find(self, val):
+        """Returns the parent and children of a live value, else None.
+
+        The links may point at dead values.
+
+        val := (any type) the value to find
+
+        """
+        if val in self.dead:
+            return None
+        return BinTree.find(self, val)
+
+    def insert(self, val):
+        """Inserts a value, or brings it back in O(1) if it is dead.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        dead = self.dead
+        if val in dead:
+            dead.remove(val)
+            return
+        BinTree.insert(self, val)
+
+    def delete(self, val, rand=random):
+        """Marks value dead and compacts the tree past the threshold.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) special testing function to specify random
+                       aspects of removing the minimum or maximum
+
+        """
+        dead = self.dead
+        if val not in self.tree or val == 'root' or val in dead:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        if val == self._first or val == self._last:
+            BinTree.delete(self, val, rand)
+            self._trim()
+            return
+        dead.add(val)
+        if len(dead) > self.threshold * (len(self.tree) - 1):
+            self.compact()
+
+    def insert_many(self, iterable, sorted_=False):
+        """Inserts all values and rebuilds a balanced tree in O(n + m).
+
+        The dead values are dropped in the same rebuild. Raises
+        DuplicateException if any value is repeated or already in the tree.
+
+        iterable := (any sortable with hashable, number-like values) values
+                    to insert
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        self.compact()
+        BinTree.insert_many(self, iterable, sorted_)
+
+    def delete_many(self, iterable):
+        """Deletes all values and rebuilds a balanced tree in O(n + m).
+
+        The dead values are dropped in the same rebuild. Raises a warning if
+        any of the values doesn't exist.
+
+        iterable := (any iterable of hashable values) values to delete
+
+        """
+        drop = set(iterable)
+        if len(drop) == 0:
+            return
+        t = self.tree
+        dead = self.dead
+        missing = [val for val in drop
+                   if val not in t or val == 'root' or val in dead]
+        if len(missing) > 0:
+            warnings.warn('Values not deleted. ' + str(missing) +
+                          ' not in tree.')
+        self._build([val for val in BinTree.__iter__(self)
+                     if val not in drop and val not in dead])
+        self.dead = set()
+
+    def dump(self, path):
+        """Writes a balanced tree of the live values to path.
+
+        The tree itself is left as it is; see BinTree.dump.
+
+        path := (str) the file to write
+
+        """
+        BinTree(list(self), True, True).dump(path)
@@ -0,0 +1,274 @@
+import warnings
+from random import random
+
+from binarytree import BinTree
+
+
+class MultiBinTree(BinTree):
+    """Binary tree multiset for hashable, number-like types.
+
+    Each distinct value is one node with an occurrence count, so repeated
+    values cost a dict update instead of a DuplicateException. Subtree
+    sizes count occurrences, so len, rank, select and iteration all see
+    every copy of a value.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a balanced tree, counting repeats
+    add(val, n) := adds n occurrences of val
+    discard(val, n) := removes up to n occurrences of val
+    count(val) := returns the number of occurrences of val
+    insert(val) := adds one occurrence of val
+    delete(val) := removes every occurrence of val
+    pop_first() := removes and returns one occurrence of the minimum
+    pop_last() := removes and returns one occurrence of the maximum
+    freeze() := raises TypeError, a FrozenBinTree holds no counts
+
+    Public Instance Properties:
+    counts := dict of value to number of occurrences
+
+    """
+
+    _counted = dict(BinTree._counted, add='insert', discard='delete')
+
+    def __init__(self, iterable, sorted_=False):
+        """Makes a balanced multiset, collapsing repeats into counts.
+
+        iterable := (any sortable with hashable, number-like values) starting
+                    values, repeats allowed
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if not sorted_:
+            iterable = sorted(iterable)
+        keys, counts = self._collapse(iterable)
+        self.counts = counts
+        self._build(keys)
+
+    @staticmethod
+    def _collapse(iterable):
+        """Returns (distinct values, counts) of a sorted iterable."""
+        keys = []
+        counts = {}
+        append = keys.append
+        last = sentinel = object()
+        for val in iterable:
+            if last is not sentinel and last == val:
+                counts[val] += 1
+            else:
+                append(val)
+                counts[val] = 1
+                last = val
+        return keys, counts
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        iterable := (sorted sequence of unique, hashable values) new tree,
+                    each already in counts
+
+        """
+        BinTree._build(self, iterable)
+        self._set_tree(self.tree)
+
+    def _update(self, val):
+        """Recomputes the size of val from its count and its children.
+
+        val := (any type) the node to update
+
+        """
+        node = self.tree[val]
+        sizes = self.sizes
+        sizes[val] = (self.counts[val] + sizes.get(node[BinTree.LEFT], 0) +
+                      sizes.get(node[BinTree.RIGHT], 0))
+
+    def __iter__(self):
+        counts = self.counts
+        for val in BinTree.__iter__(self):
+            for _ in xrange(counts[val]):
+                yield val
+
+    def __reversed__(self):
+        counts = self.counts
+        for val in BinTree.__reversed__(self):
+            for _ in xrange(counts[val]):
+                yield val
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Yields the values between lo and hi in ascending order.
+
+        Every occurrence of a value is yielded.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        counts = self.counts
+        for val in BinTree.irange(self, lo, hi, inclusive):
+            for _ in xrange(counts[val]):
+                yield val
+
+    def count(self, val):
+        """Returns the number of occurrences of val.
+
+        val := (any hashable type) the value to count
+
+        """
+        return self.counts.get(val, 0)
+
+    def add(self, val, n=1):
+        """Adds n occurrences of val.
+
+        val := (any hashable type) the value to add
+        n := (int) the number of occurrences, at least 1
+
+        """
+        if n < 1:
+            raise ValueError('n must be at least 1.')
+        counts = self.counts
+        if val in counts:
+            counts[val] += n
+            self._resize_path(val, n)
+        else:
+            BinTree.insert(self, val)
+            counts[val] = n
+            self._resize_path(val, n - 1)
+
+    def insert(self, val):
+        """Adds one occurrence of val.
+
+        val := (any hashable type) the value to insert
+
+        """
+        self.add(val)
+
+    def discard(self, val, n=1, rand=random):
+        """Removes up to n occurrences of val, if there are any.
+
+        val := (any type) the value to remove
+        n := (int) the number of occurrences, at least 1
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        if n < 1:
+            raise ValueError('n must be at least 1.')
+        counts = self.counts
+        count = counts.get(val, 0)
+        if n < count:
+            counts[val] = count - n
+            self._resize_path(val, -n)
+        elif count > 0:
+            self._remove(val, rand)
+
+    def delete(self, val, rand=random):
+        """Removes every occurrence of val.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        if val in self.counts:
+            self._remove(val, rand)
+        else:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+
+    def pop_first(self):
+        """Removes and returns one occurrence of the minimum.
+
+        Raises IndexError if the multiset is empty.
+
+        """
+        val = self.get_first()
+        if val is None:
+            raise IndexError('pop from an empty tree.')
+        self.discard(val)
+        return val
+
+    def pop_last(self):
+        """Removes and returns one occurrence of the maximum.
+
+        Raises IndexError if the multiset is empty.
+
+        """
+        val = self.get_last()
+        if val is None:
+            raise IndexError('pop from an empty tree.')
+        self.discard(val)
+        return val
+
+    def freeze(self):
+        """Raises TypeError; a FrozenBinTree can't hold repeated values."""
+        raise TypeError('A MultiBinTree can\'t be frozen, its counts ' +
+                        'would be lost.')
+
+    def _remove(self, val, rand):
+        """Removes the node of val, which must be in the tree."""
+        t = self.tree
+        counts = self.counts
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        # BinTree.delete moves sizes by one node at a time, so the removed
+        # node and the one replacing it weigh one for the duration
+        self._resize_path(val, 1 - counts[val])
+        node = t[val]
+        side = rand()
+        moved = None
+        if node[LEFT] is not None and node[RIGHT] is not None:
+            if side > 0.5:
+                moved = self.get_loop(LEFT, node[RIGHT])
+            else:
+                moved = self.get_loop(RIGHT, node[LEFT])
+            self._resize_path(moved, 1 - counts[moved])
+        BinTree.delete(self, val, lambda: side)
+        del counts[val]
+        if moved is not None:
+            self._resize_path(moved, counts[moved] - 1)
+
+    def insert_many(self, iterable, sorted_=False):
+        """Adds all values and rebuilds a balanced tree in O(n + m).
+
+        iterable := (any sortable with hashable, number-like values) values
+                    to add, repeats allowed
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if not sorted_:
+            iterable = sorted(iterable)
+        new, new_counts = self._collapse(iterable)
+        counts = self.counts
+        merged = []
+        append = merged.append
+        old = BinTree.__iter__(self)
+        sentinel = object()
+        cur = next(old, sentinel)
+        for val in new:
+            while cur is not sentinel and cur < val:
+                append(cur)
+                cur = next(old, sentinel)
+            if cur is not sentinel and not val < cur:
+                counts[val] += new_counts[val]
+            else:
+                append(val)
+                counts[val] = new_counts[val]
+        if cur is not sentinel:
+            append(cur)
+            merged.extend(old)
+        self._build(merged)
+
+    def delete_many(self, iterable):
+        """Removes every occurrence of the values and rebuilds the tree.
+
+        Raises a warning if any of the values doesn't exist.
+
+        iterable := (any iterable of hashable values) values to delete
+
+        """
+        drop = set(iterable)
+        counts = self.counts
+        BinTree.delete_many(self, drop)
+        for val in drop:
+            counts.pop(val, None)
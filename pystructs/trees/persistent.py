@@ -0,0 +1,321 @@
+import warnings
+
+from binarytree import DuplicateException
+
+# fields of the immutable node tuples
+VAL = 0
+LEFT = 1
+RIGHT = 2
+SIZE = 3
+HEIGHT = 4
+
+
+def _size(node):
+    if node is None:
+        return 0
+    return node[SIZE]
+
+
+def _height(node):
+    if node is None:
+        return 0
+    return node[HEIGHT]
+
+
+def _node(val, left, right):
+    return (val, left, right, 1 + _size(left) + _size(right),
+            1 + max(_height(left), _height(right)))
+
+
+def _balance(val, left, right):
+    """Returns a new balanced node from subtrees that differ by at most 2."""
+    lh = _height(left)
+    rh = _height(right)
+    if lh > rh + 1:
+        if _height(left[LEFT]) < _height(left[RIGHT]):
+            inner = left[RIGHT]
+            return _node(inner[VAL], _node(left[VAL], left[LEFT],
+                                           inner[LEFT]),
+                         _node(val, inner[RIGHT], right))
+        return _node(left[VAL], left[LEFT], _node(val, left[RIGHT], right))
+    if rh > lh + 1:
+        if _height(right[RIGHT]) < _height(right[LEFT]):
+            inner = right[LEFT]
+            return _node(inner[VAL], _node(val, left, inner[LEFT]),
+                         _node(right[VAL], inner[RIGHT], right[RIGHT]))
+        return _node(right[VAL], _node(val, left, right[LEFT]), right[RIGHT])
+    return _node(val, left, right)
+
+
+def _build(keys, bot, top):
+    """Returns a balanced node over keys[bot:top]."""
+    if bot >= top:
+        return None
+    mid = (bot + top) // 2
+    return _node(keys[mid], _build(keys, bot, mid),
+                 _build(keys, mid + 1, top))
+
+
+def _insert(node, val):
+    if node is None:
+        return _node(val, None, None)
+    if val < node[VAL]:
+        return _balance(node[VAL], _insert(node[LEFT], val), node[RIGHT])
+    if node[VAL] < val:
+        return _balance(node[VAL], node[LEFT], _insert(node[RIGHT], val))
+    raise DuplicateException(
+        'Invalid input to insert. PersistentBinTree assumes you ' +
+        'are handling duplicates separately.')
+
+
+def _pop_first(node):
+    """Returns (minimum value, node without it)."""
+    if node[LEFT] is None:
+        return node[VAL], node[RIGHT]
+    first, left = _pop_first(node[LEFT])
+    return first, _balance(node[VAL], left, node[RIGHT])
+
+
+def _delete(node, val):
+    if node is None:
+        raise KeyError(val)
+    if val < node[VAL]:
+        return _balance(node[VAL], _delete(node[LEFT], val), node[RIGHT])
+    if node[VAL] < val:
+        return _balance(node[VAL], node[LEFT], _delete(node[RIGHT], val))
+    if node[LEFT] is None:
+        return node[RIGHT]
+    if node[RIGHT] is None:
+        return node[LEFT]
+    first, right = _pop_first(node[RIGHT])
+    return _balance(first, node[LEFT], right)
+
+
+class TreeSnapshot(object):
+    """Immutable version of a PersistentBinTree.
+
+    Shares all of its nodes with the tree it was taken from, so taking one
+    is O(1), and stays unchanged while the tree is updated.
+
+    Public Functions:
+    get_root() := returns root value
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    rank(val) := returns the number of values less than val
+    select(k) := returns the k-th smallest value
+    floor(x) := returns the largest value <= x
+    ceiling(x) := returns the smallest value >= x
+    irange(lo, hi, inclusive) := yields values between lo and hi
+    len(tree), iter(tree), val in tree
+
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __contains__(self, val):
+        node = self._root
+        while node is not None:
+            if val < node[VAL]:
+                node = node[LEFT]
+            elif node[VAL] < val:
+                node = node[RIGHT]
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        return self.irange()
+
+    def get_root(self):
+        """Returns the root value."""
+        if self._root is None:
+            return None
+        return self._root[VAL]
+
+    def _loop(self, dir_):
+        node = self._root
+        if node is None:
+            return None
+        while node[dir_] is not None:
+            node = node[dir_]
+        return node[VAL]
+
+    def get_first(self):
+        """Returns the minimum value."""
+        return self._loop(LEFT)
+
+    def get_last(self):
+        """Returns the maximum value."""
+        return self._loop(RIGHT)
+
+    def rank(self, val):
+        """Returns the number of values less than val.
+
+        val := (any number-like type) the value to rank, need not be in tree
+
+        """
+        rank = 0
+        node = self._root
+        while node is not None:
+            if val < node[VAL]:
+                node = node[LEFT]
+            elif node[VAL] < val:
+                rank += _size(node[LEFT]) + 1
+                node = node[RIGHT]
+            else:
+                return rank + _size(node[LEFT])
+        return rank
+
+    def select(self, k):
+        """Returns the k-th smallest value, counting from 0.
+
+        Raises IndexError if k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        node = self._root
+        len_ = _size(node)
+        if k < 0:
+            k += len_
+        if not 0 <= k < len_:
+            raise IndexError('Tree index out of range.')
+        while True:
+            left = _size(node[LEFT])
+            if k < left:
+                node = node[LEFT]
+            elif k > left:
+                k -= left + 1
+                node = node[RIGHT]
+            else:
+                return node[VAL]
+
+    def floor(self, x):
+        """Returns the largest value less than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        found = None
+        node = self._root
+        while node is not None:
+            if x < node[VAL]:
+                node = node[LEFT]
+            else:
+                found = node[VAL]
+                node = node[RIGHT]
+        return found
+
+    def ceiling(self, x):
+        """Returns the smallest value greater than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        found = None
+        node = self._root
+        while node is not None:
+            if node[VAL] < x:
+                node = node[RIGHT]
+            else:
+                found = node[VAL]
+                node = node[LEFT]
+        return found
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Yields the values between lo and hi in ascending order.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        lo_inc, hi_inc = inclusive
+        stack = []
+        node = self._root
+        # keeps only the path of nodes at or above lo
+        while node is not None:
+            val = node[VAL]
+            if lo is None or lo < val or lo_inc and not val < lo:
+                stack.append(node)
+                node = node[LEFT]
+            else:
+                node = node[RIGHT]
+        while len(stack) > 0:
+            node = stack.pop()
+            val = node[VAL]
+            if hi is not None and (hi < val or not hi_inc and not val < hi):
+                return
+            yield val
+            node = node[RIGHT]
+            while node is not None:
+                stack.append(node)
+                node = node[LEFT]
+
+
+class PersistentBinTree(TreeSnapshot):
+    """Height-balanced binary tree with O(1) immutable snapshots.
+
+    Nodes are immutable tuples without parent links. insert and delete copy
+    only the O(log n) nodes on the path they touch and share the rest, so
+    a snapshot is just a reference to the current root and costs memory
+    only for the nodes replaced after it was taken. Readers can query and
+    iterate snapshots from other threads while writes continue.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a balanced PersistentBinTree
+    insert(val) := inserts a value in tree
+    delete(val) := deletes a value in tree
+    snapshot() := returns an immutable TreeSnapshot of the current tree
+    plus all the query functions of TreeSnapshot
+
+    """
+
+    def __init__(self, iterable=(), sorted_=False):
+        """Makes a balanced tree from an iterable with no duplicates.
+
+        iterable := (any sortable with number-like values) starting tree
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        if sorted_:
+            keys = list(iterable)
+        else:
+            keys = sorted(iterable)
+        for i in xrange(1, len(keys)):
+            if not keys[i - 1] < keys[i]:
+                raise DuplicateException(
+                    'PersistentBinTree assumes you are handling ' +
+                    'duplicates separately.')
+        TreeSnapshot.__init__(self, _build(keys, 0, len(keys)))
+
+    def snapshot(self):
+        """Returns an immutable TreeSnapshot of the tree in O(1)."""
+        return TreeSnapshot(self._root)
+
+    def insert(self, val):
+        """Inserts a value into the tree.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any number-like type) the value to insert
+
+        """
+        self._root = _insert(self._root, val)
+
+    def delete(self, val):
+        """Deletes value from the tree.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+
+        """
+        try:
+            self._root = _delete(self._root, val)
+        except KeyError:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
@@ -0,0 +1,195 @@
+from timeit import default_timer
+
+from binarytree import BinTree
+
+# nodes handled between two looks at the clock
+CHUNK = 64
+
+
+class Rebalancer(object):
+    """Rebuilds a BinTree as a balanced tree in time-bounded steps.
+
+    The values are first collected in order from the current tree, then
+    linked into a new tree with the middle-index construction of _build,
+    each a piece at a time. The current tree stays untouched and readable
+    between steps; the last step swaps the new tree in by assigning tree
+    and then sizes. A step runs for the budget plus the handling of at
+    most CHUNK nodes, except when the interpreter grows the dict of the new
+    tree or runs a full garbage collection inside it; both are O(n) and
+    can't be cut up, and for 10**6 values they take tens to hundreds of ms.
+
+    The tree must not be changed while a rebalance is in progress; a step
+    raises RuntimeError if it was modified or replaced, and the rebalance
+    is dropped.
+
+    The swap is not atomic: a query running in another thread at that
+    moment can see the new shape with the old sizes. A tree shared through
+    a ConcurrentBinTree must run each step under its write lock, which
+    also keeps the writes of other threads out of the step:
+
+        with shared.writing() as tree:
+            rebalancer = tree.rebalancer()
+        done = False
+        while not done:
+            with shared.writing():
+                done = rebalancer.step()
+
+    The lock is then held for one step at a time.
+
+    Public Functions:
+    __init__(tree, budget_ms) := prepares a rebalance of tree
+    step() := does up to budget_ms of work, returns whether it is done
+    run() := runs all remaining steps
+    iter(rebalancer) := runs one step per iteration
+
+    Public Instance Properties:
+    budget := seconds of work per step
+    done := whether the new tree has been swapped in
+    steps := number of steps taken so far
+
+    """
+
+    def __init__(self, tree, budget_ms=5.0):
+        """Prepares a rebalance of tree; no work is done yet.
+
+        Raises TypeError for trees with more augmented data than plain
+        subtree sizes, which the rebuild would lose.
+
+        tree := (BinTree) the tree to rebalance
+        budget_ms := (float) milliseconds of work per step
+
+        """
+        cls = type(tree)
+        if (cls._update.__func__ is not BinTree._update.__func__ or
+                cls._build.__func__ is not BinTree._build.__func__):
+            raise TypeError(cls.__name__ + ' keeps more per-node data ' +
+                            'than a rebalance rebuilds.')
+        self.tree = tree
+        self.budget = budget_ms / 1000.0
+        self.done = False
+        self.steps = 0
+        self._old = tree.tree
+        self._mods = tree._mods
+        # one slot per node, dead ones of a LazyBinTree included, filled
+        # in place; growing a list of n values would copy it
+        self._values = [None] * (len(tree.tree) - 1)
+        self._count = 0
+        # in-order walk over the current tree
+        self._walk = []
+        self._node = tree.tree['root']
+        self._new = {}
+        self._sizes = {}
+        self._segments = None
+
+    def __iter__(self):
+        while not self.done:
+            self.step()
+            yield
+
+    def run(self):
+        """Runs all remaining steps at once."""
+        while not self.step():
+            pass
+
+    def step(self):
+        """Does up to the budget of work and returns whether it is done."""
+        if self.done:
+            return True
+        tree = self.tree
+        if tree.tree is not self._old or tree._mods != self._mods:
+            self.done = True
+            raise RuntimeError('Tree changed during rebalance.')
+        self.steps += 1
+        deadline = default_timer() + self.budget
+        if self._segments is None and not self._collect(deadline):
+            return False
+        if not self._link(deadline):
+            return False
+        tree.tree = self._new
+        tree.sizes = self._sizes
+        tree._mods += 1
+        self.done = True
+        return True
+
+    def _collect(self, deadline):
+        """Appends values in order until deadline; True when all are in."""
+        t = self.tree.tree
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        walk = self._walk
+        values = self._values
+        count = self._count
+        node = self._node
+        timer = default_timer
+        while True:
+            for _ in xrange(CHUNK):
+                if node is None:
+                    if len(walk) == 0:
+                        self._new['root'] = (values[count // 2]
+                                             if count > 0 else None)
+                        self._segments = [(0, count, None)]
+                        return True
+                    node = walk.pop()
+                    values[count] = node
+                    count += 1
+                    node = t[node][RIGHT]
+                else:
+                    walk.append(node)
+                    node = t[node][LEFT]
+            self._node = node
+            self._count = count
+            if timer() >= deadline:
+                return False
+
+    def _link(self, deadline):
+        """Links segments of the new tree until deadline; True when done.
+
+        This is the loop of BinTree._link, cut into chunks.
+
+        """
+        values = self._values
+        bintree = self._new
+        sizes = self._sizes
+        stack = self._segments
+        pop = stack.pop
+        push = stack.append
+        timer = default_timer
+        while True:
+            for _ in xrange(CHUNK):
+                if len(stack) == 0:
+                    return True
+                bot, top, parent = pop()
+                if bot == top:
+                    continue
+                mid = (bot + top) // 2
+                m_val = values[mid]
+                if bot < mid:
+                    l_val = values[(bot + mid) // 2]
+                    push((bot, mid, m_val))
+                else:
+                    l_val = None
+                if mid + 1 < top:
+                    r_val = values[(mid + 1 + top) // 2]
+                    push((mid + 1, top, m_val))
+                else:
+                    r_val = None
+                bintree[m_val] = [parent, l_val, r_val]
+                sizes[m_val] = top - bot
+            if timer() >= deadline:
+                return False
+
+
+def rebalance_async(tree, budget_ms=5.0):
+    """Returns a generator-based coroutine that rebalances tree.
+
+    Each resumption runs one step of at most budget_ms and then yields
+    None, which event loops built on generator coroutines take as giving
+    up control for one iteration; any other loop can drive it with next().
+
+    tree := (BinTree) the tree to rebalance
+    budget_ms := (float) milliseconds of work per step
+
+    """
+    rebalancer = Rebalancer(tree, budget_ms)
+    while not rebalancer.step():
+        yield
@@ -0,0 +1,233 @@
+import warnings
+from random import random
+
+from binarytree import BinTree
+
+
+class RedBlackTree(BinTree):
+    """Red-black binary tree for hashable, number-like types.
+
+    No red node has a red child and every path from a node down to an empty
+    subtree passes the same number of black nodes, which keeps the height
+    under 2 * log2(n + 1). An insert does at most two rotations and a
+    delete at most three; the rest of the rebalancing is recoloring, so
+    it suits write-heavy use better than the stricter AVL.
+
+    Public Functions:
+    __init__(iterable, sorted) := makes a balanced red-black tree
+    is_red(val) := returns whether val is a red node
+    delete(val) := deletes a value in tree and rebalances
+    insert(val) := inserts a value in tree and rebalances
+
+    Public Static Class Properties:
+    RED := color of a red node
+    BLACK := color of a black node
+
+    Public Instance Properties:
+    colors := dict of value to RED or BLACK
+
+    """
+
+    RED = 0
+    BLACK = 1
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        The middle-index construction puts every empty subtree at the
+        deepest or second deepest level, so coloring the deepest level red
+        and the rest black is a valid coloring.
+
+        iterable := (sorted sequence of unique, hashable values) new tree
+
+        """
+        BinTree._build(self, iterable)
+        t = self.tree
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        colors = {}
+        level = []
+        if t['root'] is not None:
+            level.append(t['root'])
+        while len(level) > 0:
+            below = []
+            for val in level:
+                colors[val] = RedBlackTree.BLACK
+                node = t[val]
+                if node[LEFT] is not None:
+                    below.append(node[LEFT])
+                if node[RIGHT] is not None:
+                    below.append(node[RIGHT])
+            if len(below) == 0 and level[0] != t['root']:
+                for val in level:
+                    colors[val] = RedBlackTree.RED
+            level = below
+        self.colors = colors
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with a balanced tree over the values of bintree.
+
+        An arbitrary tree shape may have no valid coloring, so the values
+        are rebuilt with the middle-index construction instead.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        BinTree._set_tree(self, bintree)
+        self._build(list(BinTree.__iter__(self)))
+
+    def is_red(self, val):
+        """Returns whether val is a red node; empty subtrees are black.
+
+        val := (any type) the node, None for an empty subtree
+
+        """
+        return self.colors.get(val, RedBlackTree.BLACK) == RedBlackTree.RED
+
+    def insert(self, val):
+        """Inserts a value into the tree and rebalances.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        BinTree.insert(self, val)
+        t = self.tree
+        colors = self.colors
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        RED = RedBlackTree.RED
+        BLACK = RedBlackTree.BLACK
+        colors[val] = RED
+        while True:
+            parent = t[val][PARENT]
+            if parent is None:
+                colors[val] = BLACK
+                break
+            if colors[parent] == BLACK:
+                break
+            # a red parent is never the root, so grand exists
+            grand = t[parent][PARENT]
+            if t[grand][LEFT] == parent:
+                side, other = LEFT, RIGHT
+            else:
+                side, other = RIGHT, LEFT
+            uncle = t[grand][other]
+            if uncle is not None and colors[uncle] == RED:
+                colors[parent] = colors[uncle] = BLACK
+                colors[grand] = RED
+                val = grand
+                continue
+            if t[parent][other] == val:
+                parent = self._rotate(parent, side)
+            self._rotate(grand, other)
+            colors[parent] = BLACK
+            colors[grand] = RED
+            break
+
+    def delete(self, val, rand=random):
+        """Deletes value from the tree and rebalances.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) picks the successor (> 0.5) or the predecessor as the
+                       replacement of a node with two children
+
+        """
+        t = self.tree
+        try:
+            node = t[val]
+        except KeyError:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        self._uncache(val)
+        colors = self.colors
+        sizes = self.sizes
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        if node[LEFT] is None or node[RIGHT] is None:
+            if node[LEFT] is None:
+                child = node[RIGHT]
+            else:
+                child = node[LEFT]
+            parent = node[PARENT]
+            removed = colors[val]
+            self._replace(val, child)
+        else:
+            if rand() > 0.5:
+                dir_, side = LEFT, RIGHT
+            else:
+                dir_, side = RIGHT, LEFT
+            new_val = self.get_loop(dir_, node[side])
+            new_node = t[new_val]
+            removed = colors[new_val]
+            # splices new_val out, it has no child in dir_
+            child = new_node[side]
+            if new_node[PARENT] == val:
+                parent = new_val
+            else:
+                parent = new_node[PARENT]
+                self._replace(new_val, child)
+                new_node[side] = node[side]
+                t[node[side]][PARENT] = new_val
+            new_node[dir_] = node[dir_]
+            t[node[dir_]][PARENT] = new_val
+            self._replace(val, new_val)
+            colors[new_val] = colors[val]
+            sizes[new_val] = sizes[val]
+        self._resize_path(parent, -1)
+        del t[val]
+        del sizes[val]
+        del colors[val]
+        if removed == RedBlackTree.BLACK:
+            self._fix_delete(child, parent)
+
+    def _fix_delete(self, val, parent):
+        """Restores the black heights after a black node was removed.
+
+        val := (any type or None) the node that took the removed node's place
+        parent := (any type or None) the parent of that place
+
+        """
+        t = self.tree
+        colors = self.colors
+        is_red = self.is_red
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        RED = RedBlackTree.RED
+        BLACK = RedBlackTree.BLACK
+        while val != t['root'] and not is_red(val):
+            if t[parent][LEFT] == val:
+                side, other = LEFT, RIGHT
+            else:
+                side, other = RIGHT, LEFT
+            # the side of val is one black short, so sib is never None
+            sib = t[parent][other]
+            if colors[sib] == RED:
+                colors[sib] = BLACK
+                colors[parent] = RED
+                self._rotate(parent, side)
+                sib = t[parent][other]
+            sibnode = t[sib]
+            if not is_red(sibnode[LEFT]) and not is_red(sibnode[RIGHT]):
+                colors[sib] = RED
+                val = parent
+                parent = t[val][PARENT]
+                continue
+            if not is_red(sibnode[other]):
+                colors[sibnode[side]] = BLACK
+                colors[sib] = RED
+                sib = self._rotate(sib, other)
+                sibnode = t[sib]
+            colors[sib] = colors[parent]
+            colors[parent] = BLACK
+            colors[sibnode[other]] = BLACK
+            self._rotate(parent, side)
+            return
+        if val is not None:
+            colors[val] = BLACK
@@ -0,0 +1,121 @@
+from math import log
+from random import random
+
+from binarytree import BinTree
+
+
+class ScapegoatTree(BinTree):
+    """Binary tree that keeps itself balanced by rebuilding subtrees.
+
+    There are no rotations and nothing is stored per node beyond the
+    subtree sizes BinTree already keeps. When an insert lands deeper than
+    log(n) / log(1 / alpha), the lowest ancestor with a child holding more
+    than alpha of its values (the scapegoat) is rebuilt with the same
+    middle-index construction __init__ uses. When deletes shrink the tree
+    below alpha of its size at the last full rebuild, the whole tree is
+    rebuilt. Updates cost amortized O(log n) and the height stays within
+    log(n) / log(1 / alpha) + 1.
+
+    alpha trades height for rebuild work: 0.5 keeps the tree almost
+    perfectly balanced at the cost of frequent rebuilds, values near 1
+    rebuild rarely and let the tree grow deeper.
+
+    Public Functions:
+    __init__(iterable, sorted, assume_unique, alpha) := makes a balanced
+                                                       ScapegoatTree
+    delete(val) := deletes a value, rebuilding the tree when it has shrunk
+    insert(val) := inserts a value, rebuilding its scapegoat if too deep
+
+    Public Instance Properties:
+    alpha := weight balance factor in (0.5, 1)
+    max_size := number of values at the last full rebuild, or more since
+    rebuilds := number of rebuilds so far
+
+    """
+
+    # defaults for trees made without __init__, as by load
+    alpha = 0.7
+    rebuilds = 0
+
+    def __init__(self, iterable, sorted_=False, assume_unique=False,
+                 alpha=0.7):
+        """Makes a balanced tree from an iterable with no duplicates.
+
+        iterable := (any sortable with hashable, number-like values) starting
+                    tree
+        sorted := (bool) whether iterable is already sorted
+        assume_unique := (bool) skips the duplicate check
+        alpha := (float) weight balance factor, 0.5 < alpha < 1
+
+        """
+        if not 0.5 < alpha < 1:
+            raise ValueError('alpha must be between 0.5 and 1.')
+        self.alpha = alpha
+        self.rebuilds = 0
+        BinTree.__init__(self, iterable, sorted_, assume_unique)
+
+    def _build(self, iterable):
+        """Replaces the tree with a balanced tree over iterable.
+
+        iterable := (sorted sequence of unique, hashable values) new tree
+
+        """
+        BinTree._build(self, iterable)
+        self.max_size = len(iterable)
+
+    def _set_tree(self, bintree):
+        """Replaces the tree with bintree, as loaded from a file.
+
+        bintree := (dict) a complete tree in the format of BinTree.tree
+
+        """
+        BinTree._set_tree(self, bintree)
+        self.max_size = len(self)
+
+    def _max_depth(self):
+        """Returns the deepest an insert may land without a rebuild."""
+        return int(log(len(self)) / -log(self.alpha))
+
+    def insert(self, val):
+        """Inserts a value and rebuilds its scapegoat if it lands too deep.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        BinTree.insert(self, val)
+        size = len(self)
+        if size > self.max_size:
+            self.max_size = size
+        t = self.tree
+        sizes = self.sizes
+        PARENT = BinTree.PARENT
+        path = [val]
+        parent = t[val][PARENT]
+        while parent is not None:
+            path.append(parent)
+            parent = t[parent][PARENT]
+        if len(path) - 1 <= self._max_depth():
+            return
+        alpha = self.alpha
+        for i in xrange(1, len(path)):
+            if sizes[path[i - 1]] > alpha * sizes[path[i]]:
+                self._rebuild(path[i])
+                self.rebuilds += 1
+                return
+
+    def delete(self, val, rand=random):
+        """Deletes value and rebuilds the tree once it has shrunk enough.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        BinTree.delete(self, val, rand)
+        if len(self) < self.alpha * self.max_size:
+            self._build(list(BinTree.__iter__(self)))
+            self.rebuilds += 1
@@ -0,0 +1,319 @@
+import multiprocessing
+import types
+import warnings
+from bisect import bisect_right
+
+from binarytree import BinTree, DuplicateException
+
+
+def _serve(conn, cls, keys):
+    """Builds one shard from sorted keys and answers calls on conn.
+
+    A call is (name, args) and gets back (error, result, warnings); None
+    stops the shard.
+
+    """
+    try:
+        tree = cls(keys, True)
+    except Exception as e:
+        conn.send((e, None, []))
+        conn.close()
+        return
+    del keys
+    conn.send((None, len(tree), []))
+    while True:
+        call = conn.recv()
+        if call is None:
+            break
+        name, args = call
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            try:
+                result = getattr(tree, name)(*args)
+                if isinstance(result, types.GeneratorType):
+                    result = list(result)
+            except Exception as e:
+                conn.send((e, None, []))
+                continue
+        conn.send((None, result, [str(w.message) for w in caught]))
+    conn.close()
+
+
+class ShardedBinTree(object):
+    """Range-partitioned set of trees, each held by its own process.
+
+    The sorted keys are cut into contiguous shards and every shard is built
+    with the balanced sorted constructor in a separate process, so the
+    build runs on as many cores as there are shards. A value is routed to
+    its shard by bisecting the shard boundaries. Calls that touch several
+    shards (irange, insert_many, delete_many) are sent to all of them
+    before any answer is awaited, so the shards work on them in parallel.
+
+    Each call is a round trip through a pipe, which costs far more than a
+    lookup in a local BinTree; sharding pays off for builds and for bulk
+    and range work, not for single lookups.
+
+    Public Functions:
+    __init__(iterable, shards, sorted, cls) := starts and builds the shards
+    close() := stops the shard processes
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    find(val) := returns [parent, left-child, right-child] list in its shard
+    delete(val) := deletes a value in tree
+    insert(val) := inserts a value in tree
+    delete_many(iterable) := deletes values, shards in parallel
+    insert_many(iterable, sorted) := inserts values, shards in parallel
+    rank(val) := returns the number of values less than val
+    select(k) := returns the k-th smallest value
+    irange(lo, hi, inclusive) := returns an iterator of values between lo
+                                 and hi, shards queried in parallel
+    len(tree), iter(tree)
+
+    Public Instance Properties:
+    bounds := sorted list of the smallest value routed to each shard but
+              the first
+
+    """
+
+    def __init__(self, iterable, shards=None, sorted_=False, cls=BinTree):
+        """Builds the shards from an iterable with no duplicates.
+
+        iterable := (any sortable with hashable, number-like values) starting
+                    tree
+        shards := (int) number of shards, the number of cores by default
+        sorted := (bool) whether iterable is already sorted
+        cls := (class) BinTree or the subclass to build each shard with
+
+        """
+        if sorted_:
+            keys = list(iterable)
+        else:
+            keys = sorted(iterable)
+        if shards is None:
+            shards = multiprocessing.cpu_count()
+        shards = max(1, min(shards, len(keys)))
+        cuts = [i * len(keys) // shards for i in xrange(shards + 1)]
+        for cut in cuts[1:-1]:
+            if not keys[cut - 1] < keys[cut]:
+                raise DuplicateException(
+                    'Bintree assumes you are handling duplicates separately.')
+        self.bounds = [keys[cut] for cut in cuts[1:-1]]
+        self._conns = []
+        self._procs = []
+        # forked children read their slice of keys without it being copied
+        # through a pipe
+        for i in xrange(shards):
+            conn, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_serve, args=(child, cls, keys[cuts[i]:cuts[i + 1]]))
+            proc.daemon = True
+            proc.start()
+            child.close()
+            self._conns.append(conn)
+            self._procs.append(proc)
+        del keys
+        try:
+            self._lens = self._gather(range(shards))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Stops the shard processes; the tree can't be used afterwards."""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (IOError, EOFError):
+                pass
+        for proc in self._procs:
+            proc.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._procs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _receive(self, i):
+        """Returns the answer of shard i, raising or warning as it did."""
+        try:
+            error, result, messages = self._conns[i].recv()
+        except EOFError:
+            raise RuntimeError('Shard ' + str(i) + ' stopped.')
+        for message in messages:
+            warnings.warn(message)
+        if error is not None:
+            raise error
+        return result
+
+    def _gather(self, shards):
+        """Returns the answers of shards in order."""
+        results = []
+        error = None
+        for i in shards:
+            try:
+                results.append(self._receive(i))
+            except Exception as e:
+                # keeps reading so no answer is left in a pipe
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+        return results
+
+    def _call(self, i, name, *args):
+        self._conns[i].send((name, args))
+        return self._receive(i)
+
+    def _fan(self, calls):
+        """Sends every (shard, name, args) call, then returns the answers."""
+        for i, name, args in calls:
+            self._conns[i].send((name, args))
+        return self._gather([i for i, _, _ in calls])
+
+    def _route(self, val):
+        return bisect_right(self.bounds, val)
+
+    def __len__(self):
+        return sum(self._lens)
+
+    def __iter__(self):
+        for i in xrange(len(self._conns)):
+            for val in self._call(i, '__iter__'):
+                yield val
+
+    def get_first(self):
+        """Returns the minimum value."""
+        for i, len_ in enumerate(self._lens):
+            if len_ > 0:
+                return self._call(i, 'get_first')
+        return None
+
+    def get_last(self):
+        """Returns the maximum value."""
+        for i in reversed(xrange(len(self._lens))):
+            if self._lens[i] > 0:
+                return self._call(i, 'get_last')
+        return None
+
+    def find(self, val):
+        """Finds and returns the parent and children of value in its shard.
+
+        val := (any type) the value to find
+
+        """
+        return self._call(self._route(val), 'find', val)
+
+    def insert(self, val):
+        """Inserts a value into its shard.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        i = self._route(val)
+        self._call(i, 'insert', val)
+        self._lens[i] += 1
+
+    def delete(self, val):
+        """Deletes value from its shard.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+
+        """
+        i = self._route(val)
+        self._lens[i] = self._fan([(i, 'delete', (val,)),
+                                   (i, '__len__', ())])[1]
+
+    def _partition(self, values):
+        """Returns {shard: values routed to it}."""
+        parts = {}
+        route = self._route
+        for val in values:
+            parts.setdefault(route(val), []).append(val)
+        return parts
+
+    def insert_many(self, iterable, sorted_=False):
+        """Inserts all values, every shard rebuilding its part in parallel.
+
+        Raises DuplicateException if any value is repeated or already in
+        the tree; shards without such values still take theirs.
+
+        iterable := (any sortable with hashable, number-like values) values
+                    to insert
+        sorted := (bool) whether iterable is already sorted
+
+        """
+        parts = self._partition(iterable)
+        calls = [(i, 'insert_many', (part, sorted_))
+                 for i, part in sorted(parts.items())]
+        try:
+            self._fan(calls)
+        finally:
+            self._refresh(parts)
+
+    def delete_many(self, iterable):
+        """Deletes all values, every shard rebuilding its part in parallel.
+
+        Raises a warning if any of the values doesn't exist.
+
+        iterable := (any iterable of hashable values) values to delete
+
+        """
+        parts = self._partition(iterable)
+        self._fan([(i, 'delete_many', (part,))
+                   for i, part in sorted(parts.items())])
+        self._refresh(parts)
+
+    def _refresh(self, shards):
+        shards = sorted(shards)
+        lens = self._fan([(i, '__len__', ()) for i in shards])
+        for i, len_ in zip(shards, lens):
+            self._lens[i] = len_
+
+    def rank(self, val):
+        """Returns the number of values in the tree less than val.
+
+        val := (any number-like type) the value to rank, need not be in tree
+
+        """
+        i = self._route(val)
+        return sum(self._lens[:i]) + self._call(i, 'rank', val)
+
+    def select(self, k):
+        """Returns the k-th smallest value, counting from 0.
+
+        Raises IndexError if k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        if not 0 <= k < len(self):
+            raise IndexError('select index out of range.')
+        for i, len_ in enumerate(self._lens):
+            if k < len_:
+                return self._call(i, 'select', k)
+            k -= len_
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Returns an iterator of the values between lo and hi, ascending.
+
+        Every shard overlapping the range collects its part at once.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        first = 0 if lo is None else self._route(lo)
+        last = len(self._conns) - 1 if hi is None else self._route(hi)
+        parts = self._fan([(i, 'irange', (lo, hi, inclusive))
+                           for i in xrange(first, last + 1)])
+        return (val for part in parts for val in part)
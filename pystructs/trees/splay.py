@@ -0,0 +1,163 @@
+from random import random
+
+from binarytree import BinTree
+
+
+class SplayTree(BinTree):
+    """Self-adjusting binary tree for hashable, number-like types.
+
+    Every accessed value is rotated up to the root, so values that are
+    used again soon stay near the top. A sequence of accesses that keeps
+    returning to a working set of h values costs amortized O(log h) per
+    access, whatever the tree size, and any sequence costs amortized
+    O(log n). find gives up the O(1) dict hit of BinTree for this, while
+    floor, ceiling, prev, next, irange and the extremes become cheap on
+    hot values.
+
+    Public Functions:
+    splay(val) := rotates val up to the root
+    find(val) := returns the node list of val and splays it
+    insert(val) := inserts a value and splays it
+    delete(val) := splays a value and deletes it
+    get_first(), get_last() := return the extremes and splay them
+
+    Public Static Class Properties:
+    mutating_reads := True, queries rotate the tree
+
+    """
+
+    mutating_reads = True
+
+    def splay(self, val):
+        """Rotates val up to the root with zig-zig and zig-zag steps.
+
+        val := (any type) a value in the tree
+
+        """
+        t = self.tree
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        lift = self._lift
+        node = t[val]
+        self._mods += 1
+        while node[PARENT] is not None:
+            parent = node[PARENT]
+            pnode = t[parent]
+            grand = pnode[PARENT]
+            if grand is None:
+                lift(val, node, parent, pnode)
+                break
+            gnode = t[grand]
+            if (gnode[LEFT] == parent) == (pnode[LEFT] == val):
+                lift(parent, pnode, grand, gnode)
+                lift(val, node, parent, pnode)
+            else:
+                lift(val, node, parent, pnode)
+                lift(val, node, grand, gnode)
+
+    def _lift(self, val, node, parent, pnode):
+        """Rotates val above its parent.
+
+        A rotation has the same effect as _rotate(parent, dir_) but moves
+        the subtree size of parent to val instead of recomputing both.
+
+        val := (any type) the value to lift
+        node := (list) the node list of val
+        parent := (any type) the parent of val
+        pnode := (list) the node list of parent
+
+        """
+        t = self.tree
+        sizes = self.sizes
+        PARENT = BinTree.PARENT
+        LEFT = BinTree.LEFT
+        RIGHT = BinTree.RIGHT
+        if pnode[LEFT] == val:
+            inner = node[RIGHT]
+            pnode[LEFT] = inner
+            node[RIGHT] = parent
+        else:
+            inner = node[LEFT]
+            pnode[RIGHT] = inner
+            node[LEFT] = parent
+        if inner is not None:
+            t[inner][PARENT] = parent
+        grand = pnode[PARENT]
+        node[PARENT] = grand
+        pnode[PARENT] = val
+        if grand is None:
+            t['root'] = val
+        else:
+            gnode = t[grand]
+            if gnode[LEFT] == parent:
+                gnode[LEFT] = val
+            else:
+                gnode[RIGHT] = val
+        sizes[val] = sizes[parent]
+        sizes[parent] = (1 + sizes.get(pnode[LEFT], 0) +
+                         sizes.get(pnode[RIGHT], 0))
+
+    def find(self, val):
+        """Finds and returns the parent and children of value.
+
+        The value is splayed first, so its parent is always None.
+
+        val := (any type) the value to find
+
+        """
+        node = BinTree.find(self, val)
+        if node is not None and val != 'root':
+            self.splay(val)
+        return node
+
+    def insert(self, val):
+        """Inserts a value into the tree and splays it.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any hashable type) the value to insert
+
+        """
+        BinTree.insert(self, val)
+        self.splay(val)
+
+    def delete(self, val, rand=random):
+        """Splays value to the root and deletes it.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+        rand := (func) special testing function to specify random
+                       aspects of the function.
+
+        """
+        if val in self.tree and val != 'root':
+            self.splay(val)
+        BinTree.delete(self, val, rand)
+
+    def _bound(self, x, dir_, inclusive):
+        """Returns the value nearest to x on the dir_ side of it, splayed.
+
+        x := (any number-like type) the bound, need not be in tree
+        dir_ := (int) BinTree.LEFT or BinTree.RIGHT
+        inclusive := (bool) whether x itself may be returned
+
+        """
+        found = BinTree._bound(self, x, dir_, inclusive)
+        if found is not None:
+            self.splay(found)
+        return found
+
+    def get_first(self):
+        """Returns the left-most leaf value (minimum) and splays it."""
+        val = BinTree.get_first(self)
+        if val is not None:
+            self.splay(val)
+        return val
+
+    def get_last(self):
+        """Returns the right-most leaf value (maximum) and splays it."""
+        val = BinTree.get_last(self)
+        if val is not None:
+            self.splay(val)
+        return val
@@ -0,0 +1,208 @@
+from collections import deque
+
+from binarytree import BinTree
+
+OPERATIONS = ('find', 'insert', 'delete')
+
+
+def search_length(tree, val):
+    """Returns the number of nodes a descent from the root to val visits.
+
+    If val is not in the tree this is the length of the path to where it
+    would be inserted.
+
+    tree := (BinTree) the tree to search
+    val := (any number-like type) the value to look for
+
+    """
+    t = tree.tree
+    LEFT = BinTree.LEFT
+    RIGHT = BinTree.RIGHT
+    length = 0
+    node = t['root']
+    while node is not None:
+        length += 1
+        if val < node:
+            node = t[node][LEFT]
+        elif node < val:
+            node = t[node][RIGHT]
+        else:
+            break
+    return length
+
+
+def depth_histogram(tree):
+    """Returns {depth: number of nodes} for the tree, the root at depth 1.
+
+    tree := (BinTree) the tree to inspect
+
+    """
+    t = tree.tree
+    depths = {}
+    depth = 0
+    level = deque()
+    if t['root'] is not None:
+        level.append(t['root'])
+    while len(level) > 0:
+        depth += 1
+        depths[depth] = len(level)
+        for _ in xrange(len(level)):
+            node = t[level.popleft()]
+            if node[BinTree.LEFT] is not None:
+                level.append(node[BinTree.LEFT])
+            if node[BinTree.RIGHT] is not None:
+                level.append(node[BinTree.RIGHT])
+    return depths
+
+
+class TreeStats(object):
+    """Operation counters of an instrumented tree.
+
+    The counts are taken in the walks the operations really do, by hooks
+    set on the tree instance in place of the plain walks. Comparisons are
+    the key comparisons of the descent of an insert, one per node passed.
+    Visits are all nodes passed by a walk: that descent, the walk down to
+    the replacement of a deleted node with two children, and the walks up
+    the parents that resize subtrees. find is a dict lookup and counts
+    neither. Other rebalancing work of subclasses, such as rotations,
+    recolouring or the height updates of an AVL, is not counted.
+
+    Public Functions:
+    record(op, val, comparisons, visits) := adds one operation
+    snapshot() := returns a dict copy of the counters
+
+    Public Instance Properties:
+    calls, comparisons, visits := dicts of operation name to total
+    callback := None or func(op, val, comparisons, visits) called per op
+    current := [comparisons, visits] of the operation running, else None
+
+    """
+
+    def __init__(self, callback=None):
+        self.calls = dict.fromkeys(OPERATIONS, 0)
+        self.comparisons = dict.fromkeys(OPERATIONS, 0)
+        self.visits = dict.fromkeys(OPERATIONS, 0)
+        self.callback = callback
+        self.current = None
+
+    def record(self, op, val, comparisons, visits):
+        self.calls[op] += 1
+        self.comparisons[op] += comparisons
+        self.visits[op] += visits
+        if self.callback is not None:
+            self.callback(op, val, comparisons, visits)
+
+    def snapshot(self):
+        return {'calls': dict(self.calls),
+                'comparisons': dict(self.comparisons),
+                'visits': dict(self.visits)}
+
+
+# the walks of BinTree that instrument replaces with counting copies
+HOOKS = ('_descend', 'get_loop', '_resize_path')
+
+
+def instrument(tree, callback=None):
+    """Makes tree count its operations and returns its TreeStats.
+
+    The counting versions of the methods in tree._counted and of the walks
+    they use are set on the tree instance, so the class methods and every
+    tree that is not instrumented keep running without any added cost. A
+    walk that the class overrides is left alone and not counted.
+
+    tree := (BinTree) the tree to instrument
+    callback := (func) called as callback(op, val, comparisons, visits)
+
+    """
+    uninstrument(tree)
+    stats = TreeStats(callback)
+    cls = type(tree)
+    LEFT = BinTree.LEFT
+    RIGHT = BinTree.RIGHT
+    PARENT = BinTree.PARENT
+
+    def counting(op, method):
+        def counted(val, *args, **kwargs):
+            # the inner calls of an operation, as add within insert, are
+            # part of it
+            if stats.current is not None:
+                return method(tree, val, *args, **kwargs)
+            current = stats.current = [0, 0]
+            try:
+                result = method(tree, val, *args, **kwargs)
+            finally:
+                stats.current = None
+            stats.record(op, val, current[0], current[1])
+            return result
+        counted.__name__ = method.__name__
+        counted.__doc__ = method.__doc__
+        return counted
+
+    def _descend(val):
+        t = tree.tree
+        sizes = tree.sizes
+        dir_ = None
+        parent = 'root'
+        node = t['root']
+        length = 0
+        while node is not None:
+            length += 1
+            sizes[node] += 1
+            if val < node:
+                dir_ = LEFT
+            else:
+                dir_ = RIGHT
+            parent = node
+            node = t[node][dir_]
+        current = stats.current
+        if current is not None:
+            current[0] += length
+            current[1] += length
+        return parent, dir_
+
+    def get_loop(dir_, start):
+        t = tree.tree
+        if start == 'root' or start not in t:
+            return BinTree.get_loop(tree, dir_, start)
+        node = start
+        length = 1
+        while t[node][dir_] is not None:
+            node = t[node][dir_]
+            length += 1
+        current = stats.current
+        if current is not None:
+            current[1] += length
+        return node
+
+    def _resize_path(val, delta):
+        t = tree.tree
+        sizes = tree.sizes
+        length = 0
+        while val is not None:
+            length += 1
+            sizes[val] += delta
+            val = t[val][PARENT]
+        current = stats.current
+        if current is not None:
+            current[1] += length
+
+    hooks = {'_descend': _descend, 'get_loop': get_loop,
+             '_resize_path': _resize_path}
+    for name in HOOKS:
+        if getattr(cls, name).__func__ is getattr(BinTree, name).__func__:
+            setattr(tree, name, hooks[name])
+    for name, op in cls._counted.items():
+        setattr(tree, name, counting(op, getattr(cls, name)))
+    tree._stats = stats
+    return stats
+
+
+def uninstrument(tree):
+    """Restores the plain operations of an instrumented tree.
+
+    tree := (BinTree) the tree to restore
+
+    """
+    for name in tuple(type(tree)._counted) + HOOKS:
+        tree.__dict__.pop(name, None)
+    tree._stats = None
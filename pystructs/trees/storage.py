@@ -0,0 +1,334 @@
+import mmap as mmap_
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from struct import Struct
+
+from binarytree import BinTree
+
+# File layout, all little-endian:
+#   header (32 bytes) := magic (4s), version (I), key typecode (c),
+#                        flags (B), padding (6x), count (Q), root in-order
+#                        index (q)
+#   keys := count keys in ascending order, int64 ('q') or float64 ('d')
+#   lefts := count int32 in-order indices of the left children, -1 if none
+#   rights := count int32 in-order indices of the right children, -1 if none
+#   counts := count int64 occurrences of each key, only with COUNTS in flags
+# A tree costs 16 bytes per node on disk. Child indices point into the
+# sorted key array, so the array alone answers rank and membership queries.
+# Files of a MultiBinTree carry the counts column and can only be loaded
+# into a MultiBinTree.
+
+MAGIC = b'PYST'
+VERSION = 1
+HEADER = Struct('<4sIcB6xQq')
+COUNTS = 1
+INDEX = 'i'
+NIL = -1
+# array typecodes of the stored key types, array has no 'q' on Python 2
+if array('l').itemsize == 8:
+    ARRAY_CODES = {'q': 'l', 'd': 'd'}
+else:
+    ARRAY_CODES = {'q': 'q', 'd': 'd'}
+
+
+def _typecode(keys):
+    """Returns the array typecode that stores every key exactly.
+
+    Keys must be all ints that fit in 64 bits or all floats; a mix would
+    be stored as floats and come back as different values. FrozenBinTree
+    checks its keys with this too.
+
+    keys := (list) the keys, in any order
+
+    """
+    types = set(type(key) for key in keys)
+    if types <= set([int, long]):
+        if len(keys) > 0 and not -2**63 <= min(keys) <= max(keys) < 2**63:
+            raise TypeError('int values must fit in 64 bits.')
+        return 'q'
+    if types == set([float]):
+        return 'd'
+    if types <= set([int, long, float]):
+        raise TypeError('int and float values can\'t be stored together.')
+    raise TypeError('Only int and float values can be stored.')
+
+
+def _little(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def dump(tree, path):
+    """Writes tree to path in the compact binary layout.
+
+    tree := (BinTree) the tree to write, with all int or all float values
+    path := (str) the file to write
+
+    """
+    from multiset import MultiBinTree
+    t = tree.tree
+    LEFT = BinTree.LEFT
+    RIGHT = BinTree.RIGHT
+    keys = list(BinTree.__iter__(tree))
+    len_ = len(keys)
+    lefts = array(INDEX, [NIL]) * len_
+    rights = array(INDEX, [NIL]) * len_
+    # subtree sizes may weigh nodes by more than one, so the positions of
+    # the distinct values are looked up instead of derived from them
+    index = dict((val, i) for i, val in enumerate(keys))
+    for i, val in enumerate(keys):
+        node = t[val]
+        if node[LEFT] is not None:
+            lefts[i] = index[node[LEFT]]
+        if node[RIGHT] is not None:
+            rights[i] = index[node[RIGHT]]
+    if len_ == 0:
+        root = NIL
+    else:
+        root = index[t['root']]
+    typecode = _typecode(keys)
+    flags = 0
+    if isinstance(tree, MultiBinTree):
+        flags |= COUNTS
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, typecode, flags, len_, root))
+        _little(array(ARRAY_CODES[typecode], keys)).tofile(f)
+        _little(lefts).tofile(f)
+        _little(rights).tofile(f)
+        if flags & COUNTS:
+            counts = tree.counts
+            _little(array(ARRAY_CODES['q'],
+                          [counts[val] for val in keys])).tofile(f)
+
+
+def _read_header(f):
+    magic, version, typecode, flags, len_, root = HEADER.unpack(
+        f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a pystructs tree file.')
+    return typecode, flags, len_, root
+
+
+def load(path, cls=BinTree, mmap=False):
+    """Reads a tree written by dump.
+
+    The tree is rebuilt from the stored links without sorting or hashing
+    checks. With mmap the file is mapped read-only instead and a
+    MappedBinTree is returned, which costs O(1) to open and shares its
+    pages with every other process mapping the same file.
+
+    Raises ValueError if the file holds a multiset and cls is not a
+    MultiBinTree or mmap is set; a plain file loads into a MultiBinTree
+    with every count 1.
+
+    path := (str) the file to read
+    cls := (class) BinTree or the subclass to rebuild into
+    mmap := (bool) whether to return a read-only MappedBinTree
+
+    """
+    from multiset import MultiBinTree
+    if mmap:
+        return MappedBinTree(path)
+    multi = issubclass(cls, MultiBinTree)
+    with open(path, 'rb') as f:
+        typecode, flags, len_, root = _read_header(f)
+        if flags & COUNTS and not multi:
+            raise ValueError('Only a MultiBinTree can load a multiset.')
+        codes = [ARRAY_CODES[typecode], INDEX, INDEX]
+        if flags & COUNTS:
+            codes.append(ARRAY_CODES['q'])
+        columns = []
+        for code in codes:
+            column = array(code)
+            column.fromfile(f, len_)
+            columns.append(_little(column))
+    keys, lefts, rights = columns[:3]
+    bintree = {val: [None, None, None] for val in keys}
+    PARENT = BinTree.PARENT
+    LEFT = BinTree.LEFT
+    RIGHT = BinTree.RIGHT
+    for i, val in enumerate(keys):
+        node = bintree[val]
+        if lefts[i] != NIL:
+            node[LEFT] = keys[lefts[i]]
+            bintree[node[LEFT]][PARENT] = val
+        if rights[i] != NIL:
+            node[RIGHT] = keys[rights[i]]
+            bintree[node[RIGHT]][PARENT] = val
+    if root == NIL:
+        bintree['root'] = None
+    else:
+        bintree['root'] = keys[root]
+    tree = cls.__new__(cls)
+    if multi:
+        if flags & COUNTS:
+            tree.counts = dict(zip(keys, columns[3]))
+        else:
+            tree.counts = dict.fromkeys(keys, 1)
+    tree._set_tree(bintree)
+    return tree
+
+
+class _MappedColumn(object):
+    """Read-only sequence view of fixed-size values in a buffer."""
+
+    def __init__(self, buf, offset, fmt, len_):
+        self._unpack = Struct('<' + fmt).unpack_from
+        self._buf = buf
+        self._offset = offset
+        self._step = Struct(fmt).size
+        self._len = len_
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError('Column index out of range.')
+        return self._unpack(self._buf, self._offset + i * self._step)[0]
+
+
+class MappedBinTree(object):
+    """Read-only tree opened directly on a file written by dump.
+
+    Nothing is copied into the process: values are unpacked from the
+    memory-mapped file on access. Since the keys are stored in ascending
+    order, membership, rank and neighbour queries are binary searches
+    over the mapped keys.
+
+    Public Functions:
+    __init__(path) := maps the file at path
+    close() := unmaps the file
+    get_root() := returns root value
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    find(val) := returns [parent, left-child, right-child] list
+    rank(val) := returns the number of values less than val
+    select(k) := returns the k-th smallest value
+    floor(x) := returns the largest value <= x
+    ceiling(x) := returns the smallest value >= x
+    len(tree), iter(tree), val in tree
+
+    """
+
+    def __init__(self, path):
+        """Maps the tree file at path read-only.
+
+        Raises ValueError for the file of a MultiBinTree, whose counts the
+        mapped queries would ignore.
+
+        path := (str) a file written by dump
+
+        """
+        with open(path, 'rb') as f:
+            typecode, flags, len_, root = _read_header(f)
+            if flags & COUNTS:
+                raise ValueError('A multiset file can\'t be mapped.')
+            buf = mmap_.mmap(f.fileno(), 0, access=mmap_.ACCESS_READ)
+        offset = HEADER.size
+        self.keys = _MappedColumn(buf, offset, typecode, len_)
+        offset += len_ * self.keys._step
+        self.lefts = _MappedColumn(buf, offset, INDEX, len_)
+        offset += len_ * self.lefts._step
+        self.rights = _MappedColumn(buf, offset, INDEX, len_)
+        self.root = root
+        self._buf = buf
+
+    def close(self):
+        """Unmaps the file; the tree can't be used afterwards."""
+        self._buf.close()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        keys = self.keys
+        for i in xrange(len(keys)):
+            yield keys[i]
+
+    def __contains__(self, val):
+        keys = self.keys
+        i = bisect_left(keys, val)
+        return i < len(keys) and keys[i] == val
+
+    def _key(self, i):
+        if i == NIL:
+            return None
+        return self.keys[i]
+
+    def get_root(self):
+        """Returns the root of binary tree."""
+        return self._key(self.root)
+
+    def get_first(self):
+        """Returns the minimum value."""
+        if len(self.keys) == 0:
+            return None
+        return self.keys[0]
+
+    def get_last(self):
+        """Returns the maximum value."""
+        if len(self.keys) == 0:
+            return None
+        return self.keys[-1]
+
+    def find(self, val):
+        """Finds and returns the parent and children of value.
+
+        val := (any type) the value to find
+
+        """
+        keys = self.keys
+        parent = NIL
+        i = self.root
+        while i != NIL:
+            key = keys[i]
+            if val < key:
+                parent, i = i, self.lefts[i]
+            elif key < val:
+                parent, i = i, self.rights[i]
+            else:
+                return [self._key(parent), self._key(self.lefts[i]),
+                        self._key(self.rights[i])]
+        return None
+
+    def rank(self, val):
+        """Returns the number of values in the tree less than val.
+
+        val := (any number-like type) the value to rank, need not be in tree
+
+        """
+        return bisect_left(self.keys, val)
+
+    def select(self, k):
+        """Returns the k-th smallest value, counting from 0.
+
+        Raises IndexError if k is out of range.
+
+        k := (int) the position in sorted order
+
+        """
+        return self.keys[k]
+
+    def floor(self, x):
+        """Returns the largest value less than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        return self._key(bisect_right(self.keys, x) - 1)
+
+    def ceiling(self, x):
+        """Returns the smallest value greater than or equal to x, or None.
+
+        x := (any number-like type) the bound, need not be in tree
+
+        """
+        i = bisect_left(self.keys, x)
+        if i == len(self.keys):
+            return None
+        return self.keys[i]
@@ -0,0 +1,248 @@
+import threading
+from contextlib import contextmanager
+
+from binarytree import BinTree
+
+
+class RWLock(object):
+    """Readers-writer lock that lets readers share and writers exclude.
+
+    Waiting writers block new readers, so a steady stream of reads cannot
+    starve a write.
+
+    Readers register by appending to a list, which the GIL makes a single
+    step, so a read that meets no writer never takes the mutex and costs
+    about two list operations more than the query itself.
+
+    Public Functions:
+    acquire_read() / release_read() := shared access
+    acquire_write() / release_write() := exclusive access
+    reading() / writing() := context managers for the pairs above
+
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._cond = threading.Condition(self._mutex)
+        # one entry per reader holding the lock
+        self._readers = []
+        self._writer = False
+        # writers holding or waiting for the lock, readers wait while > 0
+        self._writers = 0
+
+    def acquire_read(self):
+        # list.append and the check are single steps under the GIL, so a
+        # reader that registers first and then sees no writer is seen by
+        # any writer that comes later; only readers that meet a writer
+        # take the mutex
+        self._readers.append(None)
+        if self._writers:
+            self._wait_read()
+
+    def _wait_read(self):
+        with self._mutex:
+            self._readers.pop()
+            self._cond.notify_all()
+            while self._writers:
+                self._cond.wait()
+            self._readers.append(None)
+
+    def release_read(self):
+        self._readers.pop()
+        if self._writers:
+            with self._mutex:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._mutex:
+            self._writers += 1
+            try:
+                while self._writer or len(self._readers) > 0:
+                    self._cond.wait()
+            except BaseException:
+                self._writers -= 1
+                self._cond.notify_all()
+                raise
+            self._writer = True
+
+    def release_write(self):
+        with self._mutex:
+            self._writer = False
+            self._writers -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentBinTree(object):
+    """Thread-safe wrapper around a BinTree or one of its subclasses.
+
+    Queries hold a shared read lock and run in parallel with each other;
+    updates hold the exclusive write lock, so they are serialized and
+    never seen half done. batch() applies many updates under one lock
+    acquisition.
+
+    Iterating the wrapper copies the values under the read lock, and so
+    does irange for just the values in its range. Use reading() to walk
+    the underlying tree lazily while holding the lock. find returns a
+    copy of the node list, never the list inside the tree.
+
+    Trees whose queries change their shape, as a SplayTree rotating every
+    accessed value to the root, have mutating_reads set; for them the
+    queries and reading() take the write lock instead, so they no longer
+    run in parallel but can't corrupt the tree.
+
+    Public Functions:
+    __init__(tree) := wraps tree, or a new empty BinTree
+    find, get_root, get_first, get_last, rank, select, floor, ceiling,
+    prev, next, irange, len(tree) := read-locked versions of the BinTree
+                                     functions
+    insert, delete, insert_many, delete_many, pop_first,
+    pop_last := write-locked versions
+    batch(inserts, deletes) := applies several updates under one lock
+    reading() := context manager yielding the tree under the read lock
+    writing() := context manager yielding the tree under the write lock
+
+    """
+
+    def __init__(self, tree=None):
+        """Wraps tree for use from several threads.
+
+        tree := (BinTree) the tree to share, None for a new empty BinTree
+
+        """
+        if tree is None:
+            tree = BinTree([])
+        self._tree = tree
+        self._lock = RWLock()
+        if getattr(tree, 'mutating_reads', False):
+            self._acquire_read = self._lock.acquire_write
+            self._release_read = self._lock.release_write
+        else:
+            self._acquire_read = self._lock.acquire_read
+            self._release_read = self._lock.release_read
+
+    @contextmanager
+    def reading(self):
+        self._acquire_read()
+        try:
+            yield self._tree
+        finally:
+            self._release_read()
+
+    @contextmanager
+    def writing(self):
+        self._lock.acquire_write()
+        try:
+            yield self._tree
+        finally:
+            self._lock.release_write()
+
+    def _read(name):
+        def read(self, *args, **kwargs):
+            self._acquire_read()
+            try:
+                return getattr(self._tree, name)(*args, **kwargs)
+            finally:
+                self._release_read()
+        read.__name__ = name
+        read.__doc__ = getattr(BinTree, name).__doc__
+        return read
+
+    def _write(name):
+        def write(self, *args, **kwargs):
+            lock = self._lock
+            lock.acquire_write()
+            try:
+                return getattr(self._tree, name)(*args, **kwargs)
+            finally:
+                lock.release_write()
+        write.__name__ = name
+        write.__doc__ = getattr(BinTree, name).__doc__
+        return write
+
+    get_root = _read('get_root')
+    get_first = _read('get_first')
+    get_last = _read('get_last')
+    rank = _read('rank')
+    select = _read('select')
+    floor = _read('floor')
+    ceiling = _read('ceiling')
+    prev = _read('prev')
+    next = _read('next')
+    __len__ = _read('__len__')
+    insert = _write('insert')
+    delete = _write('delete')
+    insert_many = _write('insert_many')
+    delete_many = _write('delete_many')
+    pop_first = _write('pop_first')
+    pop_last = _write('pop_last')
+
+    del _read, _write
+
+    def find(self, val):
+        """Returns a copy of the [parent, left-child, right-child] list.
+
+        val := (any type) the value to find
+
+        """
+        self._acquire_read()
+        try:
+            node = self._tree.find(val)
+            if node is None:
+                return None
+            return list(node)
+        finally:
+            self._release_read()
+
+    def __iter__(self):
+        self._acquire_read()
+        try:
+            values = list(self._tree)
+        finally:
+            self._release_read()
+        return iter(values)
+
+    def irange(self, lo=None, hi=None, inclusive=(True, False)):
+        """Returns an iterator of a copy of the values between lo and hi.
+
+        Only the values in the range are copied, under the read lock.
+
+        lo := (any number-like type) lower bound, None for no bound
+        hi := (any number-like type) upper bound, None for no bound
+        inclusive := (pair of bool) whether lo and hi are themselves included
+
+        """
+        self._acquire_read()
+        try:
+            values = list(self._tree.irange(lo, hi, inclusive))
+        finally:
+            self._release_read()
+        return iter(values)
+
+    def batch(self, inserts=(), deletes=()):
+        """Inserts and then deletes values under a single write lock.
+
+        inserts := (iterable) values to insert one at a time
+        deletes := (iterable) values to delete one at a time
+
+        """
+        with self.writing() as tree:
+            for val in inserts:
+                tree.insert(val)
+            for val in deletes:
+                tree.delete(val)
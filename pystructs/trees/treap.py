@@ -0,0 +1,374 @@
+import warnings
+from random import random
+
+from binarytree import DuplicateException
+
+
+class _Node(object):
+    """Treap node with its priority and subtree size."""
+
+    __slots__ = ('val', 'priority', 'left', 'right', 'size')
+
+    def __init__(self, val, priority):
+        self.val = val
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.size = 1
+
+
+def _size(node):
+    if node is None:
+        return 0
+    return node.size
+
+
+def _fix(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key):
+    """Splits node into (values < key, the node of key or None, > key)."""
+    if node is None:
+        return None, None, None
+    if node.val < key:
+        lower, equal, upper = _split(node.right, key)
+        node.right = lower
+        _fix(node)
+        return node, equal, upper
+    if key < node.val:
+        lower, equal, upper = _split(node.left, key)
+        node.left = upper
+        _fix(node)
+        return lower, equal, node
+    lower, upper = node.left, node.right
+    node.left = node.right = None
+    node.size = 1
+    return lower, node, upper
+
+
+def _join(lower, upper):
+    """Joins two subtrees where every value of lower is < those of upper."""
+    if lower is None:
+        return upper
+    if upper is None:
+        return lower
+    if lower.priority > upper.priority:
+        lower.right = _join(lower.right, upper)
+        _fix(lower)
+        return lower
+    upper.left = _join(lower, upper.left)
+    _fix(upper)
+    return upper
+
+
+def _union(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority < b.priority:
+        a, b = b, a
+    lower, _, upper = _split(b, a.val)
+    a.left = _union(a.left, lower)
+    a.right = _union(a.right, upper)
+    _fix(a)
+    return a
+
+
+def _intersection(a, b):
+    if a is None or b is None:
+        return None
+    if a.priority < b.priority:
+        a, b = b, a
+    lower, equal, upper = _split(b, a.val)
+    left = _intersection(a.left, lower)
+    right = _intersection(a.right, upper)
+    if equal is None:
+        return _join(left, right)
+    a.left = left
+    a.right = right
+    _fix(a)
+    return a
+
+
+def _difference(a, b):
+    if a is None or b is None:
+        return a
+    lower, equal, upper = _split(b, a.val)
+    left = _difference(a.left, lower)
+    right = _difference(a.right, upper)
+    if equal is not None:
+        return _join(left, right)
+    a.left = left
+    a.right = right
+    _fix(a)
+    return a
+
+
+class Treap(object):
+    """Randomized binary search tree for number-like types.
+
+    Every node gets a random priority and the tree is kept a heap on the
+    priorities, which makes its shape that of a random insertion order
+    whatever order the values really came in, so the expected height is
+    O(log n). Splitting at a value and joining two trees only touch one
+    path, so a range of any size is removed in expected O(log n) and set
+    operations with a tree of m values cost O(m log(n / m)).
+
+    split, join and the set operations reuse the nodes of their inputs,
+    which are left empty.
+
+    Public Functions:
+    __init__(iterable, sorted, rand) := makes a Treap in O(n) when sorted
+    get_root() := returns root value
+    get_first() := returns minimum value
+    get_last() := returns maximum value
+    find(val) := returns val if it is in the tree, else None
+    delete(val) := deletes a value in tree
+    insert(val) := inserts a value in tree
+    split(key) := returns trees of the values < key and >= key
+    join(lower, upper) := (classmethod) returns the concatenated tree
+    delete_range(lo, hi) := deletes the values in [lo, hi)
+    union(other) := adds the values of other
+    intersection(other) := keeps only the values also in other
+    difference(other) := removes the values of other
+    len(tree), iter(tree), val in tree
+
+    """
+
+    def __init__(self, iterable, sorted_=False, rand=random):
+        """Makes a treap from an iterable with no duplicates.
+
+        iterable := (any sortable with number-like values) starting tree
+        sorted := (bool) whether iterable is already sorted
+        rand := (func) returns the priority of a new node
+
+        """
+        self._rand = rand
+        if not sorted_:
+            iterable = sorted(iterable)
+        # builds the heap along the right spine, a Cartesian tree
+        spine = []
+        last = None
+        for val in iterable:
+            if last is not None and not last.val < val:
+                raise DuplicateException(
+                    'Treap assumes you are handling duplicates separately.')
+            node = last = _Node(val, rand())
+            below = None
+            while len(spine) > 0 and spine[-1].priority < node.priority:
+                below = spine.pop()
+                _fix(below)
+            node.left = below
+            if len(spine) > 0:
+                spine[-1].right = node
+            spine.append(node)
+        self.root = spine[0] if len(spine) > 0 else None
+        while len(spine) > 0:
+            _fix(spine.pop())
+
+    @classmethod
+    def _from_root(cls, root, rand):
+        tree = cls.__new__(cls)
+        tree._rand = rand
+        tree.root = root
+        return tree
+
+    def __len__(self):
+        return _size(self.root)
+
+    def __iter__(self):
+        stack = []
+        node = self.root
+        while len(stack) > 0 or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.val
+            node = node.right
+
+    def __contains__(self, val):
+        return self._node(val) is not None
+
+    def _node(self, val):
+        node = self.root
+        while node is not None:
+            if val < node.val:
+                node = node.left
+            elif node.val < val:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def find(self, val):
+        """Returns val if it is in the tree, else None.
+
+        val := (any type) the value to find
+
+        """
+        node = self._node(val)
+        if node is None:
+            return None
+        return node.val
+
+    def get_root(self):
+        """Returns the root of the treap."""
+        if self.root is None:
+            return None
+        return self.root.val
+
+    def get_first(self):
+        """Returns the minimum value."""
+        node = self.root
+        if node is None:
+            return None
+        while node.left is not None:
+            node = node.left
+        return node.val
+
+    def get_last(self):
+        """Returns the maximum value."""
+        node = self.root
+        if node is None:
+            return None
+        while node.right is not None:
+            node = node.right
+        return node.val
+
+    def insert(self, val):
+        """Inserts a value into the treap.
+
+        Raises DuplicateException if the value already exists.
+
+        val := (any number-like type) the value to insert
+
+        """
+        if self._node(val) is not None:
+            raise DuplicateException(
+                'Invalid input to insert. Treap assumes you are handling ' +
+                'duplicates separately.')
+        new = _Node(val, self._rand())
+        # walks down to where the new priority belongs and splits the
+        # subtree found there around the new node
+        parent = None
+        node = self.root
+        while node is not None and node.priority > new.priority:
+            node.size += 1
+            parent = node
+            if val < node.val:
+                node = node.left
+            else:
+                node = node.right
+        new.left, _, new.right = _split(node, val)
+        _fix(new)
+        if parent is None:
+            self.root = new
+        elif val < parent.val:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def delete(self, val):
+        """Deletes value from the treap.
+
+        Raises a warning if the value doesn't exist.
+
+        val := (any type) the value to delete
+
+        """
+        if self._node(val) is None:
+            warnings.warn('No value deleted. ' + str(val) + ' not in tree.')
+            return
+        parent = None
+        node = self.root
+        while node.val != val:
+            node.size -= 1
+            parent = node
+            if val < node.val:
+                node = node.left
+            else:
+                node = node.right
+        joined = _join(node.left, node.right)
+        if parent is None:
+            self.root = joined
+        elif parent.left is node:
+            parent.left = joined
+        else:
+            parent.right = joined
+
+    def split(self, key):
+        """Returns treaps of the values < key and of those >= key.
+
+        This treap is left empty.
+
+        key := (any number-like type) the split point, need not be in tree
+
+        """
+        lower, equal, upper = _split(self.root, key)
+        if equal is not None:
+            upper = _join(equal, upper)
+        self.root = None
+        return (self._from_root(lower, self._rand),
+                self._from_root(upper, self._rand))
+
+    @classmethod
+    def join(cls, lower, upper):
+        """Returns a treap of the values of lower followed by upper.
+
+        Raises ValueError if the values of lower are not all less than those
+        of upper. Both treaps are left empty.
+
+        lower := (Treap) the treap of the smaller values
+        upper := (Treap) the treap of the larger values
+
+        """
+        if len(lower) > 0 and len(upper) > 0 and (
+                not lower.get_last() < upper.get_first()):
+            raise ValueError('All values of lower must be less than upper.')
+        root = _join(lower.root, upper.root)
+        lower.root = upper.root = None
+        return cls._from_root(root, lower._rand)
+
+    def delete_range(self, lo, hi):
+        """Deletes the values v with lo <= v < hi and returns their number.
+
+        lo := (any number-like type) lower bound, included
+        hi := (any number-like type) upper bound, excluded
+
+        """
+        lower, equal, rest = _split(self.root, lo)
+        rest = _join(equal, rest)
+        middle, equal, upper = _split(rest, hi)
+        upper = _join(equal, upper)
+        self.root = _join(lower, upper)
+        return _size(middle)
+
+    def union(self, other):
+        """Adds every value of other; other is left empty.
+
+        other := (Treap) the values to add
+
+        """
+        self.root = _union(self.root, other.root)
+        other.root = None
+
+    def intersection(self, other):
+        """Keeps only the values also in other; other is left empty.
+
+        other := (Treap) the values to keep
+
+        """
+        self.root = _intersection(self.root, other.root)
+        other.root = None
+
+    def difference(self, other):
+        """Removes every value of other; other is left empty.
+
+        other := (Treap) the values to remove
+
+        """
+        self.root = _difference(self.root, other.root)
+        other.root = None